@@ -1,18 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+import os, sys
 from typing import List, Any, Dict
 
 from fastapi import FastAPI, Query, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import psycopg2
 import psycopg2.extras
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib import db_pool
+from lib.fastjson import dumps_bytes
+
 APP_VERSION = "1.0.0"
 
-app = FastAPI(title="GambleBros Read-only API", version=APP_VERSION)
+class FastJSONResponse(JSONResponse):
+    """JSON über lib.fastjson (orjson, falls installiert): datetime/Decimal aus RealDictCursor direkt,
+    ohne FastAPIs jsonable_encoder-Durchlauf, wenn die Route die Response selbst baut."""
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+app = FastAPI(title="GambleBros Read-only API", version=APP_VERSION,
+              default_response_class=FastJSONResponse)
 
 # CORS (nur wenn gesetzt)
 CORS_ALLOW = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "").split(",") if o.strip()]
@@ -28,7 +38,7 @@ if CORS_ALLOW:
 # Optionales Shared-Secret
 API_SHARED_KEY = os.getenv("API_SHARED_KEY", "").strip() or None
 
-# DB: bevorzugt Read-Only, sonst normal
+# DB: bevorzugt Read-Only, sonst normal – Verbindungen aus dem Pool (lib.db_pool), nicht je Request neu
 DB_URL = os.getenv("RO_DATABASE_URL") or os.getenv("DATABASE_URL")
 if not DB_URL:
     raise RuntimeError("DATABASE_URL/RO_DATABASE_URL nicht gesetzt - bitte in .env_gamblebros hinterlegen.")
@@ -40,15 +50,12 @@ def guard(req: Request) -> None:
         raise HTTPException(status_code=401, detail="unauthorized")
 
 def q(sql: str, *args) -> List[Dict[str, Any]]:
-    conn = psycopg2.connect(DB_URL)
-    try:
+    with db_pool.connection(readonly=True) as conn:
         cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         cur.execute(sql, args)
         rows = cur.fetchall()
         cur.close()
         return rows
-    finally:
-        conn.close()
 
 def valid_day(value: str) -> str:
     v = (value or "TODAY").upper()
@@ -63,6 +70,7 @@ def root():
         "version": APP_VERSION,
         "routes": [
             {"GET": "/api/health"},
+            {"GET": "/api/db-pool"},
             {"GET": "/api/tips?day=TODAY|TOMORROW|OVERMORROW&limit=100"},
             {"GET": "/api/top-picks?days=3"},
         ],
@@ -76,7 +84,12 @@ def health(req: Request):
     rows = q("SELECT now() AS ts, 1 AS ok")
     out = rows[0] if rows else {"ts": None, "ok": 0}
     out["version"] = APP_VERSION
-    return out
+    return FastJSONResponse(out)
+
+@app.get("/api/db-pool")
+def db_pool_stats(req: Request):
+    guard(req)
+    return FastJSONResponse({name.split("@")[-1]: st for name, st in db_pool.pool_stats().items()})
 
 @app.get("/api/tips")
 def tips(req: Request,
@@ -104,7 +117,7 @@ def tips(req: Request,
             """,
             bucket, limit
         )
-        return rows
+        return FastJSONResponse(rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"query failed: {e}")
 
@@ -131,12 +144,12 @@ def top_picks(req: Request, days: int = Query(3, ge=1, le=7)):
             """,
             days
         )
-        return rows
+        return FastJSONResponse(rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"query failed: {e}")
 
 @app.exception_handler(Exception)
 def on_unhandled(request: Request, exc: Exception):
     if isinstance(exc, HTTPException):
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
-    return JSONResponse(status_code=500, content={"detail": f"internal error: {exc}"})
+        return FastJSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return FastJSONResponse(status_code=500, content={"detail": f"internal error: {exc}"})
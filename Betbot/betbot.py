@@ -7,40 +7,55 @@ BetBot – Orchestrator mit API-Football + Fallback AiScoreWorkerPool
 Flow:
 1) odds/live  -> bestimmt tippbare Fixtures
 2) fixtures(live=all) -> Meta/Minute, speichert Fixture + Odds in DB
-3) fixtures/statistics -> wenn vorhanden: Snapshot-Insert in DB
+3) fixtures?ids= (20 pro Call, inkl. statistics) -> wenn vorhanden: Snapshot-Insert in DB
+   Termine je Fixture im Deadline-Heap (lib.poll_scheduler, Gewicht: Spielphase/Minute aus lib.poll_policy,
+   Liga-Tier, Quotenbewegung; Halbzeit/Elfmeterschießen ohne Poll);
+   der Loop schläft bis zum nächsten Termin; leere Stats → Backoff je Fixture (EmptyBackoff, bis
+   STATS_EMPTY_BACKOFF_MAX_SEC), api_has_stats kippt erst nach STATS_EMPTY_CONFIRM leeren Antworten;
+   Tor/Rote Karte/Statuswechsel/Minutensprung → Stats + Odds dieses Spiels sofort (EVENT_DEBOUNCE_SEC)
 4) Fallback: Fehlen Stats -> AiScoreWorkerPool starten (Playwright, headless)
 5) Auto-Stop: wenn API-Stats da sind oder Fixture nicht mehr live ist
+Odds/Snapshots (API wie AiScore) nur bei geänderten Werten in die DB (lib.cdc), gebündelt über den
+asynchronen DB-Writer (lib.db_writer); Fixtures als ein Multi-Row-Upsert (db.upsert_fixtures) nur bei
+geändertem Metadaten-Hash, im Thread – der Loop wartet nicht auf Commits
 """
 
-import os, asyncio, time, json, random, aiohttp
+import os, asyncio, time, json
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 
 # DB-Modelle (wie in deinem Projekt)
-from db_models import SessionLocal, Fixture, Snapshot, OddsLive
+from db import FIXTURE_COLS, async_enabled as db_async_enabled, upsert_fixtures_async
 
 # Dein Worker-Pool (genau die Datei, die du gesendet hast)
 from aiscore_worker import AiScoreWorkerPool  # noqa: F401 (wird genutzt)
 
-load_dotenv()
+# gemeinsamer API-Client (ein Pool pro Prozess, globales Budget)
+from lib.api_client import env_keys, get_client
+from lib.cdc import CDC
+from lib import db_pool
+from lib.db_writer import get_writer
+from lib.circuit_breaker import CircuitOpen
+from lib.live_parse import live_fixtures_meta, odds_live_books
+from lib.live_stats import IDS_PER_CALL, iter_stats_blocks, stats_blocks
+from lib.offload import LoopLag, shutdown as offload_shutdown, warmup as offload_warmup
+from lib.poll_policy import poll_factor
+from lib.poll_scheduler import EmptyBackoff, EventTrigger, PollScheduler, fixture_weight, league_tiers, next_wake, odds_moves
 
-BASE = "https://v3.football.api-sports.io"
-API_KEY = os.getenv("API_SPORTS_KEY", "")
-if not API_KEY:
-    raise SystemExit("Fehlender API_SPORTS_KEY in .env")
+load_dotenv()
 
-HDRS = {
-    "x-apisports-key": API_KEY,
-    "Accept": "application/json",
-    "User-Agent": "BetBot/Unified/2.0",
-}
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
+if not API_KEYS:
+    raise SystemExit("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)")
 
 # Intervalle
 FIXTURES_REFRESH_SEC = int(os.getenv("FIXTURES_REFRESH_SEC", "30"))
 ODDS_REFRESH_SEC     = int(os.getenv("ODDS_REFRESH_SEC", "60"))
-STATS_INTERVAL_SEC   = int(os.getenv("STATS_INTERVAL_SEC", "60"))  # API-Stats Poll pro Fixture
-MIN_REQUEST_GAP_SEC  = float(os.getenv("MIN_REQUEST_INTERVAL_SEC", "0.8"))
+STATS_INTERVAL_SEC   = int(os.getenv("STATS_INTERVAL_SEC", "60"))  # API-Stats Poll pro Fixture (Basis, gewichtet)
+STATS_EMPTY_CONFIRM  = int(os.getenv("STATS_EMPTY_CONFIRM", "2"))  # leere Antworten in Folge, bis der Worker übernimmt
+STATS_RETRY_SEC      = int(os.getenv("STATS_RETRY_SEC", "15"))     # Stats-Block mit Fehler: erneut nach ... s (kein Worker)
+LEAGUE_TIERS         = league_tiers()
 
 # AiScore Worker Einstellungen (werden in aiscore_worker.py gelesen)
 AISO_MAX_PARALLEL    = int(os.getenv("AISO_MAX_PARALLEL", "12"))
@@ -50,84 +65,23 @@ AISO_INTERVAL_SEC    = int(os.getenv("AISO_INTERVAL_SEC", "30"))
 def ts() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-async def get_json(session: aiohttp.ClientSession, url: str, **params):
-    await asyncio.sleep(MIN_REQUEST_GAP_SEC)
-    async with session.get(url, headers=HDRS, params=params or None, timeout=45) as r:
-        if r.status == 429:
-            # backoff & retry
-            await asyncio.sleep(5)
-            return await get_json(session, url, **params)
-        r.raise_for_status()
-        return await r.json()
-
 def is_live_short(s: Optional[str]) -> bool:
     """True = Spiel mutmaßlich live (API-Shortcodes)."""
     if not s:
         return True
     return s not in {"FT", "AET", "PEN", "PST", "CANC", "ABD", "AWD", "WO"}
 
-def _pick_1x2_market(odds_list: list) -> Optional[dict]:
-    keys = ("1x2","match result","match winner","full time","winner",
-            "regular time","win-draw-win","resultado final","ergebnis (3-weg)")
-    for o in odds_list or []:
-        name = (o.get("name") or "").lower()
-        if any(k in name for k in keys):
-            return o
-    return None
-
 async def fetch_odds_live(session) -> Dict[int, Dict[str, float]]:
-    """odds/live → dict[fid] = {'home','draw','away'} (nur wenn 1X2 existiert)."""
-    data = await get_json(session, f"{BASE}/odds/live")
-    out: Dict[int, Dict[str, float]] = {}
-    for row in data.get("response", []) or []:
-        fixture = row.get("fixture") or {}
-        fid = fixture.get("id")
-        if not fid:
-            continue
-        m = _pick_1x2_market(row.get("odds") or [])
-        if not m:
-            continue
-        book = {"home": None, "draw": None, "away": None}
-        for v in m.get("values", []) or []:
-            val = (v.get("value") or "").lower()
-            odd = v.get("odd")
-            try:
-                odd = float(str(odd).replace(",", "."))
-            except:
-                odd = None
-            if val in ("home", "1"): book["home"] = odd
-            if val in ("draw", "x"):  book["draw"] = odd
-            if val in ("away", "2"):  book["away"] = odd
-        if any(book.values()):
-            out[fid] = book
-    return out
+    """odds/live → dict[fid] = {'home','draw','away'}; Decode + Transformation im Offload-Pool."""
+    return await session.get_json("/odds/live", parse=odds_live_books)
+
+async def fetch_odds_fixture(session, fid: int) -> Optional[Dict[str, float]]:
+    """odds/live nur für ein Spiel (Event-Refresh)."""
+    return (await session.get_json("/odds/live", {"fixture": fid}, parse=odds_live_books)).get(fid)
 
 async def fetch_live_fixtures(session) -> Dict[int, dict]:
-    """fixtures(live=all) → dict[fid] -> Meta (Minute, Teams, Liga, Status)."""
-    data = await get_json(session, f"{BASE}/fixtures", live="all")
-    res: Dict[int, dict] = {}
-    for r in data.get("response", []) or []:
-        fx   = r.get("fixture") or {}
-        lg   = r.get("league") or {}
-        tms  = r.get("teams") or {}
-        fid  = fx.get("id")
-        if not fid:
-            continue
-        res[fid] = {
-            "fixture_id": fid,
-            "status_short": (fx.get("status") or {}).get("short"),
-            "minute": (fx.get("status") or {}).get("elapsed") or 0,
-            "league_id": lg.get("id"), "league_name": lg.get("name"), "season": lg.get("season"),
-            "home_id": (tms.get("home") or {}).get("id"),
-            "home_name": (tms.get("home") or {}).get("name"),
-            "away_id": (tms.get("away") or {}).get("id"),
-            "away_name": (tms.get("away") or {}).get("name"),
-        }
-    return res
-
-async def fetch_stats(session, fixture_id: int) -> List[dict]:
-    data = await get_json(session, f"{BASE}/fixtures/statistics", fixture=fixture_id)
-    return data.get("response", []) or []
+    """fixtures(live=all) → dict[fid] -> Meta (Minute, Teams, Liga, Status), ebenfalls offloaded."""
+    return await session.get_json("/fixtures", {"live": "all"}, parse=live_fixtures_meta)
 
 def get_stat(stats: list, key: str) -> Optional[float]:
     for s in stats or []:
@@ -141,34 +95,35 @@ def get_stat(stats: list, key: str) -> Optional[float]:
     return None
 
 # ==== DB Helfer ====
-def upsert_fixture(sess, meta: dict):
-    f = sess.get(Fixture, meta["fixture_id"])
-    if not f:
-        f = Fixture(
-            fixture_id=meta["fixture_id"],
-            league_id=meta.get("league_id"), league_name=meta.get("league_name"), season=meta.get("season"),
-            home_id=meta.get("home_id"), home_name=meta.get("home_name"),
-            away_id=meta.get("away_id"), away_name=meta.get("away_name"),
-        )
-        sess.add(f)
-    else:
-        f.league_id = meta.get("league_id")
-        f.league_name = meta.get("league_name")
-        f.season = meta.get("season")
-        f.home_id = meta.get("home_id"); f.home_name = meta.get("home_name")
-        f.away_id = meta.get("away_id"); f.away_name = meta.get("away_name")
-
-def insert_odds(sess, fid: int, book: dict):
-    sess.add(OddsLive(
+async def store_fixtures(metas: List[dict]) -> int:
+    """Ein Multi-Row-Upsert für alle Fixtures mit geändertem Metadaten-Hash (async, vor den Odds im Writer)."""
+    changed = [m for m in metas if CDC.changed("fixtures", m["fixture_id"], tuple(m.get(c) for c in FIXTURE_COLS))]
+    try:
+        return await upsert_fixtures_async(changed)
+    except Exception:
+        CDC.forget("fixtures", (m["fixture_id"] for m in changed))
+        raise
+
+async def write_odds(fid: int, book: dict) -> bool:
+    if not CDC.changed("odds_live", fid, (book.get("home"), book.get("draw"), book.get("away"))):
+        return False
+    await get_writer().put("odds_live", dict(
         fixture_id=fid,
         home_ml=book.get("home"),
         draw_ml=book.get("draw"),
         away_ml=book.get("away")
     ))
+    return True
 
-def insert_snapshot_from_api(sess, fid: int, minute: int, h_stats: list, a_stats: list):
-    snap = Snapshot(
-        fixture_id=fid, minute=minute,
+async def write_snapshot(fid: int, minute: int, vals: dict) -> bool:
+    """Snapshot nur bei geänderten Stats (CDC) – gemeinsam für API und AiScore."""
+    if not CDC.changed("snapshots", fid, tuple(vals[k] for k in sorted(vals))):
+        return False
+    await get_writer().put("snapshots", dict(fixture_id=fid, minute=minute, **vals))
+    return True
+
+async def write_snapshot_from_api(fid: int, minute: int, h_stats: list, a_stats: list) -> bool:
+    return await write_snapshot(fid, minute, dict(
         home_sog=int(get_stat(h_stats, "Shots on Goal") or 0),
         home_shots=int(get_stat(h_stats, "Total Shots") or 0),
         home_corners=int(get_stat(h_stats, "Corner Kicks") or 0),
@@ -179,19 +134,26 @@ def insert_snapshot_from_api(sess, fid: int, minute: int, h_stats: list, a_stats
         away_corners=int(get_stat(a_stats, "Corner Kicks") or 0),
         away_saves=int(get_stat(a_stats, "Goalkeeper Saves") or 0),
         away_poss=float(get_stat(a_stats, "Ball Possession") or 0.0),
-    )
-    sess.add(snap)
+    ))
 
 # ==== Orchestrator ====
 async def run():
-    timeout = aiohttp.ClientTimeout(total=50)
-    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    # Decode-Pool zuerst forken – vor Telemetrie-Server, DB-Writer und Playwright (siehe offload.warmup)
+    offload_warmup()
+    db_async_enabled()   # DB_ASYNC=on ohne Treiber → hier abbrechen, nicht erst beim ersten Write
+    http = get_client(user_agent="BetBot/Unified/2.0")
+    writer = get_writer().start()
+    # LoopLag misst, wie lange Callbacks auf den Loop warten
+    lag = LoopLag().start()
 
     last_odds_pull = 0.0
     last_fixtures_pull = 0.0
     cached_odds: Dict[int, dict] = {}
     cached_fx: Dict[int, dict] = {}
-    last_stats_req: Dict[int, float] = {}  # anti-burst pro Fixture
+    stats_sched = PollScheduler(STATS_INTERVAL_SEC)  # fid -> nächster Stats-Termin
+    stats_empty = EmptyBackoff(STATS_INTERVAL_SEC)     # fid -> leere Stats-Antworten in Folge
+    events = EventTrigger()                            # fid -> letzter Stand (Tore, Status, Minute, Rote)
+    moves: Dict[int, float] = {}
 
     # Diese Sets steuern, wann der Worker gestoppt wird
     api_has_stats: Dict[int, bool] = {}  # wenn True: Worker stoppen
@@ -207,15 +169,17 @@ async def run():
     )
     await pool.start()
 
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as http:
+    try:
         while True:
             try:
                 mono = time.monotonic()
 
-                # 1) odds/live
-                if mono - last_odds_pull >= ODDS_REFRESH_SEC or not cached_odds:
+                # 1) odds/live (Circuit offen → letzte Odds behalten, kein Request)
+                if not http.breaker.blocked("/odds/live") and (mono - last_odds_pull >= ODDS_REFRESH_SEC or not cached_odds):
                     try:
-                        cached_odds = await fetch_odds_live(http)
+                        fresh = await fetch_odds_live(http)
+                        moves = odds_moves(cached_odds, fresh)
+                        cached_odds = fresh
                         print(f"[{ts()}] odds/live: tippbar={len(cached_odds)}")
                     except Exception as e:
                         print(f"[{ts()}] odds/live Fehler: {e}")
@@ -224,17 +188,16 @@ async def run():
                 # 2) fixtures live
                 if mono - last_fixtures_pull >= FIXTURES_REFRESH_SEC or not cached_fx:
                     all_live = await fetch_live_fixtures(http)
+                    http.costs.note_leagues({fid: m.get("league_id") for fid, m in all_live.items()})
                     cached_fx = {fid: all_live[fid] for fid in all_live if fid in cached_odds}
                     print(f"[{ts()}] fixtures/live: live={len(all_live)} | tippbar={len(cached_fx)}")
                     last_fixtures_pull = time.monotonic()
 
-                    # DB upsert + odds
-                    with SessionLocal() as sess:
-                        for fid, meta in cached_fx.items():
-                            upsert_fixture(sess, meta)
-                            if fid in cached_odds:
-                                insert_odds(sess, fid, cached_odds[fid])
-                        sess.commit()
+                    # DB upsert (Thread) + odds (Writer)
+                    await store_fixtures(list(cached_fx.values()))
+                    for fid in cached_fx:
+                        if fid in cached_odds:
+                            await write_odds(fid, cached_odds[fid])
 
                     # setze still_live flags, stoppe Worker für nicht-live
                     active_ids = set(cached_fx.keys())
@@ -244,30 +207,84 @@ async def run():
                     for fid in active_ids:
                         still_live[fid] = is_live_short(cached_fx[fid].get("status_short"))
 
+                    # Stats-Termine neu gewichten (alle in cached_fx sind tippbar); Phase ohne Poll → raus
+                    pollable = []
+                    for fid, meta in cached_fx.items():
+                        phase = poll_factor(meta.get("status_short"), int(meta.get("minute") or 0), meta.get("red_cards") or 0)
+                        if phase is None:
+                            continue
+                        pollable.append(fid)
+                        stats_sched.update(fid, fixture_weight(True, LEAGUE_TIERS.get(meta.get("league_id"), 2),
+                                                               moves.get(fid, 0.0), phase))
+                    stats_sched.retain(pollable)
+
+                    # Ereignis seit dem letzten Stand → Stats sofort fällig (auch einmalig in HT), Odds außer der Reihe;
+                    # Spiele im Empty-Backoff nicht (keine Stats-Abdeckung)
+                    event_fids = []
+                    for fid, meta in cached_fx.items():
+                        if not events.check(fid, meta) or fid in stats_empty.misses:
+                            continue
+                        if fid not in stats_sched:
+                            stats_sched.update(fid, fixture_weight(True, LEAGUE_TIERS.get(meta.get("league_id"), 2)))
+                        stats_sched.reschedule(fid, time.monotonic())
+                        event_fids.append(fid)
+                    events.retain(active_ids)
+                    if event_fids and not http.breaker.blocked("/odds/live"):
+                        fids = event_fids[:http.budget.spare("odds_live")]
+                        res = await asyncio.gather(*(fetch_odds_fixture(http, f) for f in fids), return_exceptions=True)
+                        books = {f: b for f, b in zip(fids, res) if isinstance(b, dict)}
+                        if books:
+                            # neues Dict – fresh ist das geteilte SingleFlight-Ergebnis, nicht mutieren
+                            cached_odds = {**cached_odds, **books}
+                            for fid, book in books.items():
+                                await write_odds(fid, book)
+                    stats_empty.retain(active_ids)
+                    CDC.retain(all_live)
+
                 if not cached_fx:
                     print(f"[{ts()}] keine tippbaren Live-Spiele – sleep {FIXTURES_REFRESH_SEC}s")
                     await asyncio.sleep(FIXTURES_REFRESH_SEC)
                     continue
 
-                # 3) pro tippbarem Fixture: API-Stats Try, sonst Worker
-                for fid, meta in list(cached_fx.items()):
-                    if mono - last_stats_req.get(fid, 0.0) < STATS_INTERVAL_SEC:
+                # 3) fällige tippbare Fixtures (Heap, höchstes Gewicht zuerst): API-Stats gebündelt
+                #    (20 pro Call), sonst Worker. Circuit offen → alle fälligen direkt zum Worker;
+                #    sonst nur so viele, wie das Budget jetzt hergibt, der Rest bleibt fällig
+                stats_blocked = http.breaker.blocked("/fixtures", {"ids": 0})
+                due = stats_sched.pop_due(limit=None if stats_blocked else http.budget.spare("stats") * IDS_PER_CALL)
+                deferred = stats_sched.pending()
+                got: Dict[int, List[dict]] = {}
+                failed: set = set()
+                blocks = [] if stats_blocked else stats_blocks(due)
+                async for block, res in iter_stats_blocks(http, blocks):
+                    if isinstance(res, CircuitOpen):
                         continue
-                    last_stats_req[fid] = mono
-
-                    try:
-                        resp = await fetch_stats(http, fid)
-                    except Exception as e:
-                        print(f"[{ts()}] stats Fehler {fid}: {e}")
-                        resp = []
+                    if isinstance(res, Exception):
+                        # vorübergehender Fehler heißt nicht "keine Stats": neu einplanen statt Worker starten
+                        print(f"[{ts()}] stats Fehler ({len(block)} Spiele, erneut in {STATS_RETRY_SEC}s): {res}")
+                        failed.update(block)
+                        for fid in block:
+                            stats_sched.reschedule(fid, time.monotonic() + STATS_RETRY_SEC)
+                        continue
+                    got.update(res)
 
+                for fid in due:
+                    meta = cached_fx.get(fid)
+                    if meta is None or fid in failed:
+                        continue
+                    resp = got.get(fid, [])
+                    if fid in got:
+                        # Antwort ohne Stats → Backoff; einzelne Aussetzer lassen api_has_stats stehen
+                        if resp:
+                            stats_empty.hit(fid)
+                        else:
+                            stats_sched.reschedule(fid, time.monotonic() + stats_empty.miss(fid))
+                            if api_has_stats.get(fid) and stats_empty.misses[fid] < STATS_EMPTY_CONFIRM:
+                                continue
                     if len(resp) >= 2:
                         # API liefert: Snapshot speichern und (falls läuft) Worker stoppen
                         t0, t1 = resp[0], resp[1]
                         minute = int(meta.get("minute") or 0)
-                        with SessionLocal() as sess:
-                            insert_snapshot_from_api(sess, fid, minute, t0.get("statistics") or [], t1.get("statistics") or [])
-                            sess.commit()
+                        await write_snapshot_from_api(fid, minute, t0.get("statistics") or [], t1.get("statistics") or [])
                         api_has_stats[fid] = True
                     else:
                         api_has_stats[fid] = False
@@ -279,14 +296,25 @@ async def run():
                                 "away": meta.get("away_name","") or "",
                             })
 
-                    await asyncio.sleep(random.uniform(0.25, 0.7))
+                plan = stats_sched.planned_per_min(IDS_PER_CALL, stats_empty)
+                print(f"[{ts()}] Loop ok – tippbar={len(cached_fx)} | workers={pool.count_running()} | stats due {len(due)} (deferred {deferred}) | plan {plan:.1f}/min vs cap {http.budget.stats()['min_cap']}/min | {stats_empty.summary()} | {events.summary()} | {CDC.summary()} | {writer.summary()} | {db_pool.summary()} | rate {http.rate.stats()['rate']}/min | {lag.summary()} {http.breaker.summary()}")
 
-                print(f"[{ts()}] Loop ok – tippbar={len(cached_fx)} | workers={pool.count_running()}")
-                await asyncio.sleep(1.0)
+                # bis zum nächsten Termin schlafen; hängen fällige Stats am Budget → im 1s-Takt nachsehen
+                await asyncio.sleep(next_wake([
+                    None if deferred else stats_sched.next_due(),
+                    last_fixtures_pull + FIXTURES_REFRESH_SEC,
+                    None if http.breaker.blocked("/odds/live") else last_odds_pull + ODDS_REFRESH_SEC,
+                ], cap=1.0 if deferred else FIXTURES_REFRESH_SEC))
 
             except Exception as e:
                 print(f"[{ts()}] Main-Fehler: {e}")
                 await asyncio.sleep(3)
+    finally:
+        await lag.stop()
+        await writer.close()
+        await db_pool.dispose_async()
+        await http.close()
+        offload_shutdown()
 
 # ==== Callbacks & Stop-Logic ====
 def _on_insert_from_aiscore(cached_fx_ref: Dict[int, dict]):
@@ -307,13 +335,11 @@ def _on_insert_from_aiscore(cached_fx_ref: Dict[int, dict]):
         home_poss  = float(row.get("possession_h") or 0.0)
         away_poss  = float(row.get("possession_a") or 0.0)
 
-        with SessionLocal() as sess:
-            sess.add(Snapshot(
-                fixture_id=fid, minute=int(minute),
-                home_sog=home_sog, home_shots=home_shots, home_corners=home_corn, home_saves=0, home_poss=home_poss,
-                away_sog=away_sog, away_shots=away_shots, away_corners=away_corn, away_saves=0, away_poss=away_poss
-            ))
-            sess.commit()
+        if not await write_snapshot(fid, int(minute), dict(
+            home_sog=home_sog, home_shots=home_shots, home_corners=home_corn, home_saves=0, home_poss=home_poss,
+            away_sog=away_sog, away_shots=away_shots, away_corners=away_corn, away_saves=0, away_poss=away_poss
+        )):
+            return
         print(f"[{ts()}] [AiScore→DB] {fid} min={minute} SH={home_shots}-{away_shots} SOG={home_sog}-{away_sog} CORN={home_corn}-{away_corn} POS={home_poss}-{away_poss}")
     return _on_insert
 
@@ -1,24 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, asyncio, aiohttp, time
+import os, asyncio, time
 from dotenv import load_dotenv
+from lib.api_client import env_keys, get_client
 
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-BASE = "https://v3.football.api-sports.io"
-HDRS = {"x-apisports-key": API_KEY, "Accept": "application/json", "User-Agent": "BetBotCoverageScan/1.0"}
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
 
-if not API_KEY:
-    raise SystemExit("API_SPORTS_KEY fehlt in .env")
-
-async def get_json(s, url, params=None):
-    async with s.get(url, headers=HDRS, params=params, timeout=40) as r:
-        r.raise_for_status()
-        return await r.json()
+if not API_KEYS:
+    raise SystemExit("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)")
 
 async def has_stats_coverage(s, league_id, season):
-    data = await get_json(s, f"{BASE}/leagues", {"id": league_id, "season": season})
+    data = await s.get_json("/leagues", {"id": league_id, "season": season})
     resp = data.get("response", [])
     if not resp:
         return False
@@ -29,9 +23,10 @@ async def has_stats_coverage(s, league_id, season):
     return bool(cov.get("statistics"))
 
 async def main():
-    async with aiohttp.ClientSession() as s:
+    s = get_client(user_agent="BetBotCoverageScan/1.0")
+    try:
         # 1) aktuelle Live-Spiele ziehen
-        fx = await get_json(s, f"{BASE}/fixtures", {"live": "all"})
+        fx = await s.get_json("/fixtures", {"live": "all"})
         leagues = {}  # (league_id, season) -> league_name
         for row in fx.get("response", []):
             lg = row.get("league") or {}
@@ -64,6 +59,9 @@ async def main():
             print(f"WATCH_LEAGUES={ids}")
         else:
             print("\nKeine Liga mit statistics-Coverage gefunden (zum Zeitpunkt des Scans).")
+        print(f"\n{s.cache.summary()}")
+    finally:
+        await s.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -9,18 +9,17 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 from collections import defaultdict
 
-import requests
 import streamlit as st
 from sqlalchemy import func
 
 # ---- Projektmodelle ----
 from db_models import SessionLocal, Fixture, Snapshot, OddsLive
+from lib.api_client import env_keys, get_json_sync
 
 # ---- Konfig ----
 PAGE_TITLE       = "BetBot – Live Dashboard"
 DEFAULT_REFRESH  = int(os.getenv("DASH_REFRESH_SEC", "30"))  # Standard-Intervall (Sekunden)
-API_BASE         = "https://v3.football.api-sports.io"
-API_KEY          = os.getenv("API_SPORTS_KEY", "")
+API_KEYS         = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
 
 # ---- Soft Auto-Refresh (ohne kompletten Reload) ----
 #   st_autorefresh rendert nur neu, UI-State (Tabs/Filter/Scroll) bleibt erhalten.
@@ -52,16 +51,9 @@ def score_from_api_node(node: dict) -> str:
 @st.cache_data(ttl=20, show_spinner=False)
 def fetch_live_fixtures_api() -> List[dict]:
     """Live-Spiele aus API-Football (für Games-Tab)."""
-    if not API_KEY:
+    if not API_KEYS:
         return []
-    r = requests.get(
-        f"{API_BASE}/fixtures",
-        headers={"x-apisports-key": API_KEY, "Accept": "application/json"},
-        params={"live": "all"},
-        timeout=25,
-    )
-    r.raise_for_status()
-    return r.json().get("response", []) or []
+    return get_json_sync("/fixtures", {"live": "all"}, timeout=25).get("response", []) or []
 
 def latest_snapshot_for_fixtures(sess, fixture_ids: List[int]) -> Dict[int, Snapshot]:
     """Letzter Snapshot (max minute) pro Fixture aus der DB."""
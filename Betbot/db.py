@@ -1,46 +1,112 @@
-import os
-from typing import Dict, Any, List
-from sqlalchemy import create_engine, text
+import os, asyncio
+from typing import Dict, Any, Iterator, List, Tuple
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
 from dotenv import load_dotenv
 
 load_dotenv()
-ENGINE: Engine = create_engine(os.getenv("DATABASE_URL"), pool_pre_ping=True, future=True)
+from lib import db_pool
+ENGINE: Engine = db_pool.engine()   # gemeinsamer Pool (lib.db_pool) mit db_models, Writer, Workern
 
+# Spalten wie db_models.Fixture / schema.sql (live_monitor legt die Tabellen per init_db an)
+FIXTURE_COLS = ("fixture_id", "league_id", "league_name", "season", "home_id", "home_name", "away_id", "away_name")
+FIXTURE_UPSERT_CHUNK = int(os.getenv("FIXTURE_UPSERT_CHUNK", "500"))
+
+ALERT_SQL = text("""
+    INSERT INTO alerts (fixture_id, kind, message, details)
+    VALUES (:fixture_id, :kind, :message, :details);
+""")
+
+# ========= Statements (gemeinsam für sync und async) =========
+def _fixture_chunks(fixtures: List[Dict[str, Any]]) -> Iterator[Tuple[TextClause, Dict[str, Any]]]:
+    """Doppelte fixture_id: letzter Stand gewinnt (Postgres lehnt sonst ab)."""
+    rows = list({f["fixture_id"]: f for f in fixtures}.values())
+    updates = ", ".join(f"{c}=excluded.{c}" for c in FIXTURE_COLS[1:])
+    for i in range(0, len(rows), FIXTURE_UPSERT_CHUNK):
+        params: Dict[str, Any] = {}
+        values = []
+        for n, fix in enumerate(rows[i:i + FIXTURE_UPSERT_CHUNK]):
+            values.append("(" + ", ".join(f":{c}_{n}" for c in FIXTURE_COLS) + ", CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)")
+            params.update({f"{c}_{n}": fix.get(c) for c in FIXTURE_COLS})
+        yield text(f"""
+            INSERT INTO fixtures ({", ".join(FIXTURE_COLS)}, created_at, updated_at)
+            VALUES {", ".join(values)}
+            ON CONFLICT (fixture_id) DO UPDATE
+               SET {updates}, updated_at=CURRENT_TIMESTAMP;
+        """), params
+
+def _insert_sql(table: str, keys) -> TextClause:
+    return text(f"INSERT INTO {table} ({', '.join(keys)}) VALUES ({', '.join(':' + k for k in keys)});")
+
+# ========= Sync =========
 def upsert_fixture(fix: Dict[str, Any]) -> None:
-    sql = text("""
-        INSERT INTO fixtures (fixture_id, league_id, league_name, season,
-                              home_id, home_name, away_id, away_name, created_at, updated_at)
-        VALUES (:fixture_id, :league_id, :league_name, :season,
-                :home_id, :home_name, :away_id, :away_name, now(), now())
-        ON CONFLICT (fixture_id) DO UPDATE
-           SET league_id=:league_id, league_name=:league_name, season=:season,
-               home_id=:home_id, home_name=:home_name, away_id=:away_id, away_name=:away_name,
-               updated_at=now();
-    """)
+    upsert_fixtures([fix])
+
+def upsert_fixtures(fixtures: List[Dict[str, Any]]) -> int:
+    """
+    Alle Fixtures in EINEM mehrzeiligen INSERT ... ON CONFLICT (je FIXTURE_UPSERT_CHUNK Zeilen),
+    eine Transaktion.
+    """
+    n = 0
     with ENGINE.begin() as conn:
-        conn.execute(sql, fix)
+        for sql, params in _fixture_chunks(fixtures):
+            conn.execute(sql, params)
+            n += len(params) // len(FIXTURE_COLS)
+    return n
 
 def insert_snapshot(rec: Dict[str, Any]) -> None:
-    keys = ", ".join(rec.keys())
-    vals = ", ".join([f":{k}" for k in rec.keys()])
-    sql = text(f"INSERT INTO snapshots ({keys}) VALUES ({vals});")
     with ENGINE.begin() as conn:
-        conn.execute(sql, rec)
+        conn.execute(_insert_sql("snapshots", rec.keys()), rec)
 
 def insert_odds_bulk(rows: List[Dict[str, Any]]) -> None:
     if not rows: return
-    keys = rows[0].keys()
-    keys_sql = ", ".join(keys)
-    vals_sql = ", ".join([f":{k}" for k in keys])
-    sql = text(f"INSERT INTO odds_live ({keys_sql}) VALUES ({vals_sql});")
     with ENGINE.begin() as conn:
-        conn.execute(sql, rows)
+        conn.execute(_insert_sql("odds_live", rows[0].keys()), rows)
 
 def insert_alert(alert: Dict[str, Any]) -> None:
-    sql = text("""
-        INSERT INTO alerts (fixture_id, kind, message, details)
-        VALUES (:fixture_id, :kind, :message, :details);
-    """)
     with ENGINE.begin() as conn:
-        conn.execute(sql, alert)
+        conn.execute(ALERT_SQL, alert)
+
+# ========= Async (live_monitor, betbot) =========
+# SQLAlchemy asyncio über db_pool.async_engine() (asyncpg / aiosqlite) auf derselben DB wie ENGINE:
+# der Event-Loop wartet auf die DB, ohne zu blockieren. Ohne Async-Treiber (oder DB_ASYNC=off)
+# laufen dieselben Statements per asyncio.to_thread über den Sync-Pool – Aufrufer merken keinen Unterschied.
+def _url() -> str:
+    return ENGINE.url.render_as_string(hide_password=False)
+
+def async_enabled() -> bool:
+    return db_pool.use_async(url=_url())
+
+async def upsert_fixture_async(fix: Dict[str, Any]) -> None:
+    await upsert_fixtures_async([fix])
+
+async def upsert_fixtures_async(fixtures: List[Dict[str, Any]]) -> int:
+    if not fixtures: return 0
+    if not async_enabled():
+        return await asyncio.to_thread(upsert_fixtures, fixtures)
+    n = 0
+    async with db_pool.async_engine(url=_url()).begin() as conn:
+        for sql, params in _fixture_chunks(fixtures):
+            await conn.execute(sql, params)
+            n += len(params) // len(FIXTURE_COLS)
+    return n
+
+async def insert_snapshot_async(rec: Dict[str, Any]) -> None:
+    if not async_enabled():
+        return await asyncio.to_thread(insert_snapshot, rec)
+    async with db_pool.async_engine(url=_url()).begin() as conn:
+        await conn.execute(_insert_sql("snapshots", rec.keys()), rec)
+
+async def insert_odds_bulk_async(rows: List[Dict[str, Any]]) -> None:
+    if not rows: return
+    if not async_enabled():
+        return await asyncio.to_thread(insert_odds_bulk, rows)
+    async with db_pool.async_engine(url=_url()).begin() as conn:
+        await conn.execute(_insert_sql("odds_live", rows[0].keys()), rows)
+
+async def insert_alert_async(alert: Dict[str, Any]) -> None:
+    if not async_enabled():
+        return await asyncio.to_thread(insert_alert, alert)
+    async with db_pool.async_engine(url=_url()).begin() as conn:
+        await conn.execute(ALERT_SQL, alert)
@@ -1,88 +1,76 @@
 # -*- coding: utf-8 -*-
 """
 Database models for BetBot
-SQLAlchemy ORM models for fixtures, snapshots, and odds
+SQLAlchemy ORM models for fixtures, snapshots, odds and alerts.
+Tables and columns mirror schema.sql – the live loops (db.py, lib.db_writer) write
+schema.sql columns with plain SQL, so both must describe the same tables.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, Float, DateTime, Text, ForeignKey, Index, func, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import os
 
+from lib import db_pool
+
 # Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./betbot.db")
+DATABASE_URL = db_pool.database_url()
 
-# Create engine and session
-engine = create_engine(DATABASE_URL, echo=False)
+# Shared pooled engine (lib.db_pool) and session
+engine = db_pool.engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# BIGSERIAL in Postgres, INTEGER PRIMARY KEY (rowid) in SQLite
+BigId = BigInteger().with_variant(Integer, "sqlite")
+
 
 class Fixture(Base):
     """Football fixture/match model."""
     __tablename__ = "fixtures"
     
-    id = Column(Integer, primary_key=True, index=True)
-    fixture_id = Column(Integer, unique=True, index=True, nullable=False)
-    league_id = Column(Integer, index=True)
-    league_name = Column(String)
+    fixture_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    league_id = Column(BigInteger)
+    league_name = Column(Text)
     season = Column(Integer)
-    date = Column(DateTime)
-    
-    home_team_id = Column(Integer)
-    home_team_name = Column(String)
-    away_team_id = Column(Integer)
-    away_team_name = Column(String)
     
-    status = Column(String)
-    elapsed = Column(Integer)
+    home_id = Column(BigInteger)
+    home_name = Column(Text)
+    away_id = Column(BigInteger)
+    away_name = Column(Text)
     
-    home_goals = Column(Integer)
-    away_goals = Column(Integer)
-    
-    created_at = Column(DateTime)
-    updated_at = Column(DateTime)
+    created_at = Column(DateTime(timezone=True), server_default=func.current_timestamp())
+    updated_at = Column(DateTime(timezone=True), server_default=func.current_timestamp())
     
     # Relationships
     snapshots = relationship("Snapshot", back_populates="fixture")
     odds = relationship("OddsLive", back_populates="fixture")
+    alerts = relationship("Alert", back_populates="fixture")
 
 
 class Snapshot(Base):
     """Match statistics snapshot at a specific minute."""
     __tablename__ = "snapshots"
     
-    id = Column(Integer, primary_key=True, index=True)
-    fixture_id = Column(Integer, ForeignKey("fixtures.fixture_id"), index=True, nullable=False)
-    minute = Column(Integer, nullable=False)
-    timestamp = Column(DateTime, nullable=False)
+    id = Column(BigId, primary_key=True)
+    ts_utc = Column(DateTime(timezone=True), nullable=False, server_default=func.current_timestamp())
+    fixture_id = Column(BigInteger, ForeignKey("fixtures.fixture_id", ondelete="CASCADE"), nullable=False)
+    minute = Column(Integer, server_default="0")
     
     # Home team statistics
-    home_shots = Column(Integer)
-    home_sog = Column(Integer)  # Shots on goal
-    home_soff = Column(Integer)  # Shots off goal
-    home_corners = Column(Integer)
-    home_fouls = Column(Integer)
-    home_yellow = Column(Integer)
-    home_red = Column(Integer)
-    home_saves = Column(Integer)
-    home_poss = Column(Float)  # Possession percentage
+    home_sog = Column(Integer, server_default="0")  # Shots on goal
+    home_shots = Column(Integer, server_default="0")
+    home_corners = Column(Integer, server_default="0")
+    home_saves = Column(Integer, server_default="0")
+    home_poss = Column(Float, server_default="0")  # Possession percentage
     
     # Away team statistics
-    away_shots = Column(Integer)
-    away_sog = Column(Integer)
-    away_soff = Column(Integer)
-    away_corners = Column(Integer)
-    away_fouls = Column(Integer)
-    away_yellow = Column(Integer)
-    away_red = Column(Integer)
-    away_saves = Column(Integer)
-    away_poss = Column(Float)
-    
-    # Score at this minute
-    home_score = Column(Integer)
-    away_score = Column(Integer)
+    away_sog = Column(Integer, server_default="0")
+    away_shots = Column(Integer, server_default="0")
+    away_corners = Column(Integer, server_default="0")
+    away_saves = Column(Integer, server_default="0")
+    away_poss = Column(Float, server_default="0")
     
     # Relationship
     fixture = relationship("Fixture", back_populates="snapshots")
@@ -92,32 +80,64 @@ class OddsLive(Base):
     """Live betting odds for fixtures."""
     __tablename__ = "odds_live"
     
-    id = Column(Integer, primary_key=True, index=True)
-    fixture_id = Column(Integer, ForeignKey("fixtures.fixture_id"), index=True, nullable=False)
-    bookmaker = Column(String)
-    market = Column(String)
-    
-    timestamp = Column(DateTime, nullable=False)
-    minute = Column(Integer)
-    
-    # Odds values
-    home_odds = Column(Float)
-    draw_odds = Column(Float)
-    away_odds = Column(Float)
+    id = Column(BigId, primary_key=True)
+    ts_utc = Column(DateTime(timezone=True), nullable=False, server_default=func.current_timestamp())
+    fixture_id = Column(BigInteger, ForeignKey("fixtures.fixture_id", ondelete="CASCADE"), nullable=False)
     
     # Over/Under
-    over_under_line = Column(Float)
+    goalline = Column(Float)
     over_odds = Column(Float)
     under_odds = Column(Float)
     
+    # 1x2 (moneyline)
+    home_ml = Column(Float)
+    draw_ml = Column(Float)
+    away_ml = Column(Float)
+    
     # Relationship
     fixture = relationship("Fixture", back_populates="odds")
 
 
+class Alert(Base):
+    """Alert raised for a fixture (e.g. GOAL_SOON, WIN_TREND)."""
+    __tablename__ = "alerts"
+    
+    id = Column(BigId, primary_key=True)
+    ts_utc = Column(DateTime(timezone=True), nullable=False, server_default=func.current_timestamp())
+    fixture_id = Column(BigInteger, ForeignKey("fixtures.fixture_id", ondelete="CASCADE"), nullable=False)
+    kind = Column(Text, nullable=False)
+    message = Column(Text, nullable=False)
+    details = Column(Text)  # JSON as text
+    
+    # Relationship
+    fixture = relationship("Fixture", back_populates="alerts")
+
+
+Index("ix_snap_fixture_ts", Snapshot.fixture_id, Snapshot.ts_utc)
+Index("ix_odds_fixture_ts", OddsLive.fixture_id, OddsLive.ts_utc)
+Index("ix_alerts_fixture_ts", Alert.fixture_id, Alert.ts_utc.desc())
+
+
+def check_schema(bind=None):
+    """Existing tables must carry the schema.sql columns (old ORM layout: home_team_id, timestamp, ...)."""
+    insp = inspect(bind or engine)
+    existing = set(insp.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        have = {c["name"] for c in insp.get_columns(table.name)}
+        missing = [c.name for c in table.columns if c.name not in have]
+        if missing:
+            raise RuntimeError(
+                f"Tabelle {table.name} hat nicht das Schema aus schema.sql (fehlt: {', '.join(missing)}) – "
+                f"alte ORM-Tabellen migrieren: python tools/migrate_orm_schema.py")
+
+
 # Create all tables
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables (schema.sql layout) and verify existing ones."""
     Base.metadata.create_all(bind=engine)
+    check_schema()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,851 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsamer API-Football Client (v3) für alle Entry-Points.
+- genau EIN keep-alive Connection-Pool pro Prozess (aiohttp für die Loops,
+  requests.Session für Cron-Worker / Dashboard)
+- Minuten- und Tagesbudget pro API-Key, prozessübergreifend über eine
+  SQLite-Datei geteilt (live_monitor, betbot, Worker sehen den Traffic der anderen)
+- einheitliches Retry-Verhalten (429 / 5xx / Netzfehler), begrenzt, mit Jitter-Backoff
+- Rate per AIMD aus den Rate-Limit-Headern (lib.rate_control) statt fester Sleeps
+- Key-Pool: mehrere API-Keys (API_KEYS + Einzel-Keys), jeder Request geht an den Key
+  mit dem meisten Spielraum, erschöpfte Keys fallen aus der Rotation
+- Prioritäts-Lanes im Minutenbudget (odds_live > fixtures_live > stats > predictions > backfill)
+- Circuit Breaker je Endpoint + Param-Klasse (lib.circuit_breaker): offene Endpoints
+  kosten kein Budget mehr, get_json wirft dann CircuitOpen
+- persistenter Response-Cache mit TTL pro Endpoint (lib.http_cache)
+- Streaming: iter_json / iter_json_sync liefern response[]-Einträge einzeln (lib.json_stream)
+- async: große Bodies werden im Offload-Pool dekodiert (+ optional get_json(parse=)),
+  damit der Event-Loop nicht blockiert (lib.offload)
+- Telemetrie je Endpoint (lib.telemetry): Latenz-Histogramm, Status, Bytes, Retries,
+  Rate-Limit-Header – Prometheus über TELEMETRY_PORT + periodische Summary-Zeile
+- Kosten-Ledger je Spiel/Liga (lib.cost_ledger), Report: python -m lib.cost_ledger
+- Singleflight: identische gleichzeitige Requests = 1 Upstream-Call (lib.singleflight),
+  prozessübergreifend über Cache-Lease + kurzes Frische-Fenster
+
+Nutzung (async):
+    from lib.api_client import get_client
+    api = get_client()
+    data = await api.get_json("/fixtures", {"live": "all"})
+
+Nutzung (sync):
+    from lib.api_client import get_json_sync, get_odds_sync
+    data = get_json_sync("/fixtures", {"date": "2025-10-26"})
+    odds = get_odds_sync({"date": "2025-10-26"}, bets=(1,))   # nur Match Winner
+"""
+
+import os, time, asyncio, sqlite3, hashlib, threading, datetime as dt
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from lib.circuit_breaker import CircuitBreaker, CircuitOpen
+from lib.cost_ledger import get_ledger
+from lib.fastjson import loads as json_loads
+from lib.http_cache import ResponseCache, coalesce_window
+from lib.json_stream import CHUNK_SIZE, aiter_items, iter_items
+from lib.odds_utils import merge_odds
+from lib.offload import decode_body, no_result, run_cpu
+from lib.rate_control import RateController, retry_after
+from lib.singleflight import SingleFlight, SingleFlightSync
+from lib.telemetry import TELEMETRY
+
+BASE_DEFAULT = "https://v3.football.api-sports.io"
+ROOT_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RETRY_STATUS  = (500, 502, 503, 504)
+MAX_TRIES     = 3   # 5xx / Netzfehler
+MAX_429_TRIES = 5
+
+def ts() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def key_id(api_key: str) -> str:
+    """Kurzer Fingerprint des Keys (der Key selbst landet nie in der Quota-DB)."""
+    return hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+def endpoint(path: str) -> str:
+    return path if path.startswith("http") else "/" + path.lstrip("/")
+
+def flight_key(ep: str, params: Optional[Dict[str, str]]):
+    return ep, tuple(sorted((params or {}).items()))
+
+def clean_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """None-Werte raus, alles als str (aiohttp akzeptiert keine int/bool)."""
+    if not params:
+        return None
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+# Lanes in Prioritätsreihenfolge; Gewicht = reservierter Anteil am Minutenbudget (%)
+LANES = ("odds_live", "fixtures_live", "stats", "predictions", "backfill")
+LANE_WEIGHTS_DEFAULT = "odds_live:10,fixtures_live:10,stats:50,predictions:20,backfill:10"
+
+def lane_weights() -> Dict[str, float]:
+    """API_LANE_WEIGHTS="odds_live:10,fixtures_live:10,..." → normierte Anteile."""
+    raw = os.getenv("API_LANE_WEIGHTS") or LANE_WEIGHTS_DEFAULT
+    w = {lane: 0.0 for lane in LANES}
+    for part in raw.split(","):
+        name, _, val = part.partition(":")
+        if name.strip() in w:
+            try:
+                w[name.strip()] = max(0.0, float(val))
+            except ValueError:
+                pass
+    total = sum(w.values()) or 1.0
+    return {lane: v / total for lane, v in w.items()}
+
+def lane_for(ep: str, params: Optional[Dict[str, str]]) -> str:
+    """Default-Lane je Endpoint; Aufrufer können per get_json(..., lane=) übersteuern."""
+    keys = set((params or {}).keys())
+    if ep == "/odds/live":
+        return "odds_live"
+    if ep == "/fixtures" and "live" in keys:
+        return "fixtures_live"
+    if ep == "/fixtures/statistics" or (ep == "/fixtures" and "ids" in keys):
+        return "stats"
+    if ep in ("/predictions", "/odds"):
+        return "predictions"
+    return "backfill"
+
+class QuotaExhausted(Exception):
+    """Tagesbudget für den API-Key aufgebraucht."""
+
+# ========= Quota Budget =========
+class QuotaBudget:
+    """
+    Minuten- und Tagesbudget pro API-Key.
+    Zähler liegen in einer SQLite-Datei (WAL), damit alle Prozesse auf dem Host
+    dasselbe Budget verbrauchen. Minute = Wanduhr-Minute, Tag = UTC-Tag
+    (API-Football setzt das Tageskontingent um 00:00 UTC zurück).
+
+    Lanes: jede Lane hat einen reservierten Anteil am Minutenbudget. Innerhalb
+    der Reserve wird sofort gebucht. Darüber hinaus darf eine Lane leihen, solange
+    die noch ungenutzten Reserven der HÖHEREN Lanes frei bleiben – dieser Schutz
+    schmilzt linear mit dem Minutenfenster, d.h. was oben bis kurz vor Ende der
+    Minute liegen bleibt, können die unteren Lanes aufbrauchen. Höhere Lanes
+    warten dagegen nie auf Reserven niedrigerer Lanes.
+    """
+    def __init__(self, key: str, per_minute: int, per_day: int, min_gap: float = 0.0, path: Optional[str] = None):
+        self.key = key
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.min_gap = min_gap
+        self.path = path or os.getenv("API_QUOTA_DB") or os.path.join(ROOT_DIR, "storage", "api_quota.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.weights = lane_weights()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            c = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS api_quota (
+                  key_id  TEXT NOT NULL,
+                  window  TEXT NOT NULL,
+                  bucket  TEXT NOT NULL,
+                  used    INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (key_id, window)
+                )
+            """)
+            self._conn = c
+        return self._conn
+
+    @staticmethod
+    def _buckets(now: float):
+        day = dt.datetime.fromtimestamp(now, dt.timezone.utc).date().isoformat()
+        return str(int(now // 60)), day
+
+    def _used(self, c: sqlite3.Connection, window: str, bucket: str) -> int:
+        row = c.execute("SELECT bucket, used FROM api_quota WHERE key_id=? AND window=?",
+                        (self.key, window)).fetchone()
+        if not row or row[0] != bucket:
+            return 0
+        return int(row[1])
+
+    def _bump(self, c: sqlite3.Connection, window: str, bucket: str):
+        c.execute("""
+            INSERT INTO api_quota (key_id, window, bucket, used) VALUES (?, ?, ?, 1)
+            ON CONFLICT (key_id, window) DO UPDATE
+               SET used = CASE WHEN bucket = excluded.bucket THEN used + 1 ELSE 1 END,
+                   bucket = excluded.bucket
+        """, (self.key, window, bucket))
+
+    def reserved(self, lane: str) -> float:
+        return self.per_minute * self.weights.get(lane, 0.0)
+
+    def _room(self, c: sqlite3.Connection, lane: str, b_min: str, left: float) -> float:
+        """Wie viele Requests `lane` in dieser Minute noch buchen darf (ohne Tagesbudget)."""
+        total = self._used(c, "minute", b_min)
+        own = self.reserved(lane) - self._used(c, f"minute:{lane}", b_min)
+        # leihen – ungenutzte Reserven höherer Lanes (abschmelzend) bleiben geschützt
+        higher = LANES[:LANES.index(lane)] if lane in LANES else LANES
+        protected = sum(max(0.0, self.reserved(h) - self._used(c, f"minute:{h}", b_min)) for h in higher) * left
+        return min(self.per_minute - total, max(own, self.per_minute - total - protected))
+
+    def reserve(self, lane: str = "backfill") -> float:
+        """Bucht 1 Request in `lane`. 0.0 = gebucht, sonst Sekunden bis zum nächsten Versuch."""
+        now = time.time()
+        b_min, b_day = self._buckets(now)
+        to_next_min = max(0.05, 60 - (now % 60))
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                if self._used(c, "day", b_day) >= self.per_day:
+                    c.execute("ROLLBACK")
+                    raise QuotaExhausted(f"Tagesbudget {self.per_day} für Key {self.key} erreicht")
+                if self._used(c, "minute", b_min) >= self.per_minute:
+                    c.execute("ROLLBACK")
+                    return to_next_min
+                if self._room(c, lane, b_min, to_next_min / 60.0) <= 0:
+                    c.execute("ROLLBACK")
+                    return min(1.0, to_next_min)
+                self._bump(c, "minute", b_min)
+                self._bump(c, f"minute:{lane}", b_min)
+                self._bump(c, "day", b_day)
+                c.execute("COMMIT")
+            except sqlite3.Error:
+                c.execute("ROLLBACK")
+                raise
+        return 0.0
+
+    def spare(self, lane: str = "backfill") -> int:
+        """Freie Requests für `lane` JETZT (ohne zu warten), Minuten- und Tagesbudget."""
+        now = time.time()
+        b_min, b_day = self._buckets(now)
+        with self._lock:
+            c = self._db()
+            room = self._room(c, lane, b_min, max(0.05, 60 - (now % 60)) / 60.0)
+            day_left = self.per_day - self._used(c, "day", b_day)
+        return max(0, int(min(room, day_left)))
+
+    def adopt_limits(self, minute_limit: Optional[int], day_limit: Optional[int], day_remaining: Optional[int]):
+        """Echte Limits aus den Response-Headern übernehmen (ENV-Werte gelten nur bis dahin)."""
+        if minute_limit:
+            self.per_minute = minute_limit
+        if day_limit:
+            self.per_day = day_limit
+        if day_limit and day_remaining is not None:
+            # Tageszähler an den Server angleichen (Traffic anderer Hosts / Tools zählt mit)
+            b_day = self._buckets(time.time())[1]
+            used = max(0, day_limit - day_remaining)
+            with self._lock:
+                self._db().execute("""
+                    INSERT INTO api_quota (key_id, window, bucket, used) VALUES (?, 'day', ?, ?)
+                    ON CONFLICT (key_id, window) DO UPDATE
+                       SET used = CASE WHEN bucket = excluded.bucket THEN MAX(used, excluded.used) ELSE excluded.used END,
+                           bucket = excluded.bucket
+                """, (self.key, b_day, used))
+
+    def _gap_wait(self) -> float:
+        # Mindestabstand pro Prozess: Slots werden fortlaufend vergeben
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_gap
+        return slot - now
+
+    async def acquire(self, lane: str = "backfill"):
+        gap = self._gap_wait()
+        if gap > 0:
+            await asyncio.sleep(gap)
+        t0 = time.monotonic()
+        while True:
+            # BEGIN IMMEDIATE wartet bis zu 10 s auf andere Prozesse – nicht im Event-Loop
+            wait = await asyncio.to_thread(self.reserve, lane)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        self._log_wait(lane, time.monotonic() - t0)
+
+    def acquire_sync(self, lane: str = "backfill"):
+        gap = self._gap_wait()
+        if gap > 0:
+            time.sleep(gap)
+        t0 = time.monotonic()
+        while True:
+            wait = self.reserve(lane)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        self._log_wait(lane, time.monotonic() - t0)
+
+    def _log_wait(self, lane: str, waited: float):
+        if waited >= 1.0:
+            print(f"[{ts()}] Minutenlimit ({self.per_minute}/min, alle Prozesse) – Lane {lane} wartete {waited:.1f}s")
+
+    def day_left(self) -> int:
+        with self._lock:
+            return self.per_day - self._used(self._db(), "day", self._buckets(time.time())[1])
+
+    def stats(self) -> Dict[str, Any]:
+        b_min, b_day = self._buckets(time.time())
+        with self._lock:
+            c = self._db()
+            return {
+                "min_used": self._used(c, "minute", b_min), "min_cap": self.per_minute,
+                "day_used": self._used(c, "day", b_day),    "day_cap": self.per_day,
+                "lanes": {lane: (self._used(c, f"minute:{lane}", b_min), round(self.reserved(lane)))
+                          for lane in LANES},
+            }
+
+# ========= Key-Pool =========
+def env_keys() -> List[str]:
+    """API_KEYS (Komma-Liste) + die Einzel-Keys der verschiedenen .env-Dateien, ohne Duplikate."""
+    raw = (os.getenv("API_KEYS") or "").split(",")
+    raw += [os.getenv("API_SPORTS_KEY"), os.getenv("APIFOOTBALL_KEY"), os.getenv("API_FOOTBALL_KEY")]
+    out: List[str] = []
+    for k in raw:
+        k = (k or "").strip()
+        if k and k not in out:
+            out.append(k)
+    return out
+
+class KeySlot:
+    """Ein API-Key mit eigenem Budget (Quota-DB) und eigener Ratensteuerung (Header gelten pro Key)."""
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.id = key_id(api_key)
+        self.rate = RateController()
+        self.budget = QuotaBudget(
+            self.id,
+            per_minute=_env_int("GLOBAL_MAX_REQUESTS_PER_MINUTE", 90),
+            per_day=_env_int("GLOBAL_MAX_REQUESTS_PER_DAY", 7500),
+            min_gap=self.rate.interval(),
+        )
+        self.out = False       # Tagesbudget weg (kommt am nächsten UTC-Tag zurück)
+        self.disabled = False  # 401: Key ungültig, für diesen Prozess raus
+
+class KeyPool:
+    """
+    Verteilt Requests auf mehrere Keys: jeder Request geht an den Key mit dem
+    meisten Spielraum (freie Requests der Lane in dieser Minute, dann Resttag).
+    Erschöpfte Keys fallen aus der Rotation. Nach außen verhält sich der Pool
+    wie ein QuotaBudget (acquire/spare/stats), die Zahlen sind über alle Keys summiert.
+    """
+    def __init__(self, keys: List[str]):
+        self.slots = [KeySlot(k) for k in keys] or [KeySlot("")]
+
+    def _active(self) -> List[KeySlot]:
+        active = []
+        for s in self.slots:
+            if s.disabled:
+                continue
+            left = s.budget.day_left() > 0
+            if not left and not s.out:
+                print(f"[{ts()}] Key {s.id} Tagesbudget erschöpft – aus der Rotation")
+            elif left and s.out:
+                print(f"[{ts()}] Key {s.id} wieder in der Rotation")
+            s.out = not left
+            if left:
+                active.append(s)
+        return active
+
+    def pick(self, lane: str) -> KeySlot:
+        active = self._active()
+        if not active:
+            raise QuotaExhausted(f"Tagesbudget aller {len(self.slots)} Keys erreicht")
+        if len(active) == 1:
+            return active[0]
+        return max(active, key=lambda s: (s.budget.spare(lane), s.budget.day_left()))
+
+    def disable(self, slot: KeySlot, reason: str) -> bool:
+        """True = es bleiben andere Keys zum Weitermachen."""
+        if len([s for s in self.slots if not s.disabled]) <= 1:
+            return False
+        slot.disabled = True
+        print(f"[{ts()}] Key {slot.id} deaktiviert ({reason})")
+        return True
+
+    async def acquire(self, lane: str = "backfill") -> KeySlot:
+        while True:
+            slot = await asyncio.to_thread(self.pick, lane)
+            try:
+                await slot.budget.acquire(lane)
+                return slot
+            except QuotaExhausted:
+                continue
+
+    def acquire_sync(self, lane: str = "backfill") -> KeySlot:
+        while True:
+            slot = self.pick(lane)
+            try:
+                slot.budget.acquire_sync(lane)
+                return slot
+            except QuotaExhausted:
+                continue
+
+    def spare(self, lane: str = "backfill") -> int:
+        return sum(s.budget.spare(lane) for s in self.slots if not s.disabled)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"min_used": 0, "min_cap": 0, "day_used": 0, "day_cap": 0,
+                               "lanes": {lane: (0, 0) for lane in LANES}, "keys": 0}
+        for s in self.slots:
+            if s.disabled:
+                continue
+            st = s.budget.stats()
+            for k in ("min_used", "min_cap", "day_used", "day_cap"):
+                out[k] += st[k]
+            for lane, (u, r) in st["lanes"].items():
+                pu, pr = out["lanes"][lane]
+                out["lanes"][lane] = (pu + u, pr + r)
+            out["keys"] += 0 if s.out else 1
+        return out
+
+class PoolRate:
+    """Summen-Sicht auf die RateController aller Keys (für Loop-Logs: http.rate.stats())."""
+    def __init__(self, pool: KeyPool):
+        self.pool = pool
+
+    def stats(self) -> Dict[str, Any]:
+        rs = [s.rate.stats() for s in self.pool.slots if not s.disabled and not s.out]
+        known = [r["day_remaining"] for r in rs if r["day_remaining"] is not None]
+        return {
+            "rate": round(sum(r["rate"] for r in rs), 1),
+            "day_remaining": sum(known) if known else None,
+            "throttled": sum(r["throttled"] for r in rs),
+        }
+
+# ========= Client =========
+class ApiClient:
+    """
+    Ein Client pro Prozess (siehe get_client()).
+    Config kommt aus ENV und wird erst beim Erzeugen gelesen, damit load_dotenv()
+    im Entry-Point auch nach dem Import noch greift.
+    """
+    def __init__(self, api_key: Optional[str] = None, base: Optional[str] = None,
+                 user_agent: str = "BetBot/2.0", pool_limit: Optional[int] = None):
+        # expliziter Key = genau dieser Key, sonst alle Keys aus ENV (API_KEYS, API_SPORTS_KEY, ...)
+        self.keys = KeyPool([api_key] if api_key else env_keys())
+        self.base = (base or os.getenv("APIFOOTBALL_BASE") or BASE_DEFAULT).rstrip("/")
+        self.user_agent = user_agent
+        self.pool_limit = pool_limit or _env_int("API_POOL_LIMIT", 16)
+        self.budget = self.keys
+        self.rate = PoolRate(self.keys)
+        self.cache = ResponseCache()
+        self.breaker = CircuitBreaker()
+        self.telemetry = TELEMETRY
+        self.telemetry.gauges = self._quota_gauges
+        self.telemetry.serve_from_env()
+        self.costs = get_ledger()
+        self.lease_sec = _env_float("API_LEASE_SEC", 10.0)
+        self.flight = SingleFlight(coalesce_window())
+        self.flight_sync = SingleFlightSync(coalesce_window())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._sync: Optional[requests.Session] = None
+        self._revalidating: set = set()
+        self._bg_tasks: set = set()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # der Key kommt pro Request dazu (KeySlot)
+        return {
+            "Accept": "application/json",
+            "User-Agent": self.user_agent,
+        }
+
+    def url(self, path: str) -> str:
+        if path.startswith("http"):
+            return path
+        return f"{self.base}/{path.lstrip('/')}"
+
+    # ---- async ----
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=50),
+                connector=aiohttp.TCPConnector(limit=self.pool_limit, ttl_dns_cache=300, keepalive_timeout=60),
+                headers=self.headers,
+            )
+        return self._session
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       timeout: float = 40, cache: bool = True, lane: Optional[str] = None,
+                       parse: Optional[Callable[[dict], Any]] = None) -> Any:
+        """
+        parse: Transformation auf Modulebene (picklebar, z.B. lib.live_parse) – läuft bei großen
+        Bodies zusammen mit dem Decode im Offload-Pool (lib.offload), Ergebnis = parse(data).
+        """
+        ep, params = endpoint(path), clean_params(params)
+        lane = lane or lane_for(ep, params)
+        key = flight_key(ep, params) + ((parse.__module__, parse.__qualname__) if parse else ())
+        return await self.flight.do(key, lambda: self._get_json(ep, params, timeout, cache, lane, parse))
+
+    async def get_odds(self, params: Dict[str, Any], bets: Sequence[int] = (), bookmakers: Sequence[int] = (),
+                       timeout: float = 40) -> dict:
+        """
+        /odds nur für die angefragten Märkte/Bookies (serverseitig per bet=/bookmaker=),
+        ein Request je Kombination, Ergebnis zusammengeführt (lib.odds_utils.merge_odds).
+        Leere bets/bookmakers = ungefiltert.
+        """
+        calls = [dict(params, bet=b, bookmaker=bm) for b in (bets or [None]) for bm in (bookmakers or [None])]
+        return merge_odds(await asyncio.gather(*(self.get_json("/odds", p, timeout=timeout) for p in calls)))
+
+    async def _decode(self, body, parse=None):
+        # ohne parse käme der komplette Objektbaum zurück → kein Prozess-Pool (lib.offload.run_cpu)
+        return await run_cpu(len(body), decode_body, body, parse, reduces=parse is not None)
+
+    async def _get_json(self, ep: str, params: Optional[Dict[str, str]], timeout: float, cache: bool,
+                        lane: str, parse=None):
+        # Cache + Upstream liefern den rohen Body, dekodiert wird einmal am Ende (ggf. im Pool)
+        cache = cache and self.cache.cacheable(ep, params)
+        claimed = False
+        if cache:
+            status, body = await asyncio.to_thread(self.cache.lookup, ep, params, raw=True)
+            if status == "fresh":
+                return (await self._decode(body, parse))[0]
+            if status == "stale":
+                self._revalidate(ep, params, timeout, lane)
+                return (await self._decode(body, parse))[0]
+            claimed = await asyncio.to_thread(self.cache.claim, ep, params, self.lease_sec)
+            if not claimed:
+                body = await self._await_peer(ep, params)
+                if body is not None:
+                    return (await self._decode(body, parse))[0]
+        try:
+            body = await self._fetch(ep, params, timeout, lane)
+            data, errors = await self._decode(body, parse)
+            if cache and not errors:
+                await asyncio.to_thread(self.cache.store_raw, ep, params, body)
+            return data
+        finally:
+            if claimed:
+                await asyncio.to_thread(self.cache.release, ep, params)
+
+    async def _await_peer(self, ep: str, params: Optional[Dict[str, str]]) -> Optional[str]:
+        """Anderer Prozess holt denselben Key – auf sein Ergebnis im Cache warten."""
+        deadline = time.monotonic() + self.lease_sec
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+            status, body = await asyncio.to_thread(self.cache.lookup, ep, params, count=False, raw=True)
+            if status != "miss":
+                return body
+        return None
+
+    def _revalidate(self, ep: str, params: Optional[Dict[str, str]], timeout: float, lane: str):
+        key = flight_key(ep, params)
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        async def _run():
+            try:
+                body = await self._fetch(ep, params, timeout, lane)
+                if not (await self._decode(body, no_result))[1]:
+                    await asyncio.to_thread(self.cache.store_raw, ep, params, body)
+            except Exception as e:
+                print(f"[{ts()}] Revalidate {ep} fehlgeschlagen: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        task = asyncio.create_task(_run())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    def _quota_gauges(self) -> Dict[str, float]:
+        s = self.budget.stats()
+        return {"min_used": s["min_used"], "min_cap": s["min_cap"], "day_used": s["day_used"],
+                "day_cap": s["day_cap"], "rate_per_min": self.rate.stats()["rate"]}
+
+    def _account(self, path: str, params: Optional[Dict[str, str]], lane: str, status: int,
+                 t0: float, nbytes: int):
+        """Jede Antwort kostet Quota: Telemetrie + Kosten-Ledger (Netzfehler nur Telemetrie)."""
+        self.telemetry.observe(path, params, status, time.perf_counter() - t0, nbytes, lane)
+        self.costs.record(path, params, nbytes)
+
+    def _observe(self, slot: KeySlot, status: int, headers, adopt: bool = True):
+        """adopt=False: Limits nicht in die Quota-DB schreiben (async: macht der Aufrufer im Thread)."""
+        self.telemetry.ratelimit(slot.id, headers)
+        slot.rate.on_response(status, headers)
+        slot.budget.min_gap = slot.rate.interval()
+        if adopt:
+            self._adopt(slot)
+
+    @staticmethod
+    def _adopt(slot: KeySlot):
+        slot.budget.adopt_limits(slot.rate.minute_limit, slot.rate.day_limit, slot.rate.day_remaining)
+
+    async def _fetch(self, path: str, params: Optional[Dict[str, str]], timeout: float,
+                     lane: str = "backfill", stream: bool = False):
+        self.breaker.before(path, params)
+        try:
+            data = await self._send(path, params, timeout, lane, stream)
+        except aiohttp.ClientResponseError as e:
+            self.breaker.record(path, params, e.status)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.record(path, params, None)
+            raise
+        self.breaker.record(path, params, 200)
+        return data
+
+    async def _send(self, path: str, params: Optional[Dict[str, str]], timeout: float, lane: str,
+                    stream: bool = False):
+        """Roher Body (bytes); stream=True: die offene Response, der Aufrufer liest und ruft release()."""
+        url = self.url(path)
+        tries = 0
+        while True:
+            tries += 1
+            slot = await self.keys.acquire(lane)
+            r = None
+            t0 = time.perf_counter()
+            try:
+                r = await self.session().get(url, params=params, headers={"x-apisports-key": slot.api_key},
+                                             timeout=aiohttp.ClientTimeout(total=timeout))
+                self._observe(slot, r.status, r.headers, adopt=False)
+                await asyncio.to_thread(self._adopt, slot)
+                if r.status >= 400 or stream:
+                    self._account(path, params, lane, r.status, t0, r.content_length or 0)
+                if r.status == 401 and self.keys.disable(slot, f"401 auf {path}"):
+                    self.telemetry.retry(path, params, "401")
+                    continue
+                if r.status == 429 and tries < MAX_429_TRIES:
+                    self.telemetry.retry(path, params, "429")
+                    wait = slot.rate.backoff(tries, retry_after(r.headers))
+                    print(f"[{ts()}] 429 {path} key {slot.id} – backoff {wait:.1f}s (rate {slot.rate.stats()['rate']}/min)")
+                    await asyncio.sleep(wait)
+                    continue
+                r.raise_for_status()
+                if stream:
+                    r, open_r = None, r
+                    return open_r
+                body = await r.read()
+                self._account(path, params, lane, r.status, t0, len(body))
+                return body
+            except aiohttp.ClientResponseError as e:
+                if e.status in RETRY_STATUS and tries < MAX_TRIES:
+                    self.telemetry.retry(path, params, "5xx")
+                    wait = slot.rate.backoff(tries)
+                    print(f"[{ts()}] Serverfehler {e.status} {path} – retry in {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                    continue
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.telemetry.observe(path, params, "error", time.perf_counter() - t0, 0, lane)
+                if tries < MAX_TRIES:
+                    self.telemetry.retry(path, params, "net")
+                    wait = slot.rate.backoff(tries)
+                    print(f"[{ts()}] Netzfehler {path}: {e!r} – retry in {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                    continue
+                raise
+            finally:
+                if r is not None:
+                    r.release()
+
+    async def iter_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 40,
+                        lane: Optional[str] = None, head: Optional[Dict[str, Any]] = None):
+        """
+        response[]-Einträge einzeln, während der Body noch lädt (lib.json_stream).
+        Für große, nicht gecachte Antworten (/odds?date, /fixtures?date): ohne Cache und
+        Singleflight, Budget/Retry/Breaker wie get_json. Übrige Felder landen in `head`.
+        """
+        ep, params = endpoint(path), clean_params(params)
+        r = await self._fetch(ep, params, timeout, lane or lane_for(ep, params), stream=True)
+        try:
+            async for item in aiter_items(r.content.iter_chunked(CHUNK_SIZE), head=head):
+                yield item
+        finally:
+            r.release()
+
+    async def close(self):
+        for task in list(self._bg_tasks):
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ---- sync ----
+    def sync_session(self) -> requests.Session:
+        if self._sync is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_limit)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update(self.headers)
+            self._sync = s
+        return self._sync
+
+    def get_json_sync(self, path: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: float = 60, cache: bool = True, lane: Optional[str] = None) -> dict:
+        ep, params = endpoint(path), clean_params(params)
+        lane = lane or lane_for(ep, params)
+        return self.flight_sync.do(flight_key(ep, params), lambda: self._get_json_sync(ep, params, timeout, cache, lane))
+
+    def get_odds_sync(self, params: Dict[str, Any], bets: Sequence[int] = (), bookmakers: Sequence[int] = (),
+                      timeout: float = 60) -> dict:
+        calls = [dict(params, bet=b, bookmaker=bm) for b in (bets or [None]) for bm in (bookmakers or [None])]
+        return merge_odds([self.get_json_sync("/odds", p, timeout=timeout) for p in calls])
+
+    def _get_json_sync(self, ep: str, params: Optional[Dict[str, str]], timeout: float, cache: bool,
+                       lane: str) -> dict:
+        cache = cache and self.cache.cacheable(ep, params)
+        claimed = False
+        if cache:
+            status, data = self.cache.lookup(ep, params)
+            if status == "fresh":
+                return data
+            if status == "stale":
+                self._revalidate_sync(ep, params, timeout, lane)
+                return data
+            claimed = self.cache.claim(ep, params, self.lease_sec)
+            if not claimed:
+                data = self._await_peer_sync(ep, params)
+                if data is not None:
+                    return data
+        try:
+            data = self._fetch_sync(ep, params, timeout, lane)
+            if cache:
+                self.cache.store(ep, params, data)
+            return data
+        finally:
+            if claimed:
+                self.cache.release(ep, params)
+
+    def _await_peer_sync(self, ep: str, params: Optional[Dict[str, str]]) -> Optional[dict]:
+        deadline = time.monotonic() + self.lease_sec
+        while time.monotonic() < deadline:
+            time.sleep(0.2)
+            status, data = self.cache.lookup(ep, params, count=False)
+            if status != "miss":
+                return data
+        return None
+
+    def _revalidate_sync(self, ep: str, params: Optional[Dict[str, str]], timeout: float, lane: str):
+        key = flight_key(ep, params)
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        def _run():
+            try:
+                self.cache.store(ep, params, self._fetch_sync(ep, params, timeout, lane))
+            except Exception as e:
+                print(f"[{ts()}] Revalidate {ep} fehlgeschlagen: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        # kein Daemon: kurzlebige Cron-Worker warten beim Exit auf den Refresh
+        threading.Thread(target=_run, daemon=False).start()
+
+    def _fetch_sync(self, path: str, params: Optional[Dict[str, str]], timeout: float,
+                    lane: str = "backfill", stream: bool = False):
+        self.breaker.before(path, params)
+        try:
+            data = self._send_sync(path, params, timeout, lane, stream)
+        except requests.HTTPError as e:
+            self.breaker.record(path, params, e.response.status_code if e.response is not None else None)
+            raise
+        except (requests.ConnectionError, requests.Timeout):
+            self.breaker.record(path, params, None)
+            raise
+        self.breaker.record(path, params, 200)
+        return data
+
+    def _send_sync(self, path: str, params: Optional[Dict[str, str]], timeout: float, lane: str,
+                   stream: bool = False):
+        url = self.url(path)
+        tries = 0
+        while True:
+            tries += 1
+            slot = self.keys.acquire_sync(lane)
+            r = None
+            t0 = time.perf_counter()
+            try:
+                r = self.sync_session().get(url, params=params, headers={"x-apisports-key": slot.api_key},
+                                            timeout=timeout, stream=stream)
+                self._observe(slot, r.status_code, r.headers)
+                nbytes = int(r.headers.get("Content-Length") or 0) if stream else len(r.content)
+                self._account(path, params, lane, r.status_code, t0, nbytes)
+                if r.status_code == 401 and self.keys.disable(slot, f"401 auf {path}"):
+                    self.telemetry.retry(path, params, "401")
+                    continue
+                if r.status_code == 429 and tries < MAX_429_TRIES:
+                    self.telemetry.retry(path, params, "429")
+                    wait = slot.rate.backoff(tries, retry_after(r.headers))
+                    print(f"[{ts()}] 429 {path} key {slot.id} – backoff {wait:.1f}s (rate {slot.rate.stats()['rate']}/min)")
+                    time.sleep(wait)
+                    continue
+                r.raise_for_status()
+                if stream:
+                    r, open_r = None, r
+                    return open_r
+                return json_loads(r.content)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in RETRY_STATUS and tries < MAX_TRIES:
+                    self.telemetry.retry(path, params, "5xx")
+                    wait = slot.rate.backoff(tries)
+                    print(f"[{ts()}] Serverfehler {status} {path} – retry in {wait:.1f}s")
+                    time.sleep(wait)
+                    continue
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.telemetry.observe(path, params, "error", time.perf_counter() - t0, 0, lane)
+                if tries < MAX_TRIES:
+                    self.telemetry.retry(path, params, "net")
+                    wait = slot.rate.backoff(tries)
+                    print(f"[{ts()}] Netzfehler {path}: {e!r} – retry in {wait:.1f}s")
+                    time.sleep(wait)
+                    continue
+                raise
+            finally:
+                if r is not None and stream:
+                    r.close()
+
+    def iter_json_sync(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 60,
+                       lane: Optional[str] = None, head: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Sync-Variante von iter_json."""
+        ep, params = endpoint(path), clean_params(params)
+        r = self._fetch_sync(ep, params, timeout, lane or lane_for(ep, params), stream=True)
+        try:
+            yield from iter_items(r.iter_content(CHUNK_SIZE), head=head)
+        finally:
+            r.close()
+
+    def iter_odds_sync(self, params: Dict[str, Any], bets: Sequence[int] = (), bookmakers: Sequence[int] = (),
+                       timeout: float = 60) -> Iterator[dict]:
+        """/odds-Einträge gestreamt; bei mehreren Markt-/Bookie-Kombinationen muss gemerged werden."""
+        if len(bets or [None]) * len(bookmakers or [None]) == 1:
+            p = dict(params, bet=(bets or [None])[0], bookmaker=(bookmakers or [None])[0])
+            yield from self.iter_json_sync("/odds", p, timeout=timeout)
+        else:
+            yield from self.get_odds_sync(params, bets, bookmakers, timeout).get("response", [])
+
+# ========= Prozess-Singleton =========
+_client: Optional[ApiClient] = None
+
+def get_client(**kwargs) -> ApiClient:
+    """Liefert den Client dieses Prozesses (kwargs greifen nur beim ersten Aufruf)."""
+    global _client
+    if _client is None:
+        _client = ApiClient(**kwargs)
+    return _client
+
+def get_json_sync(path: str, params: Optional[Dict[str, Any]] = None,
+                  timeout: float = 60, cache: bool = True, lane: Optional[str] = None) -> dict:
+    return get_client().get_json_sync(path, params, timeout=timeout, cache=cache, lane=lane)
+
+def get_odds_sync(params: Dict[str, Any], bets: Sequence[int] = (), bookmakers: Sequence[int] = (),
+                  timeout: float = 60) -> dict:
+    return get_client().get_odds_sync(params, bets=bets, bookmakers=bookmakers, timeout=timeout)
+
+def iter_odds_sync(params: Dict[str, Any], bets: Sequence[int] = (), bookmakers: Sequence[int] = (),
+                   timeout: float = 60) -> Iterator[dict]:
+    return get_client().iter_odds_sync(params, bets=bets, bookmakers=bookmakers, timeout=timeout)
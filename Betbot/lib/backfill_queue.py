@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Persistente Backfill-Queue für niedrig priorisierte API-Jobs (SQLite).
+Jobs laufen nur, wenn im aktuellen Minutenfenster Budget übrig ist
+(QuotaBudget.spare("backfill")) – die Live-Loops verlieren dadurch nichts,
+ungenutztes Kontingent wird trotzdem verbraucht.
+
+- Dedupe über (kind, key): derselbe Job steht höchstens einmal in der Queue
+- pop() vergibt einen Lease (not_before = jetzt + Lease), ein abgestürzter
+  Worker gibt den Job damit automatisch wieder frei
+- Fehler: Retry mit exponentiellem Backoff, nach BACKFILL_MAX_ATTEMPTS verworfen
+
+Jobs + Handler: workers/backfill_worker.py
+"""
+
+import os, json, time, sqlite3, threading
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+class Job:
+    __slots__ = ("id", "kind", "key", "payload", "attempts")
+
+    def __init__(self, id: int, kind: str, key: str, payload: Dict[str, Any], attempts: int):
+        self.id, self.kind, self.key, self.payload, self.attempts = id, kind, key, payload, attempts
+
+    def __repr__(self):
+        return f"{self.kind}:{self.key}"
+
+class BackfillQueue:
+    """priority: kleiner = früher (0 = vor allem anderen)."""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BACKFILL_DB") or os.path.join(ROOT_DIR, "storage", "backfill.db")
+        self.lease_sec = _env_int("BACKFILL_LEASE_SEC", 300)
+        self.max_attempts = _env_int("BACKFILL_MAX_ATTEMPTS", 5)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            c = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_jobs (
+                  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                  kind        TEXT NOT NULL,
+                  key         TEXT NOT NULL,
+                  payload     TEXT NOT NULL,
+                  priority    INTEGER NOT NULL DEFAULT 5,
+                  not_before  REAL NOT NULL DEFAULT 0,
+                  attempts    INTEGER NOT NULL DEFAULT 0,
+                  last_error  TEXT,
+                  created_at  REAL NOT NULL,
+                  UNIQUE (kind, key)
+                )
+            """)
+            c.execute("CREATE INDEX IF NOT EXISTS backfill_jobs_due ON backfill_jobs (priority, not_before)")
+            self._conn = c
+        return self._conn
+
+    def enqueue(self, kind: str, key: Any, payload: Dict[str, Any], priority: int = 5,
+                not_before: float = 0.0) -> bool:
+        """False = Job (kind, key) steht schon in der Queue."""
+        with self._lock:
+            cur = self._db().execute("""
+                INSERT OR IGNORE INTO backfill_jobs (kind, key, payload, priority, not_before, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (kind, str(key), json.dumps(payload), priority, not_before, time.time()))
+            return cur.rowcount > 0
+
+    def pop(self) -> Optional[Job]:
+        """Nächster fälliger Job (mit Lease) oder None."""
+        now = time.time()
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                row = c.execute("""
+                    SELECT id, kind, key, payload, attempts FROM backfill_jobs
+                    WHERE not_before <= ? ORDER BY priority, id LIMIT 1
+                """, (now,)).fetchone()
+                if row:
+                    c.execute("UPDATE backfill_jobs SET not_before=? WHERE id=?", (now + self.lease_sec, row[0]))
+                c.execute("COMMIT")
+            except sqlite3.Error:
+                c.execute("ROLLBACK")
+                raise
+        if not row:
+            return None
+        return Job(row[0], row[1], row[2], json.loads(row[3]), row[4])
+
+    def done(self, job: Job):
+        with self._lock:
+            self._db().execute("DELETE FROM backfill_jobs WHERE id=?", (job.id,))
+
+    def release(self, job: Job, delay: float = 0.0):
+        """Lease zurückgeben ohne Fehlversuch (z.B. Budget weg)."""
+        with self._lock:
+            self._db().execute("UPDATE backfill_jobs SET not_before=? WHERE id=?", (time.time() + delay, job.id))
+
+    def failed(self, job: Job, error: str) -> bool:
+        """True = wird später erneut versucht, False = verworfen."""
+        attempts = job.attempts + 1
+        with self._lock:
+            c = self._db()
+            if attempts >= self.max_attempts:
+                c.execute("DELETE FROM backfill_jobs WHERE id=?", (job.id,))
+                return False
+            c.execute("UPDATE backfill_jobs SET attempts=?, last_error=?, not_before=? WHERE id=?",
+                      (attempts, error[:500], time.time() + min(3600, 30 * 2 ** attempts), job.id))
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Je kind: wartend (fällig), später fällig / in Arbeit, mit Fehlversuchen."""
+        now = time.time()
+        out: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for kind, due, later, retry in self._db().execute("""
+                SELECT kind, SUM(not_before <= ?), SUM(not_before > ?), SUM(attempts > 0)
+                FROM backfill_jobs GROUP BY kind
+            """, (now, now)):
+                out[kind] = {"due": due or 0, "later": later or 0, "retry": retry or 0}
+        return out
+
+    def errors(self, limit: int = 10) -> List[str]:
+        with self._lock:
+            return [f"{k}:{key} ({a}x) {e}" for k, key, a, e in self._db().execute("""
+                SELECT kind, key, attempts, last_error FROM backfill_jobs
+                WHERE last_error IS NOT NULL ORDER BY id DESC LIMIT ?
+            """, (limit,))]
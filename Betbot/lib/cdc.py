@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Change-Data-Capture vor dem Schreiben (live_monitor, betbot, AiScore-Callback).
+Pro (Tabelle, Fixture) merkt sich der Prozess den Fingerprint der zuletzt geschriebenen
+Werte; eine Zeile geht nur in die DB, wenn sich die Werte geändert haben.
+
+- Werte ohne Zeitbezug übergeben (Quoten, Stats-Zähler – nicht Minute/Zeitstempel)
+- CDC_HEARTBEAT_SEC (Default 600, 0 = nie): unveränderte Zeile spätestens dann trotzdem
+  schreiben, damit Fenster-Auswertungen (WINDOW_SHORT/LONG_MIN) einen Stützpunkt finden
+- CDC=off schreibt wieder jede Zeile (Zählung läuft weiter)
+- summary(): geschrieben/gesamt und Skip-Quote je Tabelle seit Prozessstart (bzw. letztem reset)
+"""
+
+import os, time, collections
+from typing import Dict, Iterable, Optional, Tuple
+
+class ChangeFilter:
+    def __init__(self, heartbeat: Optional[float] = None, enabled: Optional[bool] = None):
+        self.heartbeat = heartbeat if heartbeat is not None else float(os.getenv("CDC_HEARTBEAT_SEC", "600"))
+        self.enabled = enabled if enabled is not None else os.getenv("CDC", "on").lower() not in ("0", "off", "false", "no")
+        self._last: Dict[Tuple[str, int], Tuple[int, float]] = {}   # (tabelle, fid) -> (fingerprint, monotonic)
+        self.written: Dict[str, int] = collections.Counter()
+        self.skipped: Dict[str, int] = collections.Counter()
+
+    def changed(self, table: str, fid: int, values: tuple, now: Optional[float] = None) -> bool:
+        """True = schreiben (neu, geändert oder Heartbeat fällig) und als geschrieben merken."""
+        now = time.monotonic() if now is None else now
+        fp = hash(values)
+        last = self._last.get((table, fid))
+        if (self.enabled and last is not None and last[0] == fp
+                and (self.heartbeat <= 0 or now - last[1] < self.heartbeat)):
+            self.skipped[table] += 1
+            return False
+        self._last[(table, fid)] = (fp, now)
+        self.written[table] += 1
+        return True
+
+    def forget(self, table: str, fids: Iterable[int]):
+        """Schreiben fehlgeschlagen → beim nächsten Mal wieder als geändert behandeln."""
+        for fid in fids:
+            self._last.pop((table, fid), None)
+
+    def retain(self, fids: Iterable[int]):
+        """Fingerprints beendeter Spiele verwerfen."""
+        keep = set(fids)
+        for key in [k for k in self._last if k[1] not in keep]:
+            del self._last[key]
+
+    def summary(self, reset: bool = False) -> str:
+        parts = []
+        for table in sorted(set(self.written) | set(self.skipped)):
+            w, s = self.written[table], self.skipped[table]
+            parts.append(f"{table} {w}/{w + s} (skip {100 * s / max(1, w + s):.0f}%)")
+        if reset:
+            self.written.clear()
+            self.skipped.clear()
+        return "cdc " + (" ".join(parts) if parts else "-")
+
+CDC = ChangeFilter()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit Breaker je Endpoint + Param-Klasse (z.B. "/fixtures?live", "/odds/live").
+Ersetzt Einzel-Flags wie das alte odds_forbidden im live_monitor.
+
+closed     normaler Betrieb; BREAKER_FAILURES Fehlschläge in Folge (5xx / Netz,
+           jeweils NACH den Retries des Clients) → open
+open       alle Requests sofort CircuitOpen, ohne Budget zu verbrauchen;
+           401/403 öffnet sofort mit langem Cooldown (Plan/Key-Problem)
+half_open  nach dem Cooldown darf genau EIN Probe-Request durch:
+           Erfolg → closed, Fehler → open mit verdoppeltem Cooldown
+
+4xx außer 401/403 (falsche Params, 404) und 429 (Rate, siehe lib.rate_control)
+zählen nicht. Zustand pro Prozess; Cache-Treffer laufen am Breaker vorbei.
+"""
+
+import os, time, threading, datetime as dt
+from typing import Any, Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def ts() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def breaker_key(ep: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Param-Klasse = Namen der Params, nicht ihre Werte (fixture=1 und fixture=2 teilen sich einen Breaker)."""
+    names = sorted((params or {}).keys())
+    return ep + ("?" + ",".join(names) if names else "")
+
+class CircuitOpen(Exception):
+    """Breaker für diesen Endpoint offen – Request wurde nicht gesendet."""
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"Circuit {key} offen (nächster Versuch in {retry_in:.0f}s)")
+        self.key = key
+        self.retry_in = retry_in
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "cooldown", "probe_at", "trips", "rejected")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.probe_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+class CircuitBreaker:
+    def __init__(self):
+        self.max_failures = int(_env_float("BREAKER_FAILURES", 5))
+        self.cooldown = _env_float("BREAKER_COOLDOWN_SEC", 60)
+        self.cooldown_max = _env_float("BREAKER_COOLDOWN_MAX_SEC", 1800)
+        self.forbidden_cooldown = _env_float("BREAKER_FORBIDDEN_COOLDOWN_SEC", 1800)
+        self.probe_timeout = _env_float("BREAKER_PROBE_TIMEOUT_SEC", 120)
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> _Circuit:
+        c = self._circuits.get(key)
+        if c is None:
+            c = self._circuits[key] = _Circuit()
+        return c
+
+    def _open(self, key: str, c: _Circuit, cooldown: float, reason: str):
+        prev = c.state
+        c.state, c.opened_at, c.cooldown = OPEN, time.monotonic(), min(self.cooldown_max, cooldown)
+        c.trips += 1
+        print(f"[{ts()}] Circuit {key}: {prev} → open ({reason}, Cooldown {c.cooldown:.0f}s)")
+
+    def before(self, ep: str, params: Optional[Dict[str, Any]] = None):
+        """Vor dem Senden: wirft CircuitOpen oder lässt (ggf. als Probe) durch."""
+        key = breaker_key(ep, params)
+        now = time.monotonic()
+        with self._lock:
+            c = self._get(key)
+            if c.state == CLOSED:
+                return
+            if c.state == OPEN:
+                left = c.opened_at + c.cooldown - now
+                if left > 0:
+                    c.rejected += 1
+                    raise CircuitOpen(key, left)
+                c.state, c.probe_at = HALF_OPEN, now
+                print(f"[{ts()}] Circuit {key}: open → half_open (Probe)")
+                return
+            # half_open: nur eine Probe gleichzeitig; hängt sie zu lange, darf die nächste
+            if now - c.probe_at < self.probe_timeout:
+                c.rejected += 1
+                raise CircuitOpen(key, self.probe_timeout - (now - c.probe_at))
+            c.probe_at = now
+
+    def record(self, ep: str, params: Optional[Dict[str, Any]], status: Optional[int]):
+        """status: HTTP-Status der letzten Antwort, None = Netzfehler/Timeout."""
+        key = breaker_key(ep, params)
+        with self._lock:
+            c = self._get(key)
+            if status is not None and 200 <= status < 300:
+                if c.state != CLOSED:
+                    print(f"[{ts()}] Circuit {key}: {c.state} → closed")
+                c.state, c.failures, c.cooldown = CLOSED, 0, 0.0
+                return
+            if status in (401, 403):
+                self._open(key, c, self.forbidden_cooldown, f"HTTP {status}")
+                return
+            if status is not None and status < 500:
+                # Param-Fehler / 429: kein Endpoint-Problem; eine laufende Probe gilt als beantwortet
+                if c.state == HALF_OPEN:
+                    c.state, c.failures = CLOSED, 0
+                return
+            c.failures += 1
+            reason = f"HTTP {status}" if status else "Netzfehler"
+            if c.state == HALF_OPEN:
+                self._open(key, c, max(self.cooldown, c.cooldown * 2), f"Probe fehlgeschlagen: {reason}")
+            elif c.failures >= self.max_failures:
+                self._open(key, c, self.cooldown, f"{c.failures}x {reason}")
+
+    def state(self, ep: str, params: Optional[Dict[str, Any]] = None) -> str:
+        with self._lock:
+            c = self._circuits.get(breaker_key(ep, params))
+            return c.state if c else CLOSED
+
+    def blocked(self, ep: str, params: Optional[Dict[str, Any]] = None) -> bool:
+        """True = ein Request würde jetzt sicher mit CircuitOpen abgelehnt (Loops überspringen die Arbeit)."""
+        now = time.monotonic()
+        with self._lock:
+            c = self._circuits.get(breaker_key(ep, params))
+            if c is None or c.state == CLOSED:
+                return False
+            if c.state == OPEN:
+                return now < c.opened_at + c.cooldown
+            return now - c.probe_at < self.probe_timeout
+
+    def summary(self) -> str:
+        """Kurzzeile für Loop-Logs, leer wenn alles geschlossen."""
+        with self._lock:
+            bad = [f"{k}={c.state}({c.rejected} skip)" for k, c in self._circuits.items() if c.state != CLOSED]
+        return "circuits " + " ".join(bad) if bad else ""
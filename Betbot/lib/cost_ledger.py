@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+API-Kosten je Spiel und Liga: jeder Upstream-Request (inkl. Retries, jeder kostet Quota)
+wird vom Client anhand seiner Params zugeordnet und gebündelt in api_cost_ledger geschrieben.
+
+Zuordnung (attribute):
+- fixture= / /fixtures?id=      → dieses Spiel
+- /fixtures?ids=a-b-c            → je Spiel 1/N Call
+- league=                        → diese Liga (fixture_id 0)
+- odds/live, fixtures?live=all, odds?date, ... → fixture_id 0 / league_id 0 (global)
+Liga je Spiel kennt der Ledger über note_leagues() aus den Live-Loops, sonst löst der
+Report sie über fixtures / gb_prematch_candidates auf.
+
+Kategorien: stats | odds | predictions | meta | fixtures | other
+Flush: alle COST_FLUSH_SEC (60) oder ab COST_FLUSH_ROWS (500) offenen Zeilen in EINEM
+Hintergrund-Thread, dazu beim Prozessende. DB = COST_DATABASE_URL oder DATABASE_URL;
+ohne DB ist der Ledger aus. Schlägt der Flush fehl, bleiben die Zeilen im Speicher
+(höchstens COST_PENDING_MAX, Default 20000 – was darüber hinaus kommt, wird verworfen
+und gezählt), nächster Versuch frühestens nach COST_FLUSH_SEC.
+
+Report (Kosten vs. Snapshots / Kandidaten / gb_tip_events):
+    python -m lib.cost_ledger [--days 7] [--by league|fixture] [--limit 30]
+"""
+
+import os, time, atexit, argparse, threading, datetime as dt
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DDL = """
+CREATE TABLE IF NOT EXISTS api_cost_ledger (
+  day         DATE NOT NULL,
+  fixture_id  BIGINT NOT NULL DEFAULT 0,
+  league_id   BIGINT NOT NULL DEFAULT 0,
+  kind        TEXT NOT NULL,
+  calls       NUMERIC(12,3) NOT NULL DEFAULT 0,
+  bytes       BIGINT NOT NULL DEFAULT 0,
+  updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (day, fixture_id, league_id, kind)
+)
+"""
+
+UPSERT = """
+INSERT INTO api_cost_ledger (day, fixture_id, league_id, kind, calls, bytes, updated_at)
+VALUES (:day, :fixture_id, :league_id, :kind, :calls, :bytes, CURRENT_TIMESTAMP)
+ON CONFLICT (day, fixture_id, league_id, kind) DO UPDATE
+   SET calls = api_cost_ledger.calls + excluded.calls,
+       bytes = api_cost_ledger.bytes + excluded.bytes,
+       updated_at = CURRENT_TIMESTAMP
+"""
+
+KINDS = ("stats", "odds", "predictions", "meta", "fixtures", "other")
+
+def ts() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _int(v) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return 0
+
+def cost_kind(ep: str, params: Optional[Dict[str, Any]]) -> str:
+    keys = set((params or {}).keys())
+    if ep == "/fixtures/statistics" or (ep == "/fixtures" and "ids" in keys):
+        return "stats"
+    if ep.startswith("/odds"):
+        return "odds"
+    if ep == "/predictions":
+        return "predictions"
+    if (ep == "/fixtures" and "id" in keys) or ep in ("/teams", "/leagues", "/fixtures/lineups",
+                                                      "/fixtures/events", "/fixtures/headtohead"):
+        return "meta"
+    if ep == "/fixtures":
+        return "fixtures"
+    return "other"
+
+def attribute(ep: str, params: Optional[Dict[str, Any]]) -> List[Tuple[int, int, float]]:
+    """→ [(fixture_id, league_id, Anteil)] – Anteile summieren sich zu 1."""
+    p = params or {}
+    league = _int(p.get("league"))
+    if p.get("ids"):
+        fids = [_int(x) for x in str(p["ids"]).split("-") if _int(x)]
+        if fids:
+            return [(f, league, 1.0 / len(fids)) for f in fids]
+    fid = _int(p.get("fixture")) or (_int(p.get("id")) if ep == "/fixtures" else 0)
+    return [(fid, league, 1.0)]
+
+class CostLedger:
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or os.getenv("COST_DATABASE_URL") or os.getenv("DATABASE_URL")
+        # ohne DB kein Ledger – sonst wüchse der Puffer mit jedem Request
+        self.enabled = bool(self.url) and os.getenv("COST_LEDGER", "true").lower() in ("1", "true", "yes", "on")
+        self.flush_sec = float(os.getenv("COST_FLUSH_SEC", "60"))
+        self.flush_rows = int(os.getenv("COST_FLUSH_ROWS", "500"))
+        self.max_pending = int(os.getenv("COST_PENDING_MAX", "20000"))
+        self._pending: Dict[Tuple[str, int, int, str], List[float]] = {}
+        self._leagues: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failed = False
+        self.dropped = 0
+        self._engine = None
+        self._warned = False
+        atexit.register(self.flush)
+
+    def note_leagues(self, mapping: Dict[int, int]):
+        """fixture_id → league_id (z.B. aus fixtures?live=all), damit Stats/Odds der Liga zufallen."""
+        with self._lock:
+            self._leagues.update({f: l for f, l in mapping.items() if f and l})
+
+    def _add(self, key: Tuple[str, int, int, str], calls: float, nbytes: int):
+        """Unter self._lock: Zeile aufaddieren; neue Schlüssel nur bis max_pending."""
+        row = self._pending.get(key)
+        if row is None:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            row = self._pending[key] = [0.0, 0]
+        row[0] += calls
+        row[1] += nbytes
+
+    def record(self, ep: str, params: Optional[Dict[str, Any]], nbytes: int = 0):
+        if not self.enabled:
+            return
+        kind = cost_kind(ep, params)
+        day = dt.datetime.now(dt.timezone.utc).date().isoformat()
+        with self._lock:
+            for fid, league, share in attribute(ep, params):
+                self._add((day, fid, league or self._leagues.get(fid, 0), kind), share, int(nbytes * share))
+            due = len(self._pending) >= self.flush_rows
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cost-ledger", daemon=True)
+                self._thread.start()
+        if due:
+            self._wake.set()
+
+    def _run(self):
+        """Flusher: alle flush_sec oder früher, wenn record() flush_rows erreicht; nach Fehler volle Pause."""
+        while True:
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self.flush()
+            if self._failed:
+                time.sleep(self.flush_sec)
+
+    def _db(self):
+        if self._engine is None:
+            from sqlalchemy import text
+            from lib import db_pool
+            self._engine = db_pool.engine(url=self.url)   # gleiche URL wie DATABASE_URL → gleicher Pool
+            with self._engine.begin() as conn:
+                conn.execute(text(DDL))
+        return self._engine
+
+    def flush(self) -> int:
+        """Offene Zeilen in einem Batch upserten; bei DB-Fehler bleiben sie für den nächsten Versuch."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            rows = [{"day": d, "fixture_id": f, "league_id": l, "kind": k, "calls": round(v[0], 3), "bytes": v[1]}
+                    for (d, f, l, k), v in batch.items()]
+            try:
+                if not self.url:
+                    raise RuntimeError("COST_DATABASE_URL/DATABASE_URL nicht gesetzt")
+                from sqlalchemy import text
+                with self._db().begin() as conn:
+                    conn.execute(text(UPSERT), rows)
+                self._failed = False
+                return len(rows)
+            except Exception as e:
+                self._failed = True
+                if not self._warned:
+                    print(f"[{ts()}] Cost-Ledger: Flush fehlgeschlagen ({e}) – Zeilen bleiben im Speicher "
+                          f"(max. {self.max_pending})")
+                    self._warned = True
+                with self._lock:
+                    for key, (calls, nbytes) in batch.items():
+                        self._add(key, calls, nbytes)
+                return 0
+
+_ledger: Optional[CostLedger] = None
+
+def get_ledger() -> CostLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = CostLedger()
+    return _ledger
+
+# ========= Report =========
+def _table_counts(conn, insp, table: str, existing: Iterable[str], since: str,
+                  ts_cols: Tuple[str, ...]) -> Dict[int, int]:
+    """COUNT(*) je fixture_id seit `since`; Zeitspalte je nach Schema (schema.sql vs. db_models)."""
+    from sqlalchemy import text
+    if table not in existing:
+        return {}
+    cols = {c["name"] for c in insp.get_columns(table)}
+    ts_col = next((c for c in ts_cols if c in cols), None)
+    where = f"WHERE {ts_col} >= :since" if ts_col else ""
+    rows = conn.execute(text(f"SELECT fixture_id, COUNT(*) FROM {table} {where} GROUP BY fixture_id"),
+                        {"since": since} if ts_col else {})
+    return {int(f): int(n) for f, n in rows if f is not None}
+
+def _league_of(conn, existing: Iterable[str]) -> Dict[int, int]:
+    from sqlalchemy import text
+    out: Dict[int, int] = {}
+    for table in ("gb_prematch_candidates", "fixtures"):
+        if table in existing:
+            for f, l in conn.execute(text(f"SELECT fixture_id, MAX(league_id) FROM {table} GROUP BY fixture_id")):
+                if f is not None and l:
+                    out[int(f)] = int(l)
+    return out
+
+def _league_names(conn, existing: Iterable[str]) -> Dict[int, str]:
+    from sqlalchemy import text
+    if "league_meta" in existing:
+        return {int(l): n for l, n in conn.execute(text("SELECT league_id, name FROM league_meta"))}
+    if "fixtures" in existing:
+        try:
+            return {int(l): n for l, n in conn.execute(text(
+                "SELECT league_id, MAX(league_name) FROM fixtures WHERE league_id IS NOT NULL GROUP BY league_id"))}
+        except Exception:
+            return {}
+    return {}
+
+def report(days: int = 7, by: str = "league", limit: int = 30):
+    from sqlalchemy import inspect, text
+    ledger = get_ledger()
+    ledger.flush()
+    since = (dt.datetime.now(dt.timezone.utc).date() - dt.timedelta(days=days - 1)).isoformat()
+    eng = ledger._db()
+    insp = inspect(eng)
+    existing = set(insp.get_table_names())
+    with eng.connect() as conn:
+        cost = conn.execute(text("""
+            SELECT fixture_id, league_id, kind, SUM(calls), SUM(bytes)
+            FROM api_cost_ledger WHERE day >= :since
+            GROUP BY fixture_id, league_id, kind
+        """), {"since": since}).fetchall()
+        snaps = _table_counts(conn, insp, "snapshots", existing, since, ("ts_utc", "timestamp"))
+        cands = _table_counts(conn, insp, "gb_prematch_candidates", existing, since, ("created_at",))
+        tips  = _table_counts(conn, insp, "gb_tip_events", existing, since, ("published_at",))
+        league_of = _league_of(conn, existing)
+        names = _league_names(conn, existing)
+
+    glob: Dict[str, float] = {}
+    groups: Dict[int, Dict[str, Any]] = {}
+    for fid, league, kind, calls, nbytes in cost:
+        fid, league, calls = int(fid), int(league), float(calls)
+        league = league or league_of.get(fid, 0)
+        if not fid and not league:
+            glob[kind] = glob.get(kind, 0.0) + calls
+            continue
+        gid = fid if by == "fixture" else league
+        g = groups.setdefault(gid, {"calls": 0.0, "bytes": 0, "fids": set(), "league": league,
+                                    **{k: 0.0 for k in KINDS}})
+        g["calls"] += calls
+        g["bytes"] += int(nbytes or 0)
+        g[kind] += calls
+        if fid:
+            g["fids"].add(fid)
+
+    for g in groups.values():
+        g["snaps"] = sum(snaps.get(f, 0) for f in g["fids"])
+        g["cands"] = sum(cands.get(f, 0) for f in g["fids"])
+        g["tips"] = sum(tips.get(f, 0) for f in g["fids"])
+
+    label = "Fixture" if by == "fixture" else "Liga"
+    print(f"API-Kosten seit {since} je {label} (Top {limit} nach Calls)")
+    print(f"{label:<34} {'Spiele':>6} {'Calls':>8} {'stats':>7} {'odds':>6} {'pred':>6} {'meta':>6} "
+          f"{'MB':>7} {'Snaps':>6} {'Kand.':>6} {'Tipps':>6} {'Calls/Tipp':>10}")
+    for gid, g in sorted(groups.items(), key=lambda kv: -kv[1]["calls"])[:limit]:
+        if by == "fixture":
+            name = f"{gid} (Liga {g['league'] or '?'})" if gid else f"ohne Spiel (Liga {g['league']})"
+        else:
+            name = f"{gid} {names.get(gid, '') or ''}".strip() if gid else "(Liga unbekannt)"
+        per_tip = f"{g['calls'] / g['tips']:.1f}" if g["tips"] else "–"
+        print(f"{name[:34]:<34} {len(g['fids']):>6} {g['calls']:>8.1f} {g['stats']:>7.1f} {g['odds']:>6.1f} "
+              f"{g['predictions']:>6.1f} {g['meta']:>6.1f} {g['bytes'] / 1e6:>7.1f} {g['snaps']:>6} "
+              f"{g['cands']:>6} {g['tips']:>6} {per_tip:>10}")
+    if glob:
+        parts = " ".join(f"{k}={v:.0f}" for k, v in sorted(glob.items(), key=lambda kv: -kv[1]))
+        print(f"nicht zuordenbar (odds/live, fixtures?live, odds?date, ...): {sum(glob.values()):.0f} Calls – {parts}")
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    load_dotenv(dotenv_path=".env_gamblebros")
+    ap = argparse.ArgumentParser(description="API-Kosten je Liga/Spiel vs. Output")
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--by", choices=("league", "fixture"), default="league")
+    ap.add_argument("--limit", type=int, default=30)
+    args = ap.parse_args()
+    report(args.days, args.by, args.limit)
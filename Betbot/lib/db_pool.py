@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame DB-Schicht für alle Einstiegspunkte (db.py, db_models, live_monitor, betbot,
+api/app.py, workers/, tools/, lib.db_writer, lib.cost_ledger): ein Pool je URL und Prozess
+statt eigener Engines und psycopg2.connect() pro Aufruf.
+
+- engine(readonly=False, url=None): SQLAlchemy-Engine mit QueuePool – DB_POOL_SIZE (5),
+  DB_MAX_OVERFLOW (10), DB_POOL_RECYCLE (1800 s), DB_POOL_TIMEOUT (30 s), pre_ping;
+  readonly=True → RO_DATABASE_URL (Read-Replica), falls gesetzt, sonst DATABASE_URL
+- connection(readonly=False): DBAPI-Verbindung aus demselben Pool (psycopg2-Stil: cursor(),
+  %s-Parameter, commit()); close() gibt sie an den Pool zurück – Ersatz für psycopg2.connect(),
+  auch als Context-Manager
+- async_engine(readonly=False): SQLAlchemy asyncio (postgresql+asyncpg bzw. sqlite+aiosqlite);
+  asyncpg hält Prepared Statements je Verbindung im Cache (DB_STATEMENT_CACHE, Default 100) –
+  warme Pool-Verbindungen nutzen sie wieder
+- use_async(): DB_ASYNC=auto (Default) → Async-Pfad, wenn greenlet und Treiber installiert sind;
+  on erzwingt ihn (fehlt ein Treiber → RuntimeError, live_monitor/betbot prüfen das beim Start),
+  off schaltet ihn ab (db.*_async fällt dann auf asyncio.to_thread zurück)
+- pool_stats() / summary(): Poolgröße, ausgeliehen, Overflow, Checkouts, neu aufgebaute
+  Verbindungen je Engine
+
+DATABASE_URL ohne Wert → sqlite:///./betbot.db (wie bisher db_models); postgres:// wird zu
+postgresql:// (SQLAlchemy 2 kennt nur letzteres).
+"""
+
+import os, threading, contextlib, collections
+from typing import Any, Dict, Optional
+
+DEFAULT_URL = "sqlite:///./betbot.db"
+DB_ASYNC = os.getenv("DB_ASYNC", "auto").lower()   # auto | on | off
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+_engines: Dict[str, Any] = {}
+_async_engines: Dict[str, Any] = {}
+_async_ok: Dict[str, bool] = {}
+_counters: Dict[str, Dict[str, int]] = collections.defaultdict(collections.Counter)
+_lock = threading.Lock()
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def normalize_url(url: str) -> str:
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+def database_url(readonly: bool = False) -> str:
+    url = (os.getenv("RO_DATABASE_URL") if readonly else None) or os.getenv("DATABASE_URL") or DEFAULT_URL
+    return normalize_url(url)
+
+def _pool_kwargs(url: str) -> Dict[str, Any]:
+    if url.startswith("sqlite"):
+        return {}   # SQLite: Default-Pool von SQLAlchemy (Datei → QueuePool, :memory: → SingletonThreadPool)
+    return {
+        "pool_size": _int_env("DB_POOL_SIZE", 5),
+        "max_overflow": _int_env("DB_MAX_OVERFLOW", 10),
+        "pool_recycle": _int_env("DB_POOL_RECYCLE", 1800),
+        "pool_timeout": _int_env("DB_POOL_TIMEOUT", 30),
+    }
+
+def _instrument(eng, name: str):
+    from sqlalchemy import event
+    c = _counters[name]
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, record):
+        c["connects"] += 1
+
+    @event.listens_for(eng, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        c["checkouts"] += 1
+
+    @event.listens_for(eng, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exc):
+        c["invalidated"] += 1
+
+def _label(url: str) -> str:
+    """URL ohne Passwort für Metriken/Logs."""
+    from sqlalchemy.engine import make_url
+    return make_url(url).render_as_string(hide_password=True)
+
+def engine(readonly: bool = False, url: Optional[str] = None):
+    """Engine je URL (einmal pro Prozess); url übersteuert DATABASE_URL/RO_DATABASE_URL."""
+    url = normalize_url(url) if url else database_url(readonly)
+    eng = _engines.get(url)
+    if eng is not None:
+        return eng
+    with _lock:
+        eng = _engines.get(url)
+        if eng is None:
+            from sqlalchemy import create_engine
+            eng = create_engine(url, pool_pre_ping=True, future=True, **_pool_kwargs(url))
+            _instrument(eng, _label(url))
+            _engines[url] = eng
+    return eng
+
+def connect(readonly: bool = False, url: Optional[str] = None):
+    """Gepoolte DBAPI-Verbindung (close() = zurück in den Pool, offene Transaktion wird zurückgerollt)."""
+    return engine(readonly, url).raw_connection()
+
+@contextlib.contextmanager
+def connection(readonly: bool = False, url: Optional[str] = None):
+    conn = connect(readonly, url)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def async_url(url: str) -> str:
+    from sqlalchemy.engine import make_url
+    u = make_url(url)
+    if u.get_backend_name() == "postgresql":
+        u = u.set(drivername="postgresql+asyncpg")
+        u = u.update_query_dict({"prepared_statement_cache_size": str(_int_env("DB_STATEMENT_CACHE", 100))})
+    elif u.get_backend_name() == "sqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    return u.render_as_string(hide_password=False)
+
+def use_async(readonly: bool = False, url: Optional[str] = None) -> bool:
+    """
+    Async-Pfad nutzen? (DB_ASYNC, bei auto: greenlet + asyncpg/aiosqlite importierbar)
+    DB_ASYNC=on ohne importierbare Treiber → RuntimeError (beim Start aufrufen, nicht erst im Loop).
+    """
+    if DB_ASYNC in ("0", "off", "false", "no"):
+        return False
+    url = normalize_url(url) if url else database_url(readonly)
+    ok = _async_ok.get(url)
+    if ok is None:
+        from sqlalchemy.engine import make_url
+        driver = ASYNC_DRIVERS.get(make_url(url).get_backend_name())
+        try:
+            import importlib
+            for mod in ("greenlet", driver) if driver else ():
+                importlib.import_module(mod)
+            ok = bool(driver)
+        except ImportError:
+            ok = False
+        _async_ok[url] = ok
+    if not ok and DB_ASYNC in ("1", "on", "true", "yes"):
+        from sqlalchemy.engine import make_url
+        backend = make_url(url).get_backend_name()
+        raise RuntimeError(f"DB_ASYNC=on, aber kein Async-Treiber für {backend}: "
+                           f"greenlet + {ASYNC_DRIVERS.get(backend, '(keiner bekannt)')} installieren oder DB_ASYNC=auto/off setzen")
+    return ok
+
+def async_engine(readonly: bool = False, url: Optional[str] = None):
+    """AsyncEngine je URL – braucht asyncpg (Postgres) bzw. aiosqlite (SQLite)."""
+    url = async_url(normalize_url(url) if url else database_url(readonly))
+    eng = _async_engines.get(url)
+    if eng is not None:
+        return eng
+    with _lock:
+        eng = _async_engines.get(url)
+        if eng is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            eng = create_async_engine(url, pool_pre_ping=True, **_pool_kwargs(url))
+            _instrument(eng.sync_engine, "async:" + _label(url))
+            _async_engines[url] = eng
+    return eng
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    engines = [(_label(u), e) for u, e in _engines.items()]
+    engines += [("async:" + _label(u), e.sync_engine) for u, e in _async_engines.items()]
+    for name, eng in engines:
+        pool = eng.pool
+        st: Dict[str, Any] = {"pool": type(pool).__name__}
+        for attr in ("size", "checkedout", "checkedin", "overflow"):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                st[attr] = fn()
+        st.update(_counters.get(name, {}))
+        out[name] = st
+    return out
+
+def summary() -> str:
+    parts = []
+    for name, st in pool_stats().items():
+        parts.append(f"{name.split('@')[-1]} out={st.get('checkedout', '-')}/{st.get('size', '-')} "
+                     f"overflow={st.get('overflow', '-')} checkouts={st.get('checkouts', 0)} connects={st.get('connects', 0)}")
+    return "db " + (" | ".join(parts) if parts else "-")
+
+async def dispose_async():
+    for eng in list(_async_engines.values()):
+        await eng.dispose()
+    _async_engines.clear()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Gebündelter, asynchroner Writer für Snapshots und Live-Odds (live_monitor, betbot, AiScore).
+Produzenten legen Zeilen nur in eine asyncio.Queue; ein Writer-Task sammelt sie und schreibt
+im Thread (asyncio.to_thread) – der Event-Loop wartet nie auf ein Commit.
+
+- Flush ab WRITER_BATCH_ROWS (500) Zeilen oder spätestens nach WRITER_FLUSH_SEC (1.0)
+- ein Commit je Batch (Group Commit); Postgres + psycopg2: COPY ... FROM STDIN (CSV),
+  sonst executemany (SQLite, andere Treiber, WRITER_COPY=off)
+- Backpressure: Queue fasst WRITER_QUEUE_MAX (10000) Zeilen – ist sie voll, wartet put(),
+  bis der Writer aufgeholt hat (hängt die DB, bremst das die Loops statt RAM zu füllen)
+- ohne COPY und mit Async-Treiber (lib.db_pool.use_async, DB_ASYNC) schreibt der Writer direkt
+  über SQLAlchemy asyncio (asyncpg / aiosqlite) statt im Thread
+- Fehler: WRITER_RETRIES (3) Versuche mit Backoff, danach wird der Batch verworfen und gezählt;
+  die CDC-Fingerprints der verworfenen Spiele fallen weg (lib.cdc), der nächste Stand wird wieder geschrieben
+- Tabellen/Spalten wie schema.sql (= db_models, init_db); ts_utc setzt die DB (Default now(), also Flush-Zeitpunkt,
+  höchstens WRITER_FLUSH_SEC nach dem Einreihen)
+"""
+
+import os, io, csv, time, asyncio, collections, datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.cdc import CDC
+
+WRITER_BATCH_ROWS = int(os.getenv("WRITER_BATCH_ROWS", "500"))
+WRITER_FLUSH_SEC  = float(os.getenv("WRITER_FLUSH_SEC", "1.0"))
+WRITER_QUEUE_MAX  = int(os.getenv("WRITER_QUEUE_MAX", "10000"))
+WRITER_RETRIES    = int(os.getenv("WRITER_RETRIES", "3"))
+WRITER_COPY       = os.getenv("WRITER_COPY", "auto").lower()   # auto | off
+
+_STOP = object()
+
+def ts() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class BatchWriter:
+    def __init__(self, engine=None, batch_rows: int = WRITER_BATCH_ROWS, flush_sec: float = WRITER_FLUSH_SEC,
+                 maxsize: int = WRITER_QUEUE_MAX):
+        self._engine = engine
+        self.batch_rows, self.flush_sec, self.maxsize = batch_rows, flush_sec, maxsize
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written: Dict[str, int] = collections.Counter()
+        self.flushes = 0
+        self.backpressure = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from lib import db_pool
+            self._engine = db_pool.engine()
+        return self._engine
+
+    def start(self):
+        if self._task is None:
+            self.queue = asyncio.Queue(self.maxsize)
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def put(self, table: str, row: Dict[str, Any]):
+        """Zeile einreihen; wartet nur, wenn die Queue voll ist (Backpressure)."""
+        self.start()
+        if self.queue.full():
+            self.backpressure += 1
+        await self.queue.put((table, row))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await self.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_sec
+            while len(batch) < self.batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        for attempt in range(max(1, WRITER_RETRIES)):
+            try:
+                t0 = time.perf_counter()
+                if self._async():
+                    await self._flush_async(batch)
+                else:
+                    await asyncio.to_thread(self._flush, batch)
+                self.last_flush_ms = (time.perf_counter() - t0) * 1000
+                self.flushes += 1
+                for table, _ in batch:
+                    self.written[table] += 1
+                return
+            except Exception as e:
+                print(f"[{ts()}] DB-Writer: Flush von {len(batch)} Zeilen fehlgeschlagen ({e}) – Versuch {attempt + 1}/{WRITER_RETRIES}")
+                await asyncio.sleep(min(30, 2 ** attempt))
+        self.dropped += len(batch)
+        # CDC hat die Werte beim Einreihen schon als geschrieben gemerkt
+        lost: Dict[str, set] = collections.defaultdict(set)
+        for table, row in batch:
+            if row.get("fixture_id") is not None:
+                lost[table].add(row["fixture_id"])
+        for table, fids in lost.items():
+            CDC.forget(table, fids)
+
+    def _use_copy(self) -> bool:
+        d = self.engine.dialect
+        return WRITER_COPY != "off" and d.name == "postgresql" and d.driver == "psycopg2"
+
+    def _async(self) -> bool:
+        """Async-Pfad nur für den Standard-Pool (eigene Engine im Bench/Test bleibt sync)."""
+        from lib import db_pool
+        if self.engine is not db_pool.engine():
+            return False
+        return not self._use_copy() and db_pool.use_async()
+
+    @staticmethod
+    def _groups(batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]]:
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = collections.defaultdict(list)
+        for table, row in batch:
+            groups[(table, tuple(row))].append(row)
+        return groups
+
+    @staticmethod
+    def _insert_sql(table: str, cols: Tuple[str, ...]):
+        from sqlalchemy import text
+        return text(f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})")
+
+    async def _flush_async(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        from lib import db_pool
+        async with db_pool.async_engine().begin() as conn:
+            for (table, cols), rows in self._groups(batch).items():
+                await conn.execute(self._insert_sql(table, cols), rows)
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        groups = self._groups(batch)
+        copy = self._use_copy()
+        with self.engine.begin() as conn:
+            for (table, cols), rows in groups.items():
+                if copy:
+                    buf = io.StringIO()
+                    w = csv.writer(buf)
+                    for r in rows:
+                        w.writerow(["" if r[c] is None else r[c] for c in cols])
+                    buf.seek(0)
+                    cur = conn.connection.cursor()
+                    cur.copy_expert(f"COPY {table} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv)", buf)
+                else:
+                    conn.execute(self._insert_sql(table, cols), rows)
+
+    def summary(self) -> str:
+        q = self.queue.qsize() if self.queue is not None else 0
+        tables = " ".join(f"{t}={n}" for t, n in sorted(self.written.items())) or "-"
+        return (f"writer q={q} {tables} flushes={self.flushes} last={self.last_flush_ms:.0f}ms "
+                f"backpressure={self.backpressure} dropped={self.dropped}")
+
+    async def close(self):
+        """Rest schreiben und Task beenden (beim Shutdown der Loops)."""
+        if self._task is None:
+            return
+        await self.queue.put(_STOP)
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+_writer: Optional[BatchWriter] = None
+
+def get_writer() -> BatchWriter:
+    global _writer
+    if _writer is None:
+        _writer = BatchWriter()
+    return _writer
+
+# ========= Vergleich: Commit je Zeile vs. Batch =========
+async def _bench(url: str, n: int):
+    from sqlalchemy import text
+    from lib import db_pool
+    eng = db_pool.engine(url=url)
+    with eng.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bench_snapshots"))
+        conn.execute(text("CREATE TABLE bench_snapshots (fixture_id BIGINT, minute INT, home_sog INT, away_sog INT)"))
+    rows = [{"fixture_id": i % 200, "minute": i % 90, "home_sog": i % 7, "away_sog": i % 5} for i in range(n)]
+
+    t0 = time.perf_counter()
+    for r in rows:
+        with eng.begin() as conn:
+            conn.execute(text("INSERT INTO bench_snapshots VALUES (:fixture_id, :minute, :home_sog, :away_sog)"), r)
+    single = time.perf_counter() - t0
+
+    w = BatchWriter(eng, flush_sec=0.05)
+    t0 = time.perf_counter()
+    for r in rows:
+        await w.put("bench_snapshots", r)
+    enqueue = time.perf_counter() - t0
+    await w.close()
+    batched = time.perf_counter() - t0
+    with eng.begin() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM bench_snapshots")).scalar()
+        conn.execute(text("DROP TABLE bench_snapshots"))
+    print(f"{n} Zeilen ({eng.dialect.name}, copy={w._use_copy()}): Commit je Zeile {single:.2f}s | "
+          f"Batch {batched:.2f}s (davon Einreihen {enqueue * 1000:.0f}ms) | Zeilen in DB {total}/{2 * n}")
+    print(w.summary())
+
+if __name__ == "__main__":
+    import sys
+    asyncio.run(_bench(sys.argv[1] if len(sys.argv) > 1 else "sqlite:////tmp/betbot_writer_bench.db",
+                       int(sys.argv[2]) if len(sys.argv) > 2 else 2000))
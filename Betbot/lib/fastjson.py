@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+JSON-Backend für Client, Cache, API und Debug-Dumps:
+orjson, wenn installiert (deutlich schneller bei MB-großen Odds-/Fixtures-Payloads),
+sonst stdlib json. JSON_BACKEND=json erzwingt stdlib.
+
+Beide Backends liefern dasselbe Format: UTF-8 ohne ASCII-Escapes,
+datetime/date als ISO-String, Decimal als float (psycopg2 numeric-Spalten).
+
+Micro-Benchmark auf den Dumps im Repo:
+    python -m lib.fastjson [datei.json ...]
+"""
+
+import os, sys, json, time, decimal, datetime as dt
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+if os.getenv("JSON_BACKEND", "").lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+def _default(o: Any):
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (dt.datetime, dt.date, dt.time)):
+        return o.isoformat()
+    if isinstance(o, (set, frozenset, tuple)):
+        return list(o)
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    if orjson:
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=opt)
+    return json.dumps(obj, ensure_ascii=False, default=_default, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    return dumps_bytes(obj, indent).decode("utf-8")
+
+def dump_file(path: str, obj: Any, indent: bool = True):
+    """Debug-/Watchlist-Dumps: ein write() statt vieler kleiner (json.dump schreibt stückweise)."""
+    with open(path, "wb") as f:
+        f.write(dumps_bytes(obj, indent))
+
+# ========= Micro-Benchmark =========
+def _best(fn, n: int = 5) -> float:
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+def bench(path: str):
+    raw = open(path, "rb").read()
+    obj = json.loads(raw)
+    rows = [
+        ("stdlib", "loads",       lambda: json.loads(raw)),
+        ("stdlib", "dumps",       lambda: json.dumps(obj, ensure_ascii=False)),
+        ("stdlib", "dumps indent", lambda: json.dumps(obj, ensure_ascii=False, indent=2)),
+    ]
+    if orjson:
+        rows += [
+            ("orjson", "loads",       lambda: orjson.loads(raw)),
+            ("orjson", "dumps",       lambda: orjson.dumps(obj)),
+            ("orjson", "dumps indent", lambda: orjson.dumps(obj, option=orjson.OPT_INDENT_2)),
+        ]
+    print(f"{path} ({len(raw) / 1e6:.1f} MB)")
+    for backend, op, fn in rows:
+        print(f"  {backend:<7} {op:<13} {_best(fn):8.2f} ms")
+
+if __name__ == "__main__":
+    print(f"Backend: {BACKEND}")
+    for p in sys.argv[1:] or ["fixtures_2025-10-26.json", "odds_live_dump.json"]:
+        bench(p)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Persistenter Response-Cache für API-Football (SQLite, prozessübergreifend).
+- Key = Endpoint + sortierte Params (der API-Key gehört NICHT dazu)
+- TTL-Policy pro Endpoint (+ Param-Klasse, z.B. /fixtures nur mit ?id=)
+- stale-while-revalidate: nach Ablauf der TTL wird noch SWR Sekunden lang der
+  alte Wert geliefert, der Client holt im Hintergrund frisch nach
+- Hit/Miss/Stale-Zähler pro Endpoint, ebenfalls in der DB (Cron-Worker teilen sie) –
+  gesammelt im Speicher, geschrieben höchstens alle API_CACHE_STATS_FLUSH_SEC (10) und beim Prozessende
+- alle Methoden blockieren (SQLite, busy timeout 10 s): der async Client ruft sie per asyncio.to_thread
+- Live-Endpoints (fixtures?live, odds/live) nur für das kurze Coalescing-Fenster
+  (API_COALESCE_WINDOW_SEC), dazu ein Lease pro Key: holt Prozess A gerade,
+  warten B/C/Dashboard auf dessen Ergebnis statt selbst zu fragen
+
+CLI:
+    python -m lib.http_cache            # Zähler + Einträge je Endpoint
+    python -m lib.http_cache --purge    # abgelaufene Einträge (inkl. SWR) löschen
+"""
+
+import os, sys, time, atexit, sqlite3, threading, collections
+from typing import Any, Dict, Optional, Tuple
+
+from lib import fastjson
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+H = 3600
+LIVE = -1  # TTL = Coalescing-Fenster (ENV, zur Laufzeit gelesen)
+# (Endpoint, Pflicht-Params, TTL, SWR) – erste passende Regel gewinnt.
+# Datums-/Stats-Endpoints (odds?date, fixtures?date, fixtures/statistics) bewusst NICHT.
+TTL_POLICY = [
+    ("/leagues",     set(),        24 * H, 24 * H),
+    ("/teams",       set(),        24 * H, 48 * H),
+    ("/predictions", {"fixture"},  12 * H, 12 * H),
+    ("/fixtures",    {"id"},        6 * H,  6 * H),
+    ("/fixtures",    {"live"},     LIVE,   0),
+    ("/odds/live",   set(),        LIVE,   0),
+]
+
+def coalesce_window() -> float:
+    try:
+        return float(os.getenv("API_COALESCE_WINDOW_SEC") or 3)
+    except ValueError:
+        return 3.0
+
+def cache_key(path: str, params: Optional[Dict[str, Any]]) -> str:
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    return path + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+def policy_for(path: str, params: Optional[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+    keys = set((params or {}).keys())
+    for endpoint, required, ttl, swr in TTL_POLICY:
+        if path == endpoint and required <= keys:
+            return (coalesce_window() if ttl == LIVE else ttl), swr
+    return None
+
+class ResponseCache:
+    """
+    lookup() -> (status, payload) mit status in "fresh" | "stale" | "miss".
+    Thread-safe (sync-Worker revalidieren in einem eigenen Thread).
+    """
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or os.getenv("API_CACHE_DB") or os.path.join(ROOT_DIR, "storage", "api_cache.db")
+        if enabled is None:
+            enabled = os.getenv("API_CACHE_DISABLE", "false").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.stats_flush_sec = float(os.getenv("API_CACHE_STATS_FLUSH_SEC", "10"))
+        self._stats_pending: Dict[Tuple[str, str], int] = collections.Counter()
+        self._stats_flushed = time.monotonic()
+        atexit.register(self.flush_stats)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            c = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                  key         TEXT PRIMARY KEY,
+                  endpoint    TEXT NOT NULL,
+                  payload     TEXT NOT NULL,
+                  fetched_at  REAL NOT NULL,
+                  ttl         INTEGER NOT NULL,
+                  swr         INTEGER NOT NULL
+                )
+            """)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS http_inflight (
+                  key      TEXT PRIMARY KEY,
+                  expires  REAL NOT NULL
+                )
+            """)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache_stats (
+                  endpoint  TEXT PRIMARY KEY,
+                  hits      INTEGER NOT NULL DEFAULT 0,
+                  stale     INTEGER NOT NULL DEFAULT 0,
+                  misses    INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn = c
+        return self._conn
+
+    def _count(self, endpoint: str, field: str):
+        """Unter self._lock: Zähler im Speicher; DB-Write gebündelt (_flush_stats)."""
+        cnt = self.counters.setdefault(endpoint, {"hits": 0, "stale": 0, "misses": 0})
+        cnt[field] += 1
+        self._stats_pending[(endpoint, field)] += 1
+        if time.monotonic() - self._stats_flushed >= self.stats_flush_sec:
+            self._flush_stats()
+
+    def _flush_stats(self):
+        self._stats_flushed = time.monotonic()
+        if not self._stats_pending:
+            return
+        pending, self._stats_pending = self._stats_pending, collections.Counter()
+        c = self._db()
+        for field in ("hits", "stale", "misses"):
+            rows = [(ep, n, n) for (ep, f), n in pending.items() if f == field]
+            if rows:
+                c.executemany(f"""
+                    INSERT INTO http_cache_stats (endpoint, {field}) VALUES (?, ?)
+                    ON CONFLICT (endpoint) DO UPDATE SET {field} = {field} + ?
+                """, rows)
+
+    def flush_stats(self):
+        with self._lock:
+            try:
+                self._flush_stats()
+            except sqlite3.Error as e:
+                print(f"[http_cache] Zähler nicht geschrieben: {e}")
+
+    def cacheable(self, path: str, params: Optional[Dict[str, Any]]) -> bool:
+        pol = policy_for(path, params)
+        return self.enabled and pol is not None and pol[0] > 0
+
+    def lookup(self, path: str, params: Optional[Dict[str, Any]], count: bool = True,
+               raw: bool = False) -> Tuple[str, Any]:
+        """raw=True: gespeicherter JSON-Text statt geparstem Objekt (Decode macht der Aufrufer)."""
+        if not self.cacheable(path, params):
+            return "miss", None
+        key = cache_key(path, params)
+        with self._lock:
+            row = self._db().execute(
+                "SELECT payload, fetched_at, ttl, swr FROM http_cache WHERE key=?", (key,)
+            ).fetchone()
+            age = time.time() - row[1] if row else None
+            if row and age < row[2]:
+                status = "fresh"
+            elif row and age < row[2] + row[3]:
+                status = "stale"
+            else:
+                status = "miss"
+            if count:
+                self._count(path, {"fresh": "hits", "stale": "stale", "miss": "misses"}[status])
+        if status == "miss":
+            return status, None
+        return status, row[0] if raw else fastjson.loads(row[0])
+
+    def store(self, path: str, params: Optional[Dict[str, Any]], payload: dict):
+        if not self.cacheable(path, params):
+            return
+        # API-Football liefert Fehler (Quota, Params) mit HTTP 200 im "errors"-Feld → nicht cachen
+        if payload.get("errors"):
+            return
+        self.store_raw(path, params, fastjson.dumps(payload))
+
+    def store_raw(self, path: str, params: Optional[Dict[str, Any]], body):
+        """Bereits kodierter Body (bytes/str) – Fehlerantworten muss der Aufrufer selbst aussortieren."""
+        pol = policy_for(path, params)
+        if pol is None or not self.cacheable(path, params):
+            return
+        if isinstance(body, (bytes, bytearray)):
+            body = body.decode("utf-8")
+        ttl, swr = pol
+        with self._lock:
+            self._db().execute("""
+                INSERT INTO http_cache (key, endpoint, payload, fetched_at, ttl, swr)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET payload=excluded.payload, fetched_at=excluded.fetched_at,
+                                               ttl=excluded.ttl, swr=excluded.swr
+            """, (cache_key(path, params), path, body, time.time(), ttl, swr))
+
+    def claim(self, path: str, params: Optional[Dict[str, Any]], lease: float) -> bool:
+        """Lease für einen Upstream-Fetch. False = anderer Prozess holt gerade."""
+        key, now = cache_key(path, params), time.time()
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                row = c.execute("SELECT expires FROM http_inflight WHERE key=?", (key,)).fetchone()
+                if row and row[0] > now:
+                    c.execute("ROLLBACK")
+                    return False
+                c.execute("INSERT OR REPLACE INTO http_inflight (key, expires) VALUES (?, ?)", (key, now + lease))
+                c.execute("COMMIT")
+            except sqlite3.Error:
+                c.execute("ROLLBACK")
+                raise
+        return True
+
+    def release(self, path: str, params: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._db().execute("DELETE FROM http_inflight WHERE key=?", (cache_key(path, params),))
+
+    def purge(self) -> int:
+        with self._lock:
+            c = self._db()
+            c.execute("DELETE FROM http_inflight WHERE expires < ?", (time.time(),))
+            return c.execute("DELETE FROM http_cache WHERE fetched_at + ttl + swr < ?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Persistente Zähler (alle Prozesse) + Anzahl Einträge je Endpoint."""
+        with self._lock:
+            self._flush_stats()
+            c = self._db()
+            out = {ep: {"hits": h, "stale": s, "misses": m, "entries": 0}
+                   for ep, h, s, m in c.execute("SELECT endpoint, hits, stale, misses FROM http_cache_stats")}
+            for ep, n in c.execute("SELECT endpoint, COUNT(*) FROM http_cache GROUP BY endpoint"):
+                out.setdefault(ep, {"hits": 0, "stale": 0, "misses": 0, "entries": 0})["entries"] = n
+        return out
+
+    def summary(self) -> str:
+        """Kurzzeile für Loop-/Worker-Logs (nur Zähler dieses Prozesses)."""
+        h = sum(c["hits"] for c in self.counters.values())
+        s = sum(c["stale"] for c in self.counters.values())
+        m = sum(c["misses"] for c in self.counters.values())
+        return f"cache hit {h} | stale {s} | miss {m}"
+
+if __name__ == "__main__":
+    cache = ResponseCache()
+    if "--purge" in sys.argv:
+        print(f"gelöscht: {cache.purge()}")
+    for ep, c in sorted(cache.stats().items()):
+        total = c["hits"] + c["stale"] + c["misses"]
+        rate = (c["hits"] + c["stale"]) / total * 100 if total else 0.0
+        print(f"{ep:<16} entries={c['entries']:<6} hit={c['hits']:<6} stale={c['stale']:<6} miss={c['misses']:<6} ({rate:.0f}%)")
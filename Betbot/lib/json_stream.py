@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming-Parser für API-Football-Antworten: liefert die Einträge von
+response[] einzeln, sobald sie vollständig angekommen sind, statt erst den
+ganzen (mehrere MB großen) Body zu laden und zu parsen.
+Die übrigen Top-Level-Felder (errors, paging, results, ...) landen in `head`.
+
+Nur stdlib: JSONDecoder.raw_decode auf einem gleitenden Puffer. Speicherbedarf
+≈ ein Eintrag + ein Chunk statt kompletter Body + kompletter Objektbaum.
+
+    for item in iter_items(resp.iter_content(CHUNK_SIZE), head=head): ...
+    async for item in aiter_items(resp.content.iter_chunked(CHUNK_SIZE)): ...
+
+Vergleich mit json.load auf den Dumps im Repo:
+    python -m lib.json_stream [datei.json ...]
+"""
+
+import sys, json, time, codecs, tracemalloc
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+_WS = " \t\n\r"
+_NUM = "0123456789.eE+-"
+
+class ResponseStream:
+    """Inkrementeller Parser: feed(bytes) → fertige response[]-Einträge."""
+    def __init__(self, key: str = "response", head: Optional[Dict[str, Any]] = None):
+        self.key = key
+        self.head = head if head is not None else {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._dec = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"   # start | key | colon | value | array | items | done
+        self._cur_key: Optional[str] = None
+        self._retry_at = 0      # große Einträge erst wieder versuchen, wenn sich der Rest verdoppelt hat
+
+    def _skip(self, chars: str = _WS):
+        buf, i = self._buf, self._pos
+        while i < len(buf) and buf[i] in chars:
+            i += 1
+        self._pos = i
+
+    def _decode(self, final: bool):
+        """Nächsten JSON-Wert ab _pos; None = noch nicht vollständig im Puffer."""
+        pending = len(self._buf) - self._pos
+        if not final and pending < self._retry_at:
+            return None
+        try:
+            val, end = self._dec.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            self._retry_at = 2 * pending
+            return None
+        self._retry_at = 0
+        # Zahlen/Literale am Pufferende könnten im nächsten Chunk weitergehen – auch wenn
+        # raw_decode nur einen Teil nimmt ("2." → 2, Rest "." kommt erst mit ".5")
+        if not final and (end == len(self._buf) or (
+                isinstance(val, (int, float)) and not self._buf[end:].strip(_NUM))):
+            return None
+        self._pos = end
+        return (val,)
+
+    def feed(self, data: bytes, final: bool = False) -> List[Any]:
+        self._buf += self._text.decode(data, final)
+        out: List[Any] = []
+        while True:
+            self._skip()
+            if self._pos >= len(self._buf) and self._state != "done":
+                break
+            st = self._state
+            if st == "start":
+                if self._buf[self._pos] != "{":
+                    raise ValueError("JSON-Objekt erwartet")
+                self._pos += 1
+                self._state = "key"
+            elif st == "key":
+                ch = self._buf[self._pos]
+                if ch == ",":
+                    self._pos += 1
+                    continue
+                if ch == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                got = self._decode(final)
+                if got is None:
+                    break
+                self._cur_key = got[0]
+                self._state = "colon"
+            elif st == "colon":
+                if self._buf[self._pos] != ":":
+                    raise ValueError("':' erwartet")
+                self._pos += 1
+                self._state = "array" if self._cur_key == self.key else "value"
+            elif st == "value":
+                got = self._decode(final)
+                if got is None:
+                    break
+                self.head[self._cur_key] = got[0]
+                self._state = "key"
+            elif st == "array":
+                if self._buf[self._pos] != "[":
+                    # kein Array (z.B. Fehlerantwort) → wie ein normales Feld behandeln
+                    self._state = "value"
+                    continue
+                self._pos += 1
+                self._state = "items"
+            elif st == "items":
+                ch = self._buf[self._pos]
+                if ch == ",":
+                    self._pos += 1
+                    continue
+                if ch == "]":
+                    self._pos += 1
+                    self._state = "key"
+                    continue
+                got = self._decode(final)
+                if got is None:
+                    break
+                out.append(got[0])
+            else:  # done
+                break
+        # verbrauchten Teil abschneiden, damit der Puffer nicht mitwächst
+        if self._pos > CHUNK_SIZE:
+            self._buf, self._pos = self._buf[self._pos:], 0
+        return out
+
+    def close(self) -> List[Any]:
+        out = self.feed(b"", final=True)
+        if self._state != "done":
+            raise ValueError("JSON unvollständig")
+        return out
+
+def iter_items(chunks: Iterable[bytes], key: str = "response",
+               head: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    p = ResponseStream(key, head)
+    for chunk in chunks:
+        yield from p.feed(chunk)
+    yield from p.close()
+
+async def aiter_items(chunks: AsyncIterable[bytes], key: str = "response",
+                      head: Optional[Dict[str, Any]] = None):
+    p = ResponseStream(key, head)
+    async for chunk in chunks:
+        for item in p.feed(chunk):
+            yield item
+    for item in p.close():
+        yield item
+
+# ========= Vergleich: json.load vs. Streaming =========
+def _file_chunks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def _measure(fn):
+    # Zeit ohne tracemalloc (verzerrt stark), Peak in einem zweiten Lauf
+    t0 = time.perf_counter()
+    first, n = fn()
+    total = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, first, peak, n
+
+def compare(path: str):
+    # Verbraucher wie in den Workern: pro Eintrag Fixture-ID lesen, nichts aufheben
+    def full():
+        t0 = time.perf_counter()
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+        first = None
+        n = 0
+        for item in data.get("response", []):
+            first = first or time.perf_counter() - t0
+            n += (item.get("fixture") or {}).get("id") is not None
+        return first, n
+
+    def stream():
+        t0 = time.perf_counter()
+        first = None
+        n = 0
+        for item in iter_items(_file_chunks(path)):
+            first = first or time.perf_counter() - t0
+            n += (item.get("fixture") or {}).get("id") is not None
+        return first, n
+
+    for name, fn in (("json.loads", full), ("stream", stream)):
+        total, first, peak, n = _measure(fn)
+        print(f"{path:<28} {name:<10} items={n:<5} erstes Item {first * 1000:7.1f} ms | "
+              f"gesamt {total * 1000:7.1f} ms | Peak {peak / 1e6:6.2f} MB")
+
+if __name__ == "__main__":
+    for p in sys.argv[1:] or ["fixtures_2025-10-26.json", "odds_live_dump.json"]:
+        compare(p)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Transformationen für odds/live und fixtures?live=all (betbot.run).
+Reine Funktionen auf Modulebene: laufen per get_json(..., parse=) zusammen mit dem
+JSON-Decode im Offload-Pool (lib.offload) – zurück an den Event-Loop geht nur das
+kleine Ergebnis statt des kompletten Objektbaums.
+"""
+
+from typing import Dict, Optional
+
+from lib.poll_policy import red_cards
+
+ONE_X_TWO_KEYS = ("1x2", "match result", "match winner", "full time", "winner",
+                  "regular time", "win-draw-win", "resultado final", "ergebnis (3-weg)")
+
+def pick_1x2_market(odds_list: list) -> Optional[dict]:
+    for o in odds_list or []:
+        name = (o.get("name") or "").lower()
+        if any(k in name for k in ONE_X_TWO_KEYS):
+            return o
+    return None
+
+def odds_live_books(data: dict) -> Dict[int, Dict[str, float]]:
+    """odds/live → dict[fid] = {'home','draw','away'} (nur wenn 1X2 existiert)."""
+    out: Dict[int, Dict[str, float]] = {}
+    for row in data.get("response", []) or []:
+        fixture = row.get("fixture") or {}
+        fid = fixture.get("id")
+        if not fid:
+            continue
+        m = pick_1x2_market(row.get("odds") or [])
+        if not m:
+            continue
+        book = {"home": None, "draw": None, "away": None}
+        for v in m.get("values", []) or []:
+            val = (v.get("value") or "").lower()
+            odd = v.get("odd")
+            try:
+                odd = float(str(odd).replace(",", "."))
+            except:
+                odd = None
+            if val in ("home", "1"): book["home"] = odd
+            if val in ("draw", "x"):  book["draw"] = odd
+            if val in ("away", "2"):  book["away"] = odd
+        if any(book.values()):
+            out[fid] = book
+    return out
+
+def live_fixtures_meta(data: dict) -> Dict[int, dict]:
+    """fixtures(live=all) → dict[fid] -> Meta (Minute, Teams, Liga, Status, Tore, Rote Karten)."""
+    res: Dict[int, dict] = {}
+    for r in data.get("response", []) or []:
+        fx   = r.get("fixture") or {}
+        lg   = r.get("league") or {}
+        tms  = r.get("teams") or {}
+        fid  = fx.get("id")
+        if not fid:
+            continue
+        res[fid] = {
+            "fixture_id": fid,
+            "status_short": (fx.get("status") or {}).get("short"),
+            "minute": (fx.get("status") or {}).get("elapsed") or 0,
+            "red_cards": red_cards(r.get("events")),
+            "goals_home": (r.get("goals") or {}).get("home"),
+            "goals_away": (r.get("goals") or {}).get("away"),
+            "league_id": lg.get("id"), "league_name": lg.get("name"), "season": lg.get("season"),
+            "home_id": (tms.get("home") or {}).get("id"),
+            "home_name": (tms.get("home") or {}).get("name"),
+            "away_id": (tms.get("away") or {}).get("id"),
+            "away_name": (tms.get("away") or {}).get("name"),
+        }
+    return res
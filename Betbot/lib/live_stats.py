@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Gebündelte In-Play-Statistiken über /fixtures?ids=a-b-c (max. 20 IDs pro Call).
+Die Antwort enthält pro Spiel statistics/events/lineups – statistics hat dieselbe
+Form wie die Antwort von /fixtures/statistics?fixture=:
+    [{"team": {"id": ..}, "statistics": [{"type": "Shots on Goal", "value": 4}, ..]}, ..]
+Damit bleiben snapshot_row (live_monitor) und write_snapshot_from_api (betbot)
+unverändert; statt 1 Request pro Spiel nur noch 1 pro 20 Spiele.
+
+iter_stats_blocks: mehrere Blöcke parallel (max. STATS_CONCURRENCY gleichzeitig), Ergebnisse
+in Fertig-Reihenfolge – das Tempo bestimmt das Budget im Client (Lane "stats"), nicht ein
+fester Jitter zwischen den Calls.
+"""
+
+import os, asyncio
+from typing import Dict, Iterable, List, Sequence
+
+IDS_PER_CALL = 20  # Limit von API-Football für ?ids=
+STATS_CONCURRENCY = int(os.getenv("STATS_CONCURRENCY", "4"))
+
+def stats_blocks(fids: Iterable[int], size: int = IDS_PER_CALL) -> List[List[int]]:
+    fids = list(dict.fromkeys(fids))
+    return [fids[i:i + size] for i in range(0, len(fids), size)]
+
+def stats_from_fixture(row: dict) -> List[dict]:
+    """statistics eines /fixtures-Eintrags, Reihenfolge Heim, Auswärts (wie /fixtures/statistics)."""
+    stats = [s for s in (row.get("statistics") or []) if s.get("statistics")]
+    home_id = (((row.get("teams") or {}).get("home")) or {}).get("id")
+    # Heimteam zuerst – die API hält die Reihenfolge meist ein, garantiert ist sie nicht
+    return sorted(stats, key=lambda s: ((s.get("team") or {}).get("id") != home_id))
+
+async def fetch_stats_block(http, fids: List[int]) -> Dict[int, List[dict]]:
+    """EIN Request für bis zu 20 Spiele → {fid: [heim, auswärts]} (leer, wenn ohne Stats)."""
+    data = await http.get_json("/fixtures", {"ids": "-".join(str(f) for f in fids)})
+    out: Dict[int, List[dict]] = {fid: [] for fid in fids}
+    for row in data.get("response", []) or []:
+        fid = (row.get("fixture") or {}).get("id")
+        if fid in out:
+            out[fid] = stats_from_fixture(row)
+    return out
+
+async def iter_stats_blocks(http, blocks: Sequence[List[int]], width: int = STATS_CONCURRENCY):
+    """
+    → (block, {fid: [heim, auswärts]} | Exception) sobald ein Block fertig ist.
+    Fehler (inkl. CircuitOpen) kommen als Wert zurück, damit ein Block die anderen nicht abbricht.
+    """
+    sem = asyncio.Semaphore(max(1, width))
+
+    async def one(block: List[int]):
+        async with sem:
+            try:
+                return block, await fetch_stats_block(http, block)
+            except Exception as e:
+                return block, e
+
+    tasks = [asyncio.create_task(one(b)) for b in blocks]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
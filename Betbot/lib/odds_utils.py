@@ -5,7 +5,7 @@ Verwendet von GambleBros-Workern (z.B. prematch_15min.py, prematch_overmorrow.py
 Autor: Tobias / GambleBros Projekt
 """
 
-import statistics
+import os, statistics
 
 # ============================================================
 # 📊 Allgemeine Hilfsfunktionen
@@ -156,21 +156,57 @@ def aggregate_btts(bookmakers, market_name="Both Teams Score"):
     )
 
 
+# ============================================================
+# 🔎 Serverseitige Markt-Filter (/odds?bet=&bookmaker=)
+# ============================================================
+
+# Bet-IDs von API-Football (/odds/bets)
+BET_MATCH_WINNER = 1   # "Match Winner"
+BET_OVER_UNDER   = 5   # "Goals Over/Under"
+BET_BTTS         = 8   # "Both Teams Score"
+
+def bookmakers_from_env(name="ODDS_BOOKMAKERS"):
+    """Bookmaker-IDs als Komma-Liste (z.B. "8,6"); leer = alle Bookies."""
+    return tuple(int(x) for x in (os.getenv(name) or "").replace(" ", "").split(",") if x.isdigit())
+
+def merge_odds(parts):
+    """
+    Führt mehrere /odds-Antworten (je Markt/Bookie ein Request) zu einer zusammen:
+    pro Fixture ein Eintrag, pro Bookmaker eine Liste bets (ohne doppelte Bet-IDs).
+    """
+    by_fixture, order = {}, []
+    for part in parts:
+        for item in (part or {}).get("response", []) or []:
+            fid = (item.get("fixture") or {}).get("id")
+            if fid not in by_fixture:
+                by_fixture[fid] = dict(item, bookmakers=[])
+                order.append(fid)
+            books = by_fixture[fid]["bookmakers"]
+            for bm in item.get("bookmakers", []) or []:
+                cur = next((x for x in books if x.get("id") == bm.get("id")), None)
+                if cur is None:
+                    books.append(dict(bm, bets=list(bm.get("bets", []) or [])))
+                    continue
+                have = {b.get("id") for b in cur["bets"]}
+                cur["bets"].extend(b for b in bm.get("bets", []) or [] if b.get("id") not in have)
+    errors = [p.get("errors") for p in parts if (p or {}).get("errors")]
+    return {"results": len(order), "errors": errors[0] if errors else [],
+            "response": [by_fixture[f] for f in order]}
+
+
 # ============================================================
 # 🧪 Quick Test (nur manuell ausführen)
 # ============================================================
 
 if __name__ == "__main__":
-    import os, requests, json
+    import sys, json
     from dotenv import load_dotenv
     load_dotenv(dotenv_path=".env_gamblebros")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from lib.api_client import get_odds_sync
 
-    API = os.getenv("APIFOOTBALL_BASE")
-    KEY = os.getenv("APIFOOTBALL_KEY")
-    HDR = {"x-apisports-key": KEY}
-
-    r = requests.get(f"{API}/odds", params={"date": "2025-10-26"}, headers=HDR, timeout=60)
-    data = r.json()["response"][0]["bookmakers"]
+    r = get_odds_sync({"date": "2025-10-26"}, bets=(BET_MATCH_WINNER, BET_OVER_UNDER, BET_BTTS))
+    data = r["response"][0]["bookmakers"]
 
     print("✅ 1X2:", json.dumps(aggregate_market_odds(data), indent=2))
     print("✅ OU 2.5:", json.dumps(aggregate_over_under(data, "2.5"), indent=2))
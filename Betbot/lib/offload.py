@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+CPU-Arbeit vom Event-Loop fernhalten + Loop-Lag messen.
+
+- decode_body(): JSON-Decode + optionale Transformation in EINEM Schritt. Große Bodies
+  (≥ OFFLOAD_MIN_BYTES) laufen im Pool, kleine inline (Pool-Overhead lohnt nicht).
+- OFFLOAD_EXECUTOR=process (Default): eigener Prozess, der Loop bleibt auch während
+  des C-Decoders (hält die GIL) frei; zurück kommt nur das kleine Ergebnis der
+  Transformation – deshalb parse-Funktionen auf Modulebene (picklebar, lib.live_parse).
+  Ohne reduzierende Transformation (ganzer Objektbaum als Ergebnis) geht die Arbeit in den
+  ThreadPool: den Baum zurück zum Parent zu pickeln kostet mehr als der Decode selbst.
+  thread = ThreadPool (wenig Overhead, hilft nur beim Python-Teil), off = alles inline.
+- LoopLag: misst, wie spät ein asyncio.sleep(interval) aufwacht (= blockierte Callbacks).
+
+Vergleich inline/thread/process auf den Dumps im Repo:
+    python -m lib.offload [datei.json ...]
+"""
+
+import os, sys, time, asyncio, collections, multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lib.fastjson import loads
+
+OFFLOAD_MIN_BYTES = int(os.getenv("OFFLOAD_MIN_BYTES", str(256 * 1024)))
+OFFLOAD_EXECUTOR  = os.getenv("OFFLOAD_EXECUTOR", "process").lower()   # process | thread | off
+OFFLOAD_WORKERS   = int(os.getenv("OFFLOAD_WORKERS", "2"))
+
+_executors: Dict[str, Executor] = {}
+counters = {"inline": 0, "offloaded": 0}
+
+def decode_body(body, parse: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, bool]:
+    """→ (parse(data) bzw. data, API-Fehler im "errors"-Feld?)."""
+    data = loads(body)
+    errors = bool(isinstance(data, dict) and data.get("errors"))
+    return (parse(data) if parse else data), errors
+
+def no_result(data) -> None:
+    """parse für Aufrufer, die nur das errors-Flag brauchen (Cache-Revalidate)."""
+    return None
+
+def _mp_context():
+    # fork: Worker importieren den Entry-Point (betbot.py: dotenv, Playwright, DB) nicht erneut;
+    # warmup() startet den Pool, bevor aiohttp-/Playwright-Threads laufen
+    method = os.getenv("OFFLOAD_MP_START") or ("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    return multiprocessing.get_context(method)
+
+def executor(mode: str = OFFLOAD_EXECUTOR) -> Optional[Executor]:
+    if mode == "off":
+        return None
+    mode = "thread" if mode == "thread" else "process"
+    pool = _executors.get(mode)
+    if pool is None:
+        if mode == "thread":
+            pool = ThreadPoolExecutor(OFFLOAD_WORKERS, thread_name_prefix="offload")
+        else:
+            pool = ProcessPoolExecutor(OFFLOAD_WORKERS, mp_context=_mp_context())
+        _executors[mode] = pool
+    return pool
+
+async def run_cpu(size: int, fn: Callable, *args, reduces: bool = True):
+    """
+    fn(*args) im Pool, wenn size ≥ OFFLOAD_MIN_BYTES – sonst direkt.
+    reduces=False: Ergebnis ist so groß wie die Eingabe (z.B. decode_body ohne parse) →
+    höchstens ThreadPool, nie der Prozess-Pool.
+    """
+    mode = OFFLOAD_EXECUTOR if reduces or OFFLOAD_EXECUTOR == "off" else "thread"
+    pool = executor(mode) if size >= OFFLOAD_MIN_BYTES else None
+    if pool is None:
+        counters["inline"] += 1
+        return fn(*args)
+    counters["offloaded"] += 1
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+def warmup():
+    """
+    Pool jetzt starten (Prozess-Pool mit fork: alle Worker auf einmal). Im Entry-Point
+    aufrufen, bevor Threads laufen (Telemetrie, Kosten-Ledger, aiohttp-Resolver, Playwright) –
+    ein fork aus einem Prozess mit Threads kann Locks im Kind gesperrt erben.
+    """
+    pool = executor()
+    if pool is not None:
+        pool.submit(no_result, None).result()
+
+def shutdown():
+    for pool in _executors.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
+
+# ========= Loop-Lag =========
+class LoopLag:
+    """
+    Hintergrund-Task: schläft `interval` s und misst die Verspätung beim Aufwachen.
+    summary() = p50/p95/max seit dem letzten Aufruf (danach zurückgesetzt).
+    """
+    def __init__(self, interval: float = None, warn_ms: float = None):
+        self.interval = interval if interval is not None else float(os.getenv("LOOP_LAG_INTERVAL_SEC", "0.25"))
+        self.warn_ms = warn_ms if warn_ms is not None else float(os.getenv("LOOP_LAG_WARN_MS", "250"))
+        self.samples = collections.deque(maxlen=4096)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, (time.perf_counter() - t0 - self.interval) * 1000)
+            self.samples.append(lag)
+            if lag >= self.warn_ms:
+                print(f"[loop-lag] Event-Loop {lag:.0f} ms blockiert")
+
+    def stats(self, reset: bool = True) -> Dict[str, float]:
+        s = sorted(self.samples)
+        if reset:
+            self.samples.clear()
+        if not s:
+            return {"n": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {"n": len(s), "p50": s[len(s) // 2], "p95": s[min(len(s) - 1, int(len(s) * 0.95))], "max": s[-1]}
+
+    def summary(self, reset: bool = True) -> str:
+        st = self.stats(reset)
+        return f"lag p50={st['p50']:.0f}ms p95={st['p95']:.0f}ms max={st['max']:.0f}ms"
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# ========= Vergleich inline / thread / process =========
+async def _bench_mode(mode: str, body: bytes, parse, rounds: int):
+    shutdown()
+    pool = executor(mode)
+    if pool is not None:
+        pool.submit(no_result, None).result()  # Worker hochfahren
+    lag = LoopLag(interval=0.002, warn_ms=float("inf")).start()
+    await asyncio.sleep(0.05)
+    lag.stats()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        if pool is None:
+            decode_body(body, parse)
+        else:
+            await asyncio.get_running_loop().run_in_executor(pool, decode_body, body, parse)
+        await asyncio.sleep(0)
+    total = (time.perf_counter() - t0) / rounds * 1000
+    await asyncio.sleep(0.01)
+    await lag.stop()
+    shutdown()
+    return total, lag.stats()
+
+async def _bench(paths):
+    from lib.live_parse import live_fixtures_meta, odds_live_books
+    for path in paths:
+        body = open(path, "rb").read()
+        parse = odds_live_books if "odds" in os.path.basename(path) else live_fixtures_meta
+        print(f"{path} ({len(body) / 1e6:.1f} MB, parse={parse.__name__})")
+        for mode in ("off", "thread", "process"):
+            per_call, st = await _bench_mode(mode, body, parse, rounds=10)
+            print(f"  {mode:<8} {per_call:7.1f} ms/Call | Loop-Lag p50={st['p50']:5.1f} "
+                  f"p95={st['p95']:5.1f} max={st['max']:5.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(_bench(sys.argv[1:] or ["fixtures_2025-10-26.json", "odds_live_dump.json"]))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Spielphasen-Policy für das Stats-Polling (live_monitor, betbot).
+Eine Tabelle statt verstreuter if-Abfragen: status.short + Minute → Faktor auf das
+Stats-Intervall (0.5 = doppelt so oft, 2.0 = halb so oft, None = gar nicht pollen).
+Erste passende Zeile gewinnt; Status ohne Zeile werden normal gepollt (Faktor 1.0).
+
+- HT / BT / P / INT / SUSP: Statistiken stehen still → kein Poll
+- früh im Spiel langsam, Schlussphase und Verlängerung schnell
+- nach einer Roten Karte (fixtures?live=all liefert events) zusätzlich RED_CARD_FACTOR
+
+Eigene Tabelle: POLL_POLICY_FILE=policy.json mit Zeilen [["1H","2H"], von, bis, faktor|null].
+
+Simulator – spielt einen aufgezeichneten Spieltag (fixtures?date=-Dump) nach und
+vergleicht das bisherige Verhalten (fixes Intervall, nur STATS_MIN/MAX_MINUTE) mit der Policy:
+    python -m lib.poll_policy [fixtures_2025-10-26.json] [--interval 120] [--tick 15]
+"""
+
+import os, sys, json, math, argparse, collections
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+Rule = Tuple[Sequence[str], int, int, Optional[float]]
+
+ENDED = ("FT", "AET", "PEN", "PST", "CANC", "ABD", "AWD", "WO")
+
+DEFAULT_POLICY: List[Rule] = [
+    # status                              von  bis  Faktor
+    (("NS", "TBD") + ENDED,                 0, 999, None),
+    (("HT", "BT", "P", "INT", "SUSP"),      0, 999, None),
+    (("1H",),                               0,  14, 2.0),
+    (("1H",),                              15,  44, 1.5),
+    (("1H",),                              45, 999, 1.0),    # Nachspielzeit 1. HZ
+    (("2H",),                              46,  69, 1.25),
+    (("2H",),                              70,  84, 0.75),
+    (("2H",),                              85, 999, 0.5),
+    (("ET",),                               0, 999, 0.75),
+]
+RED_CARD_FACTOR = float(os.getenv("RED_CARD_FACTOR", "0.5"))
+
+def load_policy(path: Optional[str] = None) -> List[Rule]:
+    path = path or os.getenv("POLL_POLICY_FILE")
+    if not path:
+        return DEFAULT_POLICY
+    with open(path, encoding="utf-8") as f:
+        return [(tuple(st), int(lo), int(hi), None if fac is None else float(fac)) for st, lo, hi, fac in json.load(f)]
+
+POLICY = load_policy()
+
+def poll_factor(status: Optional[str], minute: int, red_cards: int = 0,
+                policy: Sequence[Rule] = None) -> Optional[float]:
+    """Faktor auf das Stats-Intervall, None = in dieser Phase nicht pollen."""
+    status = (status or "").upper()
+    for statuses, lo, hi, factor in POLICY if policy is None else policy:
+        if status in statuses and lo <= minute <= hi:
+            break
+    else:
+        factor = 1.0
+    if factor is not None and red_cards:
+        factor *= RED_CARD_FACTOR
+    return factor
+
+def red_cards(events: Optional[list]) -> int:
+    """Rote Karten (inkl. Gelb-Rot) aus den events eines fixtures?live=all-Eintrags."""
+    return sum(1 for e in events or []
+               if (e.get("type") or "").lower() == "card" and "red" in (e.get("detail") or "").lower())
+
+# ========= Simulator =========
+MIN = 60
+
+def timeline(row: dict) -> Iterator[Tuple[int, int, str, int]]:
+    """
+    Grobe Rekonstruktion eines beendeten Spiels aus dem Tages-Dump → (von, bis, status, minute) in Unix-Sekunden.
+    1. HZ 45 + 2 min Nachspielzeit, Pause bis periods.second, 2. HZ 45 + 4, Verlängerung
+    (AET/PEN) nach 5 min BT 30 + 2 min, Elfmeterschießen 10 min.
+    """
+    fx = row.get("fixture") or {}
+    short = (fx.get("status") or {}).get("short")
+    periods = fx.get("periods") or {}
+    k = periods.get("first") or fx.get("timestamp")
+    if not k or short not in ("FT", "AET", "PEN"):
+        return
+    s = periods.get("second") or k + 62 * MIN
+    for m in range(1, 46):
+        yield k + (m - 1) * MIN, k + m * MIN, "1H", m
+    yield k + 45 * MIN, k + 47 * MIN, "1H", 45
+    if s > k + 47 * MIN:
+        yield k + 47 * MIN, s, "HT", 45
+    else:
+        s = k + 62 * MIN
+        yield k + 47 * MIN, s, "HT", 45
+    for m in range(46, 91):
+        yield s + (m - 46) * MIN, s + (m - 45) * MIN, "2H", m
+    end = s + 45 * MIN
+    yield end, end + 4 * MIN, "2H", 90
+    end += 4 * MIN
+    if short == "FT":
+        return
+    yield end, end + 5 * MIN, "BT", 90
+    end += 5 * MIN
+    for m in range(91, 121):
+        yield end + (m - 91) * MIN, end + (m - 90) * MIN, "ET", m
+    end += 30 * MIN
+    yield end, end + 2 * MIN, "ET", 120
+    end += 2 * MIN
+    if short == "PEN":
+        yield end, end + 10 * MIN, "P", 120
+
+def simulate(rows: List[dict], interval: float, tick: float, use_policy: bool,
+             min_minute: int, max_minute: int, per_call: int = 20) -> Dict[str, float]:
+    """Tick für Tick durch den Tag; gepollt wird über denselben PollScheduler wie live."""
+    from lib.poll_scheduler import PollScheduler
+    phases = {fid: list(timeline(r)) for fid, r in ((r["fixture"]["id"], r) for r in rows)}
+    phases = {fid: p for fid, p in phases.items() if p}
+    if not phases:
+        return {"fixtures": 0, "polls": 0, "calls": 0, "by_status": {}}
+    t0 = min(p[0][0] for p in phases.values())
+    t1 = max(p[-1][1] for p in phases.values())
+    sched = PollScheduler(interval, min_interval=interval * 0.25, max_interval=interval * 4)
+    cursor = {fid: 0 for fid in phases}
+    polls = calls = 0
+    by_status = collections.Counter()
+    t = t0
+    while t < t1:
+        live = {}
+        for fid, p in phases.items():
+            i = cursor[fid]
+            while i < len(p) and p[i][1] <= t:
+                i += 1
+            cursor[fid] = i
+            if i < len(p) and p[i][0] <= t:
+                live[fid] = p[i]
+        keep = []
+        for fid, (_, _, status, minute) in live.items():
+            if minute < min_minute or minute > max_minute:
+                continue
+            factor = poll_factor(status, minute) if use_policy else 1.0
+            if factor is None:
+                continue
+            keep.append(fid)
+            sched.update(fid, 1.0 / factor, now=t)
+        sched.retain(keep)
+        due = sched.pop_due(now=t)
+        polls += len(due)
+        calls += math.ceil(len(due) / per_call)
+        for fid in due:
+            by_status[live[fid][2]] += 1
+        t += tick
+    return {"fixtures": len(phases), "polls": polls, "calls": calls, "by_status": dict(by_status)}
+
+def _main(argv=None):
+    ap = argparse.ArgumentParser(description="Polling-Policy auf einem aufgezeichneten Spieltag simulieren")
+    ap.add_argument("path", nargs="?", default="fixtures_2025-10-26.json")
+    ap.add_argument("--interval", type=float, default=float(os.getenv("STATS_INTERVAL_SEC", "120")))
+    ap.add_argument("--tick", type=float, default=float(os.getenv("POLL_SECONDS", "15")))
+    ap.add_argument("--min-minute", type=int, default=int(os.getenv("STATS_MIN_MINUTE", "3")))
+    ap.add_argument("--max-minute", type=int, default=int(os.getenv("STATS_MAX_MINUTE", "100")))
+    args = ap.parse_args(argv)
+    with open(args.path, "rb") as f:
+        rows = (json.load(f) or {}).get("response") or []
+    base = simulate(rows, args.interval, args.tick, False, args.min_minute, args.max_minute)
+    pol = simulate(rows, args.interval, args.tick, True, args.min_minute, args.max_minute)
+    print(f"{args.path}: {base['fixtures']} beendete Spiele rekonstruiert, Intervall {args.interval:.0f}s, Tick {args.tick:.0f}s")
+    for name, r in (("bisher", base), ("policy", pol)):
+        st = " ".join(f"{k}={v}" for k, v in sorted(r["by_status"].items()))
+        print(f"  {name:<7} Spiel-Polls {r['polls']:6d} | Calls (ids=20) {r['calls']:5d} | {st}")
+    if base["calls"]:
+        print(f"  gespart: {base['polls'] - pol['polls']} Spiel-Polls ({100 * (1 - pol['polls'] / base['polls']):.1f}%), "
+              f"{base['calls'] - pol['calls']} Calls ({100 * (1 - pol['calls'] / base['calls']):.1f}%)")
+    print("  (Rote Karten enthält der Tages-Dump nicht – RED_CARD_FACTOR wirkt nur live)")
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
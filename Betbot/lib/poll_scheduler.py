@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Deadline-Scheduler für das Stats-Polling je Fixture (live_monitor, betbot).
+Statt jede Runde alle Fixtures linear auf "fällig?" zu prüfen, liegt jedes Spiel mit
+seinem nächsten Termin in einem Heap; der Loop schläft bis zum nächsten Termin.
+
+- Gewicht je Spiel (fixture_weight): tippbar (Odds vorhanden), Liga-Tier, Bewegung der
+  Live-Quote; Spielphase/Minute kommt als Faktor aus lib.poll_policy (Gewicht / Faktor)
+  → Intervall = STATS_INTERVAL_SEC / Gewicht, begrenzt auf STATS_MIN_INTERVAL_SEC .. STATS_MAX_INTERVAL_SEC
+- pop_due(limit): fällige Spiele, höchstes Gewicht zuerst, höchstens `limit` (Budget);
+  geholte Spiele sind sofort für now + Intervall neu eingeplant, reschedule() übersteuert
+  (Fehler, Backoff, Event-Trigger)
+- planned_per_min(): geplante Requests/Minute für den Abgleich mit dem Budget
+- next_wake(): Sekunden bis zum nächsten Termin (Stats, Fixtures-/Odds-Refresh) für den Loop-Sleep
+- EmptyBackoff: Negativ-Cache für Spiele ohne Stats-Abdeckung – jede leere Antwort verdoppelt
+  die Pause (STATS_EMPTY_BACKOFF_SEC, 2x, 4x, ... bis STATS_EMPTY_BACKOFF_MAX_SEC),
+  die erste Antwort mit Stats setzt zurück
+- EventTrigger: fixtures?live=all-Stand je Spiel mit dem letzten vergleichen (Tor, Rote Karte,
+  Statuswechsel, Minutensprung ≥ EVENT_MINUTE_JUMP) → Sofort-Refresh für genau dieses Spiel,
+  höchstens einmal je EVENT_DEBOUNCE_SEC (Default 60)
+
+LEAGUE_TIERS="39:1,140:1,78:1,135:1,61:1,2:1,40:2" – Tier 1 = häufiger, Tier 3+ = seltener;
+Ligen ohne Eintrag zählen als Tier 2 (neutral).
+"""
+
+import os, heapq, itertools, time, collections
+from typing import Dict, Iterable, List, Optional
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def league_tiers() -> Dict[int, int]:
+    out: Dict[int, int] = {}
+    for part in (os.getenv("LEAGUE_TIERS") or "").split(","):
+        lid, _, tier = part.partition(":")
+        try:
+            out[int(lid)] = int(tier or 2)
+        except ValueError:
+            pass
+    return out
+
+TIER_WEIGHT   = {1: 1.3, 2: 1.0}
+ODDS_MOVE_PP  = _env_float("ODDS_MOVE_PP", 0.03)   # Änderung der implizierten Wkt., ab der ein Spiel "heiß" ist
+
+def fixture_weight(tippable: bool = True, tier: int = 2, odds_move: float = 0.0, phase: float = 1.0) -> float:
+    """> 1 = öfter pollen, < 1 = seltener; phase = Faktor aus poll_policy.poll_factor()."""
+    w = 1.0 / phase
+    w *= 1.3 if tippable else 0.8
+    w *= TIER_WEIGHT.get(tier, 0.8)
+    if odds_move >= ODDS_MOVE_PP:
+        w *= 1.5
+    return w
+
+def _implied(book: dict) -> Dict[str, float]:
+    out = {}
+    for k in ("home", "draw", "away"):
+        try:
+            v = float(book.get(k) or 0)
+        except (TypeError, ValueError):
+            v = 0.0
+        if v > 1:
+            out[k] = 1.0 / v
+    return out
+
+def odds_moves(prev: Dict[int, dict], cur: Dict[int, dict]) -> Dict[int, float]:
+    """Größte Änderung der implizierten 1X2-Wahrscheinlichkeit je Spiel seit dem letzten Odds-Pull."""
+    out: Dict[int, float] = {}
+    for fid, book in cur.items():
+        old = prev.get(fid)
+        if not old:
+            continue
+        a, b = _implied(old), _implied(book)
+        diffs = [abs(a[k] - b[k]) for k in a.keys() & b.keys()]
+        if diffs:
+            out[fid] = max(diffs)
+    return out
+
+def next_wake(deadlines: Iterable[Optional[float]], now: Optional[float] = None,
+              floor: float = 0.5, cap: float = 60.0) -> float:
+    """Schlafdauer bis zum frühesten Termin (None wird ignoriert), begrenzt auf floor..cap."""
+    now = time.monotonic() if now is None else now
+    due = [d for d in deadlines if d is not None]
+    return cap if not due else min(cap, max(floor, min(due) - now))
+
+class EmptyBackoff:
+    def __init__(self, base: Optional[float] = None, cap: Optional[float] = None):
+        # base = Default für STATS_EMPTY_BACKOFF_SEC (Loops geben ihr STATS_INTERVAL_SEC mit)
+        self.base = _env_float("STATS_EMPTY_BACKOFF_SEC", base if base is not None else 120)
+        self.cap = _env_float("STATS_EMPTY_BACKOFF_MAX_SEC", cap if cap is not None else 1800)
+        self.misses: Dict[int, int] = {}
+        self.resets = 0
+
+    def miss(self, fid: int) -> float:
+        """Leere Antwort merken → Pause in Sekunden bis zum nächsten Versuch."""
+        n = self.misses[fid] = self.misses.get(fid, 0) + 1
+        return self.delay(n)
+
+    def delay(self, n: int) -> float:
+        return min(self.cap, self.base * 2 ** min(n - 1, 20))
+
+    def hit(self, fid: int):
+        if self.misses.pop(fid, None) is not None:
+            self.resets += 1
+
+    def retain(self, fids: Iterable[int]):
+        keep = set(fids)
+        for fid in [f for f in self.misses if f not in keep]:
+            del self.misses[fid]
+
+    def summary(self) -> str:
+        if not self.misses:
+            return f"empty-backoff 0 (reset {self.resets})"
+        top = max(self.misses.values())
+        capped = sum(1 for n in self.misses.values() if self.delay(n) >= self.cap)
+        return f"empty-backoff {len(self.misses)} (max {self.delay(top):.0f}s, capped {capped}, reset {self.resets})"
+
+class EventTrigger:
+    def __init__(self, debounce: Optional[float] = None, jump: Optional[float] = None):
+        self.debounce = debounce if debounce is not None else _env_float("EVENT_DEBOUNCE_SEC", 60)
+        self.jump = jump if jump is not None else _env_float("EVENT_MINUTE_JUMP", 3)
+        self._state: Dict[int, tuple] = {}     # fid -> (tore heim, tore ausw., status, minute, rote, monotonic)
+        self._fired_at: Dict[int, float] = {}
+        self.fired: Dict[str, int] = collections.Counter()
+        self.debounced = 0
+
+    def check(self, fid: int, meta: dict, now: Optional[float] = None) -> Optional[str]:
+        """Neuen Stand merken → "goal" / "card" / "status" / "jump" oder None (nichts passiert bzw. entprellt)."""
+        now = time.monotonic() if now is None else now
+        cur = (meta.get("goals_home"), meta.get("goals_away"), meta.get("status_short"),
+               int(meta.get("minute") or 0), meta.get("red_cards") or 0)
+        old = self._state.get(fid)
+        self._state[fid] = cur + (now,)
+        if old is None:
+            return None
+        if cur[:2] != old[:2]:
+            reason = "goal"
+        elif cur[4] != old[4]:
+            reason = "card"
+        elif cur[2] != old[2]:
+            reason = "status"
+        elif cur[3] - old[3] - (now - old[5]) / 60 >= self.jump:
+            reason = "jump"
+        else:
+            return None
+        if now - self._fired_at.get(fid, float("-inf")) < self.debounce:
+            self.debounced += 1
+            return None
+        self._fired_at[fid] = now
+        self.fired[reason] += 1
+        return reason
+
+    def retain(self, fids: Iterable[int]):
+        keep = set(fids)
+        for d in (self._state, self._fired_at):
+            for fid in [f for f in d if f not in keep]:
+                del d[fid]
+
+    def summary(self) -> str:
+        parts = " ".join(f"{k}={v}" for k, v in sorted(self.fired.items())) or "0"
+        return f"events {parts} (debounced {self.debounced})"
+
+class _Entry:
+    __slots__ = ("due", "weight", "interval", "version")
+
+    def __init__(self, due: float, weight: float, interval: float):
+        self.due, self.weight, self.interval, self.version = due, weight, interval, 0
+
+class PollScheduler:
+    def __init__(self, base_interval: float, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None):
+        self.base = base_interval
+        self.min_interval = min_interval if min_interval is not None else _env_float("STATS_MIN_INTERVAL_SEC", 30)
+        self.max_interval = max_interval if max_interval is not None else _env_float("STATS_MAX_INTERVAL_SEC", 3 * base_interval)
+        self._heap: List[tuple] = []
+        self._entries: Dict[int, _Entry] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, fid: int) -> bool:
+        return fid in self._entries
+
+    def interval_for(self, weight: float) -> float:
+        return min(self.max_interval, max(self.min_interval, self.base / max(weight, 1e-6)))
+
+    def _push(self, fid: int, e: _Entry):
+        e.version += 1
+        heapq.heappush(self._heap, (e.due, -e.weight, next(self._seq), fid, e.version))
+
+    def update(self, fid: int, weight: float, now: Optional[float] = None):
+        """Neues Spiel = sofort fällig; bei höherem Gewicht rückt der Termin entsprechend vor."""
+        now = time.monotonic() if now is None else now
+        interval = self.interval_for(weight)
+        e = self._entries.get(fid)
+        if e is None:
+            self._entries[fid] = e = _Entry(now, weight, interval)
+            self._push(fid, e)
+            return
+        if weight == e.weight:
+            return
+        if interval < e.interval:
+            e.due = min(e.due, e.due - e.interval + interval)
+        e.weight, e.interval = weight, interval
+        self._push(fid, e)
+
+    def retain(self, fids: Iterable[int]):
+        """Alles, was nicht mehr live/pollbar ist, fliegt raus (Heap-Einträge verfallen lazy)."""
+        keep = set(fids)
+        for fid in [f for f in self._entries if f not in keep]:
+            del self._entries[fid]
+
+    def reschedule(self, fid: int, at: float):
+        e = self._entries.get(fid)
+        if e is not None:
+            e.due = at
+            self._push(fid, e)
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[int]:
+        """Fällige Spiele (höchstes Gewicht zuerst, max. limit); sie sind danach für now + Intervall eingeplant."""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            e = self._entries.get(item[3])
+            if e is not None and e.version == item[4]:
+                due.append(item)
+        due.sort(key=lambda it: (it[1], it[0]))
+        take = due if limit is None else due[:max(0, limit)]
+        for item in due[len(take):]:
+            heapq.heappush(self._heap, item)
+        out = []
+        for item in take:
+            fid = item[3]
+            e = self._entries[fid]
+            e.due = now + e.interval
+            self._push(fid, e)
+            out.append(fid)
+        return out
+
+    def pending(self, now: Optional[float] = None) -> int:
+        """Anzahl Spiele, deren Termin schon erreicht ist (z.B. wegen fehlendem Budget liegen geblieben)."""
+        now = time.monotonic() if now is None else now
+        return sum(1 for e in self._entries.values() if e.due <= now)
+
+    def next_due(self) -> Optional[float]:
+        while self._heap:
+            item = self._heap[0]
+            e = self._entries.get(item[3])
+            if e is not None and e.version == item[4]:
+                return item[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def planned_per_min(self, per_call: int = 1, backoff: Optional["EmptyBackoff"] = None) -> float:
+        """Geplante Requests/Minute (per_call = Spiele pro Request, fixtures?ids= → 20; Backoff-Spiele mit ihrer Pause)."""
+        misses = backoff.misses if backoff else {}
+        total = 0.0
+        for fid, e in self._entries.items():
+            n = misses.get(fid)
+            total += 60.0 / (max(e.interval, backoff.delay(n)) if n else e.interval)
+        return total / max(1, per_call)
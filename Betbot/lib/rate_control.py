@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Header-getriebene Ratensteuerung (AIMD) für API-Football.
+
+API-Football schickt bei jeder Antwort:
+    X-RateLimit-Limit / X-RateLimit-Remaining                  -> pro Minute
+    x-ratelimit-requests-limit / x-ratelimit-requests-remaining -> pro Tag
+Statt fester Sleeps (MIN_REQUEST_INTERVAL_SEC) passt der Controller die Rate an:
+- additive increase: jede Antwort mit Luft im Minutenfenster -> rate += RATE_STEP
+- multiplicative decrease: 429 oder Remaining <= Sicherheitsmarge -> rate *= RATE_DECREASE
+- Obergrenze = echtes Minutenlimit aus dem Header (nicht mehr geraten)
+- Backoff: exponentiell mit Jitter, ein Retry-After des Servers ist die Untergrenze
+"""
+
+import os, random
+from typing import Any, Dict, Mapping, Optional
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def _hdr_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    v = headers.get(name)
+    if v is None:
+        return None
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return None
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Retry-After in Sekunden (HTTP-Date-Variante liefert API-Football nicht)."""
+    v = headers.get("Retry-After")
+    try:
+        return max(0.0, float(v)) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class RateController:
+    def __init__(self, start_rate: Optional[float] = None):
+        # Startwert: bisheriger Mindestabstand, damit ohne Header nichts schneller wird
+        gap = _env_float("MIN_REQUEST_INTERVAL_SEC", 0.8)
+        self.rate = start_rate or (1.0 / gap if gap > 0 else 2.0)      # req/s
+        self.min_rate = _env_float("RATE_MIN_PER_SEC", 0.05)
+        self.max_rate = _env_float("RATE_MAX_PER_SEC", 10.0)
+        self.step = _env_float("RATE_STEP", 0.05)
+        self.decrease = _env_float("RATE_DECREASE", 0.5)
+        self.margin = int(_env_float("RATE_MARGIN", 2))
+        self.backoff_base = _env_float("BACKOFF_BASE_SEC", 1.0)
+        self.backoff_cap = _env_float("BACKOFF_CAP_SEC", 60.0)
+
+        self.minute_limit: Optional[int] = None
+        self.minute_remaining: Optional[int] = None
+        self.day_limit: Optional[int] = None
+        self.day_remaining: Optional[int] = None
+        self.throttled = 0
+
+    def _ceiling(self) -> float:
+        if self.minute_limit:
+            return min(self.max_rate, self.minute_limit / 60.0)
+        return self.max_rate
+
+    def on_response(self, status: int, headers: Mapping[str, str]):
+        m_lim = _hdr_int(headers, "X-RateLimit-Limit")
+        m_rem = _hdr_int(headers, "X-RateLimit-Remaining")
+        d_lim = _hdr_int(headers, "x-ratelimit-requests-limit")
+        d_rem = _hdr_int(headers, "x-ratelimit-requests-remaining")
+        if m_lim is not None: self.minute_limit = m_lim
+        if m_rem is not None: self.minute_remaining = m_rem
+        if d_lim is not None: self.day_limit = d_lim
+        if d_rem is not None: self.day_remaining = d_rem
+
+        if status == 429 or (m_rem is not None and m_rem <= self.margin):
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.throttled += 1
+        elif 200 <= status < 300:
+            self.rate = min(self._ceiling(), self.rate + self.step)
+
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def backoff(self, attempt: int, retry_after_sec: Optional[float] = None) -> float:
+        """
+        attempt = 1, 2, ... ; "full jitter" auf base * 2^(attempt-1), gedeckelt.
+        Retry-After ist die Untergrenze und kommt ungedeckelt obendrauf – der Jitter
+        verteilt parallele Prozesse, die denselben Wert bekommen haben.
+        """
+        exp = min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1)))
+        return (retry_after_sec or 0.0) + random.uniform(exp / 2, exp)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate * 60, 1),  # req/min
+            "min_limit": self.minute_limit, "min_remaining": self.minute_remaining,
+            "day_limit": self.day_limit, "day_remaining": self.day_remaining,
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Singleflight: gleichzeitige identische Requests (URL + Params) teilen sich
+EINEN Upstream-Call und dessen geparstes Ergebnis.
+- in-flight: spätere Aufrufer hängen sich an den laufenden Future/Event
+- Frische-Fenster: ein eben fertiges Ergebnis wird noch `window` Sekunden
+  an weitere Aufrufer ausgeliefert (Burst = genau 1 Request)
+- wird der Leader abgebrochen (Task cancel, Timeout), bekommen die Wartenden
+  nicht seinen CancelledError: einer von ihnen übernimmt den Call, die anderen
+  hängen sich an ihn
+Prozessübergreifend übernimmt das der Response-Cache (kurze TTL + Lease,
+siehe lib.http_cache).
+
+Das Ergebnis wird geteilt, nicht kopiert – Aufrufer dürfen es nicht mutieren.
+"""
+
+import time, asyncio, threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+def _remember(recent: Dict[Hashable, Tuple[float, Any]], key: Hashable, data: Any, window: float):
+    """Ergebnis bis now + window merken; abgelaufene Einträge gleich mit abräumen.
+    Gleiches Fenster für alle → Einfügereihenfolge = Ablaufreihenfolge, vorne reicht."""
+    now = time.monotonic()
+    recent.pop(key, None)
+    recent[key] = (now + window, data)
+    stale = []
+    for k, (expires, _) in recent.items():
+        if expires > now:
+            break
+        stale.append(k)
+    for k in stale:
+        del recent[k]
+
+class _LeaderCancelled(Exception):
+    """Leader wurde abgebrochen – Signal an die Wartenden, den Call zu übernehmen."""
+
+class SingleFlight:
+    """asyncio-Variante (ein Event-Loop pro Prozess)."""
+    def __init__(self, window: float = 3.0):
+        self.window = window
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (gültig bis, Ergebnis)
+        self.shared = 0   # Aufrufe ohne eigenen Upstream-Call
+        self.leaders = 0  # Aufrufe mit Upstream-Call
+        self.takeovers = 0  # Wartende, die nach Abbruch des Leaders neu angesetzt haben
+
+    def _fresh(self, key: Hashable):
+        hit = self._recent.get(key)
+        if hit and time.monotonic() < hit[0]:
+            return True, hit[1]
+        if hit:
+            del self._recent[key]
+        return False, None
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            ok, data = self._fresh(key)
+            if ok:
+                self.shared += 1
+                return data
+            fut = self._inflight.get(key)
+            if fut is None:
+                return await self._lead(key, fn)
+            try:
+                # shield: Abbruch eines Wartenden darf den Leader nicht abbrechen
+                data = await asyncio.shield(fut)
+            except _LeaderCancelled:
+                self.takeovers += 1
+                continue
+            self.shared += 1
+            return data
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        self.leaders += 1
+        try:
+            data = await fn()
+        except asyncio.CancelledError:
+            # nur dieser Aufrufer wurde abgebrochen – Wartende versuchen es selbst erneut
+            fut.set_exception(_LeaderCancelled())
+            fut.exception()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # als abgerufen markieren, falls niemand wartet
+            raise
+        else:
+            fut.set_result(data)
+            if self.window > 0:
+                _remember(self._recent, key, data, self.window)
+            return data
+        finally:
+            self._inflight.pop(key, None)
+
+class SingleFlightSync:
+    """Thread-Variante (Dashboard: Streamlit rendert Sessions in Threads)."""
+    def __init__(self, window: float = 3.0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Dict[str, Any]] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self.shared = 0
+        self.leaders = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit = self._recent.get(key)
+            if hit and time.monotonic() < hit[0]:
+                self.shared += 1
+                return hit[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._inflight[key] = call
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            if self.window > 0:
+                with self._lock:
+                    _remember(self._recent, key, call["result"], self.window)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call["event"].set()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP-Telemetrie des API-Clients (pro Prozess, alle ApiClient-Instanzen teilen TELEMETRY).
+Key = Endpoint + Param-Klasse wie beim Breaker ("/fixtures?live", "/fixtures?ids", ...).
+
+- Latenz-Histogramm (Prometheus-Buckets, bis Body gelesen bzw. bei Streams bis Header)
+- Requests je Status ("error" = Netzfehler/Timeout) – jeder Request kostet 1 Quota-Einheit
+- Response-Bytes, Retries je Grund (429 / 5xx / net / 401), Requests je Lane
+- Rate-Limit-Header je Key: X-RateLimit-* (Minute), x-ratelimit-requests-* (Tag)
+
+Ausgabe:
+- Prometheus-Textformat über TELEMETRY_PORT (0 = aus), GET /metrics; mehrere Prozesse
+  brauchen eigene Ports (live_monitor, betbot, ...), belegter Port = nur Warnung
+- Summary-Zeile alle TELEMETRY_SUMMARY_SEC (Default 300, 0 = aus): Top-Endpoints nach
+  Requests im Fenster mit Anteil, p50/p95, MB, Fehler und Retries
+"""
+
+import os, time, bisect, threading, collections, datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from lib.circuit_breaker import breaker_key
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATELIMIT_HEADERS = {
+    ("minute", "limit"):     "X-RateLimit-Limit",
+    ("minute", "remaining"): "X-RateLimit-Remaining",
+    ("day", "limit"):        "x-ratelimit-requests-limit",
+    ("day", "remaining"):    "x-ratelimit-requests-remaining",
+}
+
+def ts() -> str:
+    return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(len(s) * q))]
+
+class _Endpoint:
+    __slots__ = ("buckets", "lat_sum", "count", "bytes", "status", "retries", "win")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)   # letzter = +Inf
+        self.lat_sum = 0.0
+        self.count = 0
+        self.bytes = 0
+        self.status: Dict[str, int] = collections.Counter()
+        self.retries: Dict[str, int] = collections.Counter()
+        self.win = self._new_window()
+
+    @staticmethod
+    def _new_window() -> Dict[str, Any]:
+        return {"n": 0, "err": 0, "bytes": 0, "retries": 0, "lat": []}
+
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._eps: Dict[str, _Endpoint] = {}
+        self._lanes: Dict[str, int] = collections.Counter()
+        self._ratelimit: Dict[str, Dict[tuple, int]] = {}
+        self.summary_sec = float(os.getenv("TELEMETRY_SUMMARY_SEC", "300"))
+        self._win_start = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.gauges: Optional[Callable[[], Dict[str, float]]] = None   # z.B. Budget-Stand vom Client
+
+    def _ep(self, ep: str, params) -> _Endpoint:
+        key = breaker_key(ep, params)
+        e = self._eps.get(key)
+        if e is None:
+            e = self._eps[key] = _Endpoint()
+        return e
+
+    # ---- Erfassen ----
+    def observe(self, ep: str, params, status, seconds: float, nbytes: int = 0, lane: str = ""):
+        """status = HTTP-Status oder "error" (keine Antwort)."""
+        with self._lock:
+            e = self._ep(ep, params)
+            e.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            e.lat_sum += seconds
+            e.count += 1
+            e.bytes += nbytes
+            e.status[str(status)] += 1
+            if lane:
+                self._lanes[lane] += 1
+            w = e.win
+            w["n"] += 1
+            w["bytes"] += nbytes
+            w["err"] += status == "error" or int(status) >= 400
+            if len(w["lat"]) < 2048:
+                w["lat"].append(seconds)
+        self._maybe_summary()
+
+    def retry(self, ep: str, params, reason: str):
+        with self._lock:
+            e = self._ep(ep, params)
+            e.retries[reason] += 1
+            e.win["retries"] += 1
+
+    def ratelimit(self, key_id: str, headers: Mapping[str, str]):
+        vals = {}
+        for k, name in RATELIMIT_HEADERS.items():
+            v = headers.get(name)
+            try:
+                vals[k] = int(float(v)) if v is not None else None
+            except (TypeError, ValueError):
+                pass
+        with self._lock:
+            cur = self._ratelimit.setdefault(key_id, {})
+            cur.update({k: v for k, v in vals.items() if v is not None})
+
+    # ---- Summary ----
+    def summary(self, top: int = 6) -> str:
+        """Fenster seit der letzten Summary (danach zurückgesetzt)."""
+        with self._lock:
+            mins = max(1e-9, (time.monotonic() - self._win_start) / 60)
+            self._win_start = time.monotonic()
+            rows = [(k, e.win) for k, e in self._eps.items() if e.win["n"] or e.win["retries"]]
+            for e in self._eps.values():
+                e.win = _Endpoint._new_window()
+            day_left = [rl.get(("day", "remaining")) for rl in self._ratelimit.values()]
+        total = sum(w["n"] for _, w in rows)
+        if not total:
+            return ""
+        rows.sort(key=lambda kw: -kw[1]["n"])
+        parts = [f"{k} n={w['n']} ({100 * w['n'] / total:.0f}%) p50={_pct(w['lat'], .5):.2f}s "
+                 f"p95={_pct(w['lat'], .95):.2f}s {w['bytes'] / 1e6:.1f}MB err={w['err']} retry={w['retries']}"
+                 for k, w in rows[:top]]
+        left = sum(v for v in day_left if v is not None)
+        tail = f" | day_remaining {left}" if any(v is not None for v in day_left) else ""
+        return f"HTTP {total} req ({total / mins:.1f}/min) | " + " | ".join(parts) + tail
+
+    def _maybe_summary(self):
+        if self.summary_sec <= 0 or time.monotonic() - self._win_start < self.summary_sec:
+            return
+        line = self.summary()
+        if line:
+            print(f"[{ts()}] {line}")
+
+    # ---- Prometheus ----
+    def render(self) -> str:
+        out: List[str] = []
+        with self._lock:
+            eps = sorted(self._eps.items())
+            out += ["# HELP betbot_http_requests_total Upstream-Requests (= Quota-Verbrauch) je Endpoint und Status",
+                    "# TYPE betbot_http_requests_total counter"]
+            for k, e in eps:
+                for st, n in sorted(e.status.items()):
+                    out.append(f'betbot_http_requests_total{{endpoint="{k}",status="{st}"}} {n}')
+            out += ["# HELP betbot_http_request_duration_seconds Latenz je Endpoint",
+                    "# TYPE betbot_http_request_duration_seconds histogram"]
+            for k, e in eps:
+                acc = 0
+                for le, n in zip(BUCKETS + (float("inf"),), e.buckets):
+                    acc += n
+                    le_s = "+Inf" if le == float("inf") else f"{le:g}"
+                    out.append(f'betbot_http_request_duration_seconds_bucket{{endpoint="{k}",le="{le_s}"}} {acc}')
+                out.append(f'betbot_http_request_duration_seconds_sum{{endpoint="{k}"}} {e.lat_sum:.6f}')
+                out.append(f'betbot_http_request_duration_seconds_count{{endpoint="{k}"}} {e.count}')
+            out += ["# HELP betbot_http_response_bytes_total Response-Bytes je Endpoint",
+                    "# TYPE betbot_http_response_bytes_total counter"]
+            out += [f'betbot_http_response_bytes_total{{endpoint="{k}"}} {e.bytes}' for k, e in eps]
+            out += ["# HELP betbot_http_retries_total Retries je Endpoint und Grund",
+                    "# TYPE betbot_http_retries_total counter"]
+            for k, e in eps:
+                for reason, n in sorted(e.retries.items()):
+                    out.append(f'betbot_http_retries_total{{endpoint="{k}",reason="{reason}"}} {n}')
+            out += ["# HELP betbot_http_lane_requests_total Upstream-Requests je Budget-Lane",
+                    "# TYPE betbot_http_lane_requests_total counter"]
+            out += [f'betbot_http_lane_requests_total{{lane="{l}"}} {n}' for l, n in sorted(self._lanes.items())]
+            out += ["# HELP betbot_api_ratelimit Rate-Limit-Header der letzten Antwort je Key",
+                    "# TYPE betbot_api_ratelimit gauge"]
+            for kid, rl in sorted(self._ratelimit.items()):
+                for (window, kind), v in sorted(rl.items()):
+                    out.append(f'betbot_api_ratelimit{{key="{kid}",window="{window}",kind="{kind}"}} {v}')
+        if self.gauges:
+            out += ["# HELP betbot_api_quota Budget-Stand (lib.api_client, prozessübergreifend)",
+                    "# TYPE betbot_api_quota gauge"]
+            out += [f'betbot_api_quota{{name="{k}"}} {v}' for k, v in sorted(self.gauges().items())]
+        return "\n".join(out) + "\n"
+
+    def serve(self, port: int) -> bool:
+        if self._server is not None or port <= 0:
+            return self._server is not None
+        tel = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = tel.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+        except OSError as e:
+            print(f"[{ts()}] Telemetrie: Port {port} nicht verfügbar ({e}) – kein /metrics")
+            return False
+        threading.Thread(target=self._server.serve_forever, name="telemetry", daemon=True).start()
+        print(f"[{ts()}] Telemetrie: http://0.0.0.0:{port}/metrics")
+        return True
+
+    def serve_from_env(self) -> bool:
+        try:
+            return self.serve(int(os.getenv("TELEMETRY_PORT") or 0))
+        except ValueError:
+            return False
+
+TELEMETRY = Telemetry()
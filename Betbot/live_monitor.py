@@ -5,29 +5,47 @@
 BetBot Live Monitor (API-Football v3)
 - Primär: tippbar = hat 1x2-Markt in odds/live (neues Format: response[].odds)
 - Fallback: mit SKIP_ODDS=true läuft er auch ohne Odds (nur fixtures/live + Stats)
-- Stats: pro Fixture alle STATS_INTERVAL_SEC (Default 120s)
+- Stats: pro Fixture alle STATS_INTERVAL_SEC (Default 120s), gebündelt über fixtures?ids= (20 Spiele/Call);
+  Deadline-Heap (lib.poll_scheduler): späte Minuten, tippbare Spiele, Top-Ligen (LEAGUE_TIERS) und
+  bewegte Quoten öfter (bis STATS_MIN_INTERVAL_SEC), der Rest seltener (bis STATS_MAX_INTERVAL_SEC)
+- Spielphase (lib.poll_policy): HT/BT/Elfmeterschießen kein Poll, früh langsamer, Schlussphase,
+  Verlängerung und nach Roter Karte schneller (POLL_POLICY_FILE für eine eigene Tabelle)
+- Snapshots/Odds nur bei geänderten Werten schreiben (lib.cdc, Heartbeat CDC_HEARTBEAT_SEC),
+  Skip-Quote in der Loop-Zeile
+- Snapshots/Odds gehen über den gebündelten DB-Writer (lib.db_writer, Queue + Group Commit im
+  Thread); Fixture-Upserts laufen ebenfalls im Thread – der Loop wartet nicht auf Commits
+- Fixtures: ein Multi-Row-Upsert (db.upsert_fixtures) nur für Spiele mit geänderten Metadaten
+- Leere Stats (Liga ohne Abdeckung): Backoff je Fixture, verdoppelt sich bis STATS_EMPTY_BACKOFF_MAX_SEC
+  (Default 30 min), zurückgesetzt sobald Stats kommen – Stand in der Loop-Zeile ("empty-backoff")
+- Tor, Rote Karte, Statuswechsel oder Minutensprung im fixtures?live=all-Stand → Stats + Odds nur
+  für dieses Spiel sofort (außer der Reihe), entprellt je Spiel über EVENT_DEBOUNCE_SEC
+- Loop schläft bis zum nächsten Termin (Stats, Fixtures, Odds) statt fix POLL_SECONDS;
+  POLL_SECONDS = längster Schlaf bzw. Takt, solange Budget oder Circuit die Stats bremsen
 - Odds: global alle ODDS_REFRESH_SEC (Default 120s)
-- Zwischen Stats-Requests: Jitter 1–3s
-- Rate Control: Minutenbudget + Mindestabstand
+- Stats-Blöcke parallel (STATS_CONCURRENCY, Default 4), so viele wie das Minutenbudget der
+  Lane "stats" hergibt – Rest bleibt fällig; Snapshots werden je fertigem Block committet
+- Rate Control: Minuten-/Tagesbudget (prozessübergreifend) + AIMD-Rate aus Rate-Limit-Headern (lib.api_client)
 - NEU: Teil-Snapshots (wenn nur ein Team geliefert wird, andere Seite = 0)
 """
 
-import os, json, asyncio, time, datetime as dt, random
-import aiohttp
+import os, json, asyncio, time, datetime as dt
 from aiohttp import ClientResponseError
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from db_models import SessionLocal, init_db, Fixture, Snapshot, OddsLive, Alert
+from db import FIXTURE_COLS, async_enabled as db_async_enabled, upsert_fixtures_async
+from db_models import init_db
+from lib.api_client import env_keys, get_client
+from lib.cdc import CDC
+from lib import db_pool
+from lib.db_writer import get_writer
+from lib.circuit_breaker import CircuitOpen
+from lib import offload
+from lib.live_stats import IDS_PER_CALL, iter_stats_blocks, stats_blocks
+from lib.poll_policy import poll_factor, red_cards
+from lib.poll_scheduler import EmptyBackoff, EventTrigger, PollScheduler, fixture_weight, league_tiers, next_wake, odds_moves
 
 # ========= ENV =========
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-BASE = "https://v3.football.api-sports.io"
-HDRS = {
-    "x-apisports-key": API_KEY or "",
-    "Accept": "application/json",
-    "User-Agent": "BetBot/1.0 (+https://betbot.local)"
-}
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
 TZ_NAME = os.getenv("TZ", "Europe/Berlin")
 
 SKIP_ODDS = (os.getenv("SKIP_ODDS","false").lower() in ("1","true","yes"))
@@ -36,15 +54,16 @@ POLL_SECONDS         = int(os.getenv("POLL_SECONDS", "15"))
 STATS_INTERVAL_SEC   = int(os.getenv("STATS_INTERVAL_SEC", "120"))
 ODDS_REFRESH_SEC     = int(os.getenv("ODDS_REFRESH_SEC", "120"))
 FIXTURES_REFRESH_SEC = int(os.getenv("FIXTURES_REFRESH_SEC", "30"))
-JITTER_MIN_SEC       = float(os.getenv("JITTER_MIN_SEC", "1.0"))
-JITTER_MAX_SEC       = float(os.getenv("JITTER_MAX_SEC", "3.0"))
 
 STATS_MIN_MINUTE     = int(os.getenv("STATS_MIN_MINUTE", "3"))
 STATS_MAX_MINUTE     = int(os.getenv("STATS_MAX_MINUTE", "100"))
 MAX_FIXTURES_PER_POLL= int(os.getenv("MAX_FIXTURES_PER_POLL", "200"))
+LEAGUE_TIERS         = league_tiers()
 
-GLOBAL_MAX_REQUESTS_PER_MINUTE = int(os.getenv("GLOBAL_MAX_REQUESTS_PER_MINUTE", "90"))
-MIN_REQUEST_INTERVAL_SEC       = float(os.getenv("MIN_REQUEST_INTERVAL_SEC", "1.0"))
+# Budget liest lib.api_client: GLOBAL_MAX_REQUESTS_PER_MINUTE / _PER_DAY gelten nur bis zur ersten
+# Antwort, danach Limits aus den Rate-Limit-Headern; MIN_REQUEST_INTERVAL_SEC = Startrate der AIMD-Regelung.
+# Alles pro Key – weitere Keys per API_KEYS=key1,key2 (Komma-Liste) in den Pool.
+# Telemetrie je Endpoint (lib.telemetry): TELEMETRY_PORT → /metrics, Summary alle TELEMETRY_SUMMARY_SEC.
 
 ACTIVE_START_HOUR = os.getenv("ACTIVE_START_HOUR")
 ACTIVE_END_HOUR   = os.getenv("ACTIVE_END_HOUR")
@@ -89,68 +108,6 @@ def in_active_window(now_utc: dt.datetime) -> bool:
         return ACTIVE_START_HOUR <= h < ACTIVE_END_HOUR
     return (h >= ACTIVE_START_HOUR) or (h < ACTIVE_END_HOUR)
 
-# ========= Minute Budget =========
-class MinuteBudget:
-    def __init__(self, per_minute:int, min_gap:float):
-        self.per_minute = per_minute
-        self.min_gap = min_gap
-        self._minute_start = time.monotonic()
-        self._used_minute = 0
-        self._last_req = 0.0
-
-    def _reset_if_needed(self):
-        if time.monotonic() - self._minute_start >= 60:
-            self._minute_start = time.monotonic()
-            self._used_minute = 0
-
-    async def acquire(self):
-        self._reset_if_needed()
-        gap = self.min_gap - (time.monotonic() - self._last_req)
-        if gap > 0:
-            await asyncio.sleep(gap)
-        if self._used_minute >= self.per_minute:
-            wait = 60 - (time.monotonic() - self._minute_start)
-            if wait > 0:
-                print(f"[{now_utc_str()}] Minutenlimit erreicht – warte {wait:.1f}s")
-                await asyncio.sleep(wait)
-            self._minute_start = time.monotonic()
-            self._used_minute = 0
-        self._used_minute += 1
-        self._last_req = time.monotonic()
-
-    def stats(self):
-        self._reset_if_needed()
-        return {"min_used": self._used_minute, "min_cap": self.per_minute}
-
-budget = MinuteBudget(GLOBAL_MAX_REQUESTS_PER_MINUTE, MIN_REQUEST_INTERVAL_SEC)
-
-# ========= HTTP =========
-async def get_json(session, url, params=None):
-    tries = 0
-    while True:
-        tries += 1
-        await budget.acquire()
-        try:
-            async with session.get(url, headers=HDRS, params=params, timeout=40) as r:
-                if r.status == 429:
-                    print(f"[{now_utc_str()}] 429 Too Many Requests – sleep 5s")
-                    await asyncio.sleep(5)
-                    continue
-                r.raise_for_status()
-                return await r.json()
-        except ClientResponseError as e:
-            if e.status in (500, 502, 503, 504) and tries < 3:
-                print(f"[{now_utc_str()}] Serverfehler {e.status} – retry...")
-                await asyncio.sleep(2)
-                continue
-            raise
-        except aiohttp.ClientError as e:
-            if tries < 3:
-                print(f"[{now_utc_str()}] Netzfehler {e}, retry...")
-                await asyncio.sleep(2)
-                continue
-            raise
-
 # ========= Odds (neues Format) =========
 def _is_1x2_market(name: str) -> bool:
     n = (name or "").lower()
@@ -158,8 +115,7 @@ def _is_1x2_market(name: str) -> bool:
 
 class OddsForbidden(Exception): pass
 
-async def fetch_odds_live(session):
-    data = await get_json(session, f"{BASE}/odds/live")
+def parse_odds_live(data):
     out = {}
     for row in data.get("response", []):
         fid = (row.get("fixture") or {}).get("id")
@@ -181,9 +137,20 @@ async def fetch_odds_live(session):
             out[fid] = book
     return out
 
+# parse= läuft bei großen Bodies zusammen mit dem Decode im Offload-Pool (lib.offload) –
+# zurück an den Loop kommt nur das kleine Ergebnis
+async def fetch_odds_live(session):
+    return await session.get_json("/odds/live", parse=parse_odds_live)
+
+async def fetch_odds_fixture(session, fid):
+    """odds/live nur für ein Spiel (Event-Refresh) → book oder None."""
+    return (await session.get_json("/odds/live", {"fixture": fid}, parse=parse_odds_live)).get(fid)
+
 # ========= Fixtures / Stats =========
 async def fetch_live_fixtures(session):
-    data = await get_json(session, f"{BASE}/fixtures", params={"live": "all"})
+    return await session.get_json("/fixtures", {"live": "all"}, parse=parse_live_fixtures)
+
+def parse_live_fixtures(data):
     out = []
     for row in data.get("response", []):
         fx = row.get("fixture", {}) or {}
@@ -191,30 +158,22 @@ async def fetch_live_fixtures(session):
         tm = row.get("teams", {}) or {}
         out.append({
             "fixture_id": fx.get("id"),
+            "status_short": (fx.get("status") or {}).get("short"),
             "minute": (fx.get("status") or {}).get("elapsed") or 0,
+            "red_cards": red_cards(row.get("events")),
+            "goals_home": (row.get("goals") or {}).get("home"),
+            "goals_away": (row.get("goals") or {}).get("away"),
             "league_id": lg.get("id"),
             "league_name": lg.get("name"),
             "season": lg.get("season"),
+            "home_id": (tm.get("home") or {}).get("id"),
             "home_name": (tm.get("home") or {}).get("name"),
+            "away_id": (tm.get("away") or {}).get("id"),
             "away_name": (tm.get("away") or {}).get("name"),
         })
     return [x for x in out if x["fixture_id"]]
 
-async def fetch_stats(session, fid):
-    return await get_json(session, f"{BASE}/fixtures/statistics", params={"fixture": fid})
-
 # ========= DB =========
-def upsert_fixture(sess: Session, meta):
-    obj = sess.get(Fixture, meta["fixture_id"])
-    if not obj:
-        obj = Fixture(fixture_id=meta["fixture_id"])
-    obj.league_id   = meta.get("league_id")
-    obj.league_name = meta.get("league_name")
-    obj.season      = meta.get("season")
-    obj.home_name   = meta.get("home_name")
-    obj.away_name   = meta.get("away_name")
-    sess.merge(obj)
-
 def _zero_team():
     return {
         "statistics": [
@@ -226,9 +185,19 @@ def _zero_team():
         ]
     }
 
-def insert_snapshot(sess: Session, fid, minute, t0, t1):
-    snap = Snapshot(
-        fixture_id=fid, minute=minute,
+async def store_fixtures(lives):
+    """Ein Multi-Row-Upsert für alle Spiele mit geändertem Metadaten-Hash (CDC-Tabelle "fixtures");
+    async (db.upsert_fixtures_async), vor den Odds/Snapshots im Writer."""
+    changed = [fx for fx in lives if CDC.changed("fixtures", fx["fixture_id"], tuple(fx.get(c) for c in FIXTURE_COLS))]
+    try:
+        return await upsert_fixtures_async(changed)
+    except Exception:
+        CDC.forget("fixtures", (fx["fixture_id"] for fx in changed))
+        raise
+
+def snapshot_row(fid, minute, t0, t1):
+    """Zeile für snapshots (schema.sql) oder None, wenn die Stats unverändert sind (CDC)."""
+    vals = dict(
         home_sog=safe_i(get_val(t0["statistics"], "Shots on Goal")),
         home_shots=safe_i(get_val(t0["statistics"], "Total Shots")),
         home_corners=safe_i(get_val(t0["statistics"], "Corner Kicks")),
@@ -240,39 +209,86 @@ def insert_snapshot(sess: Session, fid, minute, t0, t1):
         away_poss=safe_f(get_val(t1["statistics"], "Ball Possession")),
         away_saves=safe_i(get_val(t1["statistics"], "Goalkeeper Saves")),
     )
-    sess.add(snap)
-
-def insert_odds(sess: Session, fid, book):
-    sess.add(OddsLive(
+    if not CDC.changed("snapshots", fid, tuple(vals.values())):
+        return None
+    return dict(fixture_id=fid, minute=minute, **vals)
+
+def odds_row(fid, book):
+    if not CDC.changed("odds_live", fid, (book.get("home"), book.get("draw"), book.get("away"))):
+        return None
+    return dict(
         fixture_id=fid,
         home_ml=book.get("home"),
         draw_ml=book.get("draw"),
         away_ml=book.get("away"),
-    ))
+    )
 
 # ========= Caches & Scheduler =========
-_last_stats_fetch   = {}   # fid -> monotonic timestamp
+_stats_sched        = PollScheduler(STATS_INTERVAL_SEC)   # fid -> nächster Stats-Termin
+_stats_empty        = EmptyBackoff(STATS_INTERVAL_SEC)    # fid -> Anzahl leerer Antworten in Folge
+_events             = EventTrigger()                      # fid -> letzter Stand (Tore, Status, Minute, Rote)
 _last_odds_pull     = 0.0
 _last_fixtures_pull = 0.0
 _cached_odds        = {}
 _cached_fixtures    = []
-
-def stats_due(fid:int, minute:int, now_mono:float) -> bool:
-    if minute is None: return False
-    if minute < STATS_MIN_MINUTE or minute > STATS_MAX_MINUTE: return False
-    last = _last_stats_fetch.get(fid, 0.0)
-    return (now_mono - last) >= STATS_INTERVAL_SEC
+_odds_moves         = {}   # fid -> Änderung der implizierten Wkt. seit dem vorletzten Odds-Pull
+
+def schedule_stats(lives):
+    """Gewichte nach neuem Fixtures-/Odds-Stand setzen; Spiele außerhalb STATS_MIN/MAX_MINUTE
+    oder in einer Phase ohne Poll (Halbzeit, Elfmeterschießen, ...) fallen raus."""
+    keep = []
+    for fx in lives:
+        minute = int(fx.get("minute") or 0)
+        if minute < STATS_MIN_MINUTE or minute > STATS_MAX_MINUTE:
+            continue
+        phase = poll_factor(fx.get("status_short"), minute, fx.get("red_cards") or 0)
+        if phase is None:
+            continue
+        fid = fx["fixture_id"]
+        keep.append(fid)
+        _stats_sched.update(fid, fixture_weight(fid in _cached_odds, LEAGUE_TIERS.get(fx.get("league_id"), 2),
+                                                _odds_moves.get(fid, 0.0), phase))
+    _stats_sched.retain(keep)
+    _stats_empty.retain(keep)
+
+def trigger_events(lives, now_mono):
+    """Stand je Spiel mit dem letzten vergleichen; bei Ereignis Stats sofort fällig machen.
+    Auch in Phasen ohne Poll (z.B. Wechsel auf HT) – einmalig, der nächste Fixtures-Stand nimmt es wieder raus.
+    Spiele im Empty-Backoff bleiben außen vor (keine Stats-Abdeckung)."""
+    fired = []
+    for fx in lives:
+        fid = fx["fixture_id"]
+        if not _events.check(fid, fx, now_mono) or fid in _stats_empty.misses:
+            continue
+        minute = int(fx.get("minute") or 0)
+        if STATS_MIN_MINUTE <= minute <= STATS_MAX_MINUTE:
+            if fid not in _stats_sched:
+                _stats_sched.update(fid, fixture_weight(fid in _cached_odds, LEAGUE_TIERS.get(fx.get("league_id"), 2)), now_mono)
+            _stats_sched.reschedule(fid, now_mono)
+        fired.append(fid)
+    _events.retain(fx["fixture_id"] for fx in lives)
+    return fired
+
+async def refresh_event_odds(http, fids):
+    """Odds außer der Reihe für Spiele mit Ereignis – nur tippbare, nur so viele wie die Lane gerade hergibt."""
+    fids = [f for f in fids if f in _cached_odds][:http.budget.spare("odds_live")]
+    if not fids:
+        return {}
+    res = await asyncio.gather(*(fetch_odds_fixture(http, f) for f in fids), return_exceptions=True)
+    return {f: b for f, b in zip(fids, res) if isinstance(b, dict)}
 
 # ========= Main Loop =========
 async def main_loop():
-    if not API_KEY:
-        print("API_SPORTS_KEY fehlt in .env"); return
+    if not API_KEYS:
+        print("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)"); return
+    # Decode-Pool forken, bevor Telemetrie-, Kosten-Ledger- und Resolver-Threads laufen
+    offload.warmup()
     init_db()
-    timeout = aiohttp.ClientTimeout(total=50)
-    connector = aiohttp.TCPConnector(limit=8, ttl_dns_cache=300)
+    db_async_enabled()   # DB_ASYNC=on ohne Treiber → hier abbrechen, nicht erst beim ersten Write
+    http = get_client(user_agent="BetBot/1.0 (+https://betbot.local)", pool_limit=8)
+    writer = get_writer().start()
 
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as http:
-        odds_forbidden = False
+    try:
         while True:
             try:
                 if not in_active_window(dt.datetime.utcnow()):
@@ -280,33 +296,40 @@ async def main_loop():
                     await asyncio.sleep(POLL_SECONDS)
                     continue
 
-                global _last_odds_pull, _cached_odds, _last_fixtures_pull, _cached_fixtures
+                global _last_odds_pull, _cached_odds, _last_fixtures_pull, _cached_fixtures, _odds_moves
                 now_mono = time.monotonic()
+                refreshed = fx_refreshed = False
 
-                # 1) Odds (wenn erlaubt)
-                if not SKIP_ODDS and not odds_forbidden:
+                # 1) Odds (wenn erlaubt) – 403/5xx-Serien öffnen den Circuit, dann Fallback ohne Odds
+                if not SKIP_ODDS and http.breaker.blocked("/odds/live"):
+                    _cached_odds = {}
+                elif not SKIP_ODDS:
                     if now_mono - _last_odds_pull >= ODDS_REFRESH_SEC or not _cached_odds:
                         try:
-                            _cached_odds = await fetch_odds_live(http)
+                            fresh = await fetch_odds_live(http)
+                            _odds_moves = odds_moves(_cached_odds, fresh)
+                            _cached_odds = fresh
                             _last_odds_pull = time.monotonic()
+                            refreshed = True
                             print(f"[{now_utc_str()}] Tippbare Spiele (1x2): {_cached_odds and len(_cached_odds) or 0}")
-                        except ClientResponseError as e:
-                            if e.status == 403:
-                                odds_forbidden = True
-                                _cached_odds = {}
-                                print(f"[{now_utc_str()}] Hinweis: odds/live 403 → Fallback ohne Odds aktiv.")
-                            else:
+                        except (ClientResponseError, CircuitOpen) as e:
+                            if not http.breaker.blocked("/odds/live"):
                                 raise
+                            _cached_odds = {}
+                            print(f"[{now_utc_str()}] Hinweis: odds/live nicht verfügbar ({e}) → Fallback ohne Odds aktiv.")
 
                 # 2) Fixtures
                 if now_mono - _last_fixtures_pull >= FIXTURES_REFRESH_SEC or not _cached_fixtures:
                     all_live = await fetch_live_fixtures(http)
+                    http.costs.note_leagues({f["fixture_id"]: f["league_id"] for f in all_live})
                     if _cached_odds:
                         _cached_fixtures = [f for f in all_live if f["fixture_id"] in _cached_odds][:MAX_FIXTURES_PER_POLL]
                     else:
                         # Fallback: ohne Odds → alle Live-Spiele
                         _cached_fixtures = all_live[:MAX_FIXTURES_PER_POLL]
                     _last_fixtures_pull = time.monotonic()
+                    refreshed = fx_refreshed = True
+                    CDC.retain(f["fixture_id"] for f in all_live)
 
                 lives = _cached_fixtures
                 if not lives:
@@ -314,31 +337,51 @@ async def main_loop():
                     await asyncio.sleep(POLL_SECONDS)
                     continue
 
-                # 3) Fixtures + Odds in DB
-                with SessionLocal() as sess:
+                # 3) Fixtures + Odds in DB (nur bei neuem Stand) und Stats-Termine neu gewichten
+                if refreshed:
+                    await store_fixtures(lives)
                     for fx in lives:
-                        upsert_fixture(sess, fx)
                         fid = fx["fixture_id"]
-                        if _cached_odds and fid in _cached_odds:
-                            insert_odds(sess, fid, _cached_odds[fid])
-                    sess.commit()
-
-                # 4) Stats fällig?
-                need_stats = []
-                for fx in lives:
-                    fid = fx["fixture_id"]
-                    minute = int(fx.get("minute") or 0)
-                    if stats_due(fid, minute, now_mono):
-                        need_stats.append((fid, minute))
-
-                # 5) Stats abarbeiten (mit Jitter), Teil-/Leersnapshots zählen
+                        row = odds_row(fid, _cached_odds[fid]) if fid in _cached_odds else None
+                        if row:
+                            await writer.put("odds_live", row)
+                    schedule_stats(lives)
+
+                # 3b) Ereignisse seit dem letzten Fixtures-Stand → Stats sofort fällig, Odds für diese Spiele außer der Reihe
+                event_fids = trigger_events(lives, now_mono) if fx_refreshed else []
+                if event_fids and not SKIP_ODDS and not http.breaker.blocked("/odds/live"):
+                    books = await refresh_event_odds(http, event_fids)
+                    if books:
+                        # neues Dict – fresh ist das geteilte SingleFlight-Ergebnis, nicht mutieren
+                        _cached_odds = {**_cached_odds, **books}
+                        for fid, book in books.items():
+                            row = odds_row(fid, book)
+                            if row:
+                                await writer.put("odds_live", row)
+
+                # 4) Stats fällig? Heap liefert nur Spiele mit erreichtem Termin, höchstes Gewicht zuerst –
+                #    so viele, wie das Budget jetzt erlaubt; der Rest bleibt fällig (Circuit offen → keine)
+                stats_blocked = http.breaker.blocked("/fixtures", {"ids": 0})
+                room = 0 if stats_blocked else http.budget.spare("stats")
+                due = _stats_sched.pop_due(limit=room * IDS_PER_CALL)
+                deferred = _stats_sched.pending()
+                minute_of = {fx["fixture_id"]: int(fx.get("minute") or 0) for fx in lives}
+                minutes = {fid: minute_of.get(fid, 0) for fid in due}
+
+                # 5) Stats in Blöcken à 20 (fixtures?ids=), parallel bis STATS_CONCURRENCY
                 stats_done = 0
                 partial = 0
                 empty = 0
-                for fid, minute in need_stats:
-                    try:
-                        d = await fetch_stats(http, fid)
-                        resp = d.get("response", []) or []
+                async for block, got in iter_stats_blocks(http, stats_blocks(minutes)):
+                    if isinstance(got, Exception):
+                        # wie bisher beim nächsten Takt erneut versuchen
+                        for fid in block:
+                            _stats_sched.reschedule(fid, time.monotonic() + POLL_SECONDS)
+                        if not isinstance(got, CircuitOpen):
+                            print(f"[{now_utc_str()}] Stats-Fehler für {len(block)} Spiele: {got}")
+                        continue
+
+                    for fid, resp in got.items():
                         if len(resp) >= 2:
                             t0, t1 = resp[0], resp[1]
                         elif len(resp) == 1:
@@ -346,27 +389,37 @@ async def main_loop():
                             t0, t1 = resp[0], _zero_team()
                             partial += 1
                         else:
-                            # leerer Snapshot: beide = 0 (optional) -> wir zählen als empty und überspringen
+                            # leer (keine Abdeckung): zählen als empty, nächster Versuch erst nach Backoff
                             empty += 1
-                            await asyncio.sleep(random.uniform(JITTER_MIN_SEC, JITTER_MAX_SEC))
+                            _stats_sched.reschedule(fid, time.monotonic() + _stats_empty.miss(fid))
                             continue
-
-                        with SessionLocal() as sess:
-                            insert_snapshot(sess, fid, minute, t0, t1)
-                            sess.commit()
-                        _last_stats_fetch[fid] = time.monotonic()
+                        _stats_empty.hit(fid)
+                        row = snapshot_row(fid, minutes[fid], t0, t1)
+                        if row:
+                            await writer.put("snapshots", row)
                         stats_done += 1
-                    except Exception as e:
-                        print(f"[{now_utc_str()}] Stats-Fehler für {fid}: {e}")
-                    await asyncio.sleep(random.uniform(JITTER_MIN_SEC, JITTER_MAX_SEC))
 
-                s = budget.stats()
-                print(f"[{now_utc_str()}] Loop OK – req_min {s['min_used']}/{s['min_cap']} | fixtures {len(lives)} | odds_fixtures {len(_cached_odds)} | stats_now {stats_done} (partial {partial}, empty {empty}) | due {len(need_stats)}")
-                await asyncio.sleep(POLL_SECONDS)
+                s = http.budget.stats()
+                lanes = " ".join(f"{k}={u}/{r}" for k, (u, r) in s["lanes"].items() if u)
+                rc = http.rate.stats()
+                print(f"[{now_utc_str()}] Loop OK – req_min {s['min_used']}/{s['min_cap']} | req_day {s['day_used']}/{s['day_cap']} | rate {rc['rate']}/min | fixtures {len(lives)} | odds_fixtures {len(_cached_odds)} | stats_now {stats_done} (partial {partial}, empty {empty}) | {_stats_empty.summary()} | {_events.summary()} now {len(event_fids)} | {CDC.summary()} | {writer.summary()} | {db_pool.summary()} | due {len(due)} (deferred {deferred}) | plan {_stats_sched.planned_per_min(IDS_PER_CALL, _stats_empty):.1f}/min für {len(_stats_sched)} Spiele vs cap {s['min_cap']}/min | lanes {lanes} {http.breaker.summary()}")
+
+                # bis zum nächsten Termin schlafen; liegen Stats wegen Budget/Circuit fest → Takt POLL_SECONDS
+                stalled = stats_blocked or deferred
+                await asyncio.sleep(next_wake([
+                    None if stalled else _stats_sched.next_due(),
+                    _last_fixtures_pull + FIXTURES_REFRESH_SEC,
+                    None if SKIP_ODDS or http.breaker.blocked("/odds/live") else _last_odds_pull + ODDS_REFRESH_SEC,
+                ], cap=POLL_SECONDS if stalled else max(POLL_SECONDS, STATS_INTERVAL_SEC)))
 
             except Exception as e:
                 print(f"[{now_utc_str()}] Fehler: {e}")
                 await asyncio.sleep(5)
+    finally:
+        await writer.close()
+        await db_pool.dispose_async()
+        await http.close()
+        offload.shutdown()
 
 if __name__ == "__main__":
     try:
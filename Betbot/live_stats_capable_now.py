@@ -1,21 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, asyncio, aiohttp
+import os, asyncio
 from dotenv import load_dotenv
+from lib.api_client import env_keys, get_client
 
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-BASE = "https://v3.football.api-sports.io"
-HDRS = {"x-apisports-key": API_KEY, "Accept": "application/json", "User-Agent": "BetBot/1.0"}
-
-async def get_json(s, url, params=None):
-    async with s.get(url, headers=HDRS, params=params, timeout=40) as r:
-        r.raise_for_status()
-        return await r.json()
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
 
 async def has_stats(s, league_id, season):
-    d = await get_json(s, f"{BASE}/leagues", {"id": league_id, "season": season})
+    d = await s.get_json("/leagues", {"id": league_id, "season": season})
     resp = d.get("response", [])
     if not resp: return False
     seasons = resp[0].get("seasons") or []
@@ -25,10 +19,11 @@ async def has_stats(s, league_id, season):
     return bool(cov.get("statistics_fixtures") or cov.get("statistics"))
 
 async def main():
-    if not API_KEY:
-        print("API_SPORTS_KEY fehlt in .env"); return
-    async with aiohttp.ClientSession() as s:
-        fx = await get_json(s, f"{BASE}/fixtures", {"live":"all"})
+    if not API_KEYS:
+        print("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)"); return
+    s = get_client(user_agent="BetBot/1.0")
+    try:
+        fx = await s.get_json("/fixtures", {"live":"all"})
         lives = fx.get("response", [])
         if not lives:
             print("Keine Live-Spiele gerade."); return
@@ -62,6 +57,8 @@ async def main():
 
         print("\nTipp: Einzeltest für ein Fixture mit Stats:")
         print("curl -H \"x-apisports-key: YOUR_KEY\" \"https://v3.football.api-sports.io/fixtures/statistics?fixture=<FID>\"")
+    finally:
+        await s.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -12,41 +12,19 @@ live_stats_detector.py
   3) Liga ohne Coverage
 """
 
-import os, asyncio, aiohttp, time
+import os, asyncio, time
 from dotenv import load_dotenv
+from lib.api_client import env_keys, get_client
 
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-BASE = "https://v3.football.api-sports.io"
-HDRS = {"x-apisports-key": API_KEY, "Accept": "application/json", "User-Agent": "BetBotLiveStatsDetector/1.0"}
-
-# sanfter Abstand zwischen Calls, um Ratenlimit zu schonen
-REQUEST_GAP_SEC = float(os.getenv("REQUEST_GAP_SEC", "0.6"))
-
-if not API_KEY:
-    raise SystemExit("API_SPORTS_KEY fehlt in .env")
-
-async def sleep_gap():
-    await asyncio.sleep(REQUEST_GAP_SEC)
-
-async def get_json(s: aiohttp.ClientSession, url: str, params=None) -> dict:
-    for tries in range(3):
-        try:
-            async with s.get(url, headers=HDRS, params=params, timeout=40) as r:
-                if r.status == 429:
-                    await asyncio.sleep(5);  # Backoff bei Rate-Limit
-                    continue
-                r.raise_for_status()
-                return await r.json()
-        except aiohttp.ClientError:
-            if tries < 2:
-                await asyncio.sleep(2)
-                continue
-            raise
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
+
+if not API_KEYS:
+    raise SystemExit("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)")
 
 async def league_has_stats(s, league_id: int, season: int) -> bool:
     """Check coverage.fixtures.statistics_fixtures (oder 'statistics' fallback)."""
-    data = await get_json(s, f"{BASE}/leagues", {"id": league_id, "season": season})
+    data = await s.get_json("/leagues", {"id": league_id, "season": season})
     resp = data.get("response", [])
     if not resp:
         return False
@@ -57,13 +35,14 @@ async def league_has_stats(s, league_id: int, season: int) -> bool:
     return bool(cov.get("statistics_fixtures") or cov.get("statistics"))
 
 async def fixture_stats_nonempty(s, fixture_id: int) -> bool:
-    data = await get_json(s, f"{BASE}/fixtures/statistics", {"fixture": fixture_id})
+    data = await s.get_json("/fixtures/statistics", {"fixture": fixture_id})
     return bool(data.get("response"))
 
 async def main():
-    async with aiohttp.ClientSession() as s:
+    s = get_client(user_agent="BetBotLiveStatsDetector/1.0")
+    try:
         # 1) Live-Fiksturen holen
-        fx = await get_json(s, f"{BASE}/fixtures", {"live": "all"})
+        fx = await s.get_json("/fixtures", {"live": "all"})
         lives = fx.get("response", [])
         if not lives:
             print("Keine Live-Spiele gerade.")
@@ -81,7 +60,6 @@ async def main():
         for (lid, season), name in leagues.items():
             ok = await league_has_stats(s, lid, season)
             coverage[(lid, season)] = ok
-            await sleep_gap()
 
         # 3) Fixtures in drei Gruppen einteilen
         group_now = []     # Stats jetzt verfügbar (response != [])
@@ -105,7 +83,6 @@ async def main():
 
             # Liga hat Coverage => teste tatsächlich
             has_now = await fixture_stats_nonempty(s, fid)
-            await sleep_gap()
             if has_now:
                 group_now.append(item)
             else:
@@ -123,6 +100,8 @@ async def main():
 
         print("\n=== Ligen OHNE Coverage ===")
         print(fmt(group_nocov))
+    finally:
+        await s.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
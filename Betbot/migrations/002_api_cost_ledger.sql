@@ -0,0 +1,13 @@
+-- API-Kosten je Spiel/Liga und Tag (lib.cost_ledger, Report: python -m lib.cost_ledger)
+-- fixture_id/league_id 0 = nicht zuordenbar (odds/live, fixtures?live=all, odds?date, ...)
+CREATE TABLE IF NOT EXISTS api_cost_ledger (
+  day          DATE NOT NULL,
+  fixture_id   BIGINT NOT NULL DEFAULT 0,
+  league_id    BIGINT NOT NULL DEFAULT 0,
+  kind         TEXT NOT NULL,              -- stats | odds | predictions | meta | fixtures | other
+  calls        NUMERIC(12,3) NOT NULL DEFAULT 0,   -- fixtures?ids= zählt 1/N je Spiel
+  bytes        BIGINT NOT NULL DEFAULT 0,
+  updated_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (day, fixture_id, league_id, kind)
+);
+CREATE INDEX IF NOT EXISTS ix_cost_league_day ON api_cost_ledger(league_id, day);
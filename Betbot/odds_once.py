@@ -1,35 +1,30 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, json, aiohttp, asyncio
+import os, asyncio
 from dotenv import load_dotenv
+from lib.api_client import env_keys, get_client
+from lib.fastjson import dump_file
 
 # === Lade API Key aus .env ===
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-if not API_KEY:
-    raise SystemExit("API_SPORTS_KEY fehlt in .env")
-
-BASE = "https://v3.football.api-sports.io"
-HEADERS = {
-    "x-apisports-key": API_KEY,
-    "Accept": "application/json",
-    "User-Agent": "BetBotOneShot/1.0"
-}
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
+if not API_KEYS:
+    raise SystemExit("Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)")
 
 async def main():
-    async with aiohttp.ClientSession(headers=HEADERS) as s:
-        async with s.get(f"{BASE}/odds/live") as r:
-            print(f"Status: {r.status}")
-            if r.status != 200:
-                print(await r.text())
-                return
-            data = await r.json()
+    api = get_client(user_agent="BetBotOneShot/1.0")
+    try:
+        data = await api.get_json("/odds/live")
+    except Exception as e:
+        print(f"Fehler: {e}")
+        return
+    finally:
+        await api.close()
 
     # Speichern
     out_file = "odds_live_dump.json"
-    with open(out_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    dump_file(out_file, data)
 
     print(f"✅ Gespeichert als {out_file} ({len(data.get('response', []))} Spiele)")
 
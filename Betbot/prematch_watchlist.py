@@ -10,10 +10,12 @@ Pre-Match Watchlist v2 (Top-N)
 - schreibt Top-N + Vollmenge in JSON
 """
 
-import os, sys, json, argparse, asyncio, datetime as dt
+import os, sys, argparse, asyncio, datetime as dt
 from typing import Dict, Any, List, Tuple, Optional
-import aiohttp
 from dotenv import load_dotenv
+from lib.api_client import env_keys, get_client
+from lib.fastjson import dump_file
+from lib.odds_utils import BET_MATCH_WINNER, BET_OVER_UNDER, bookmakers_from_env
 
 # Python 3.9+: ZoneInfo für TZ-Conversion
 try:
@@ -23,9 +25,7 @@ except Exception:
 
 # ================== ENV ==================
 load_dotenv()
-API_KEY = os.getenv("API_SPORTS_KEY")
-BASE = "https://v3.football.api-sports.io"
-HDRS = {"x-apisports-key": API_KEY}
+API_KEYS = env_keys()   # API_KEYS, API_SPORTS_KEY, ...
 DEFAULT_TZ = os.getenv("API_TZ", "Europe/Berlin")
 
 # ================== Helpers ==================
@@ -131,17 +131,6 @@ def value_from_ou25(bets, over_score, default_line="2.5"):
     return best
 
 # ================== API ==================
-async def get_json(session, url, params=None):
-    for attempt in range(3):
-        try:
-            async with session.get(url, headers=HDRS, params=params, timeout=40) as r:
-                r.raise_for_status()
-                return await r.json()
-        except Exception:
-            if attempt == 2:
-                raise
-            await asyncio.sleep(0.8 * (attempt + 1))
-
 async def fetch_fixtures(session, date_iso: str) -> List[Dict[str, Any]]:
     """Versucht from/to; Fallback auf ?date=. Kein timezone/page Param."""
     from_date = date_iso
@@ -151,18 +140,16 @@ async def fetch_fixtures(session, date_iso: str) -> List[Dict[str, Any]]:
 
     fixtures_raw = []
     try:
-        data = await get_json(session, f"{BASE}/fixtures", params={"from": from_date, "to": to_date})
-        with open(f"storage/debug/fixtures-fromto-{date_iso}.json","w",encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        data = await session.get_json("/fixtures", {"from": from_date, "to": to_date})
+        dump_file(f"storage/debug/fixtures-fromto-{date_iso}.json", data)
         fixtures_raw = data.get("response", [])
     except Exception as e:
         print(f"⚠️ from/to error: {e}")
 
     if not fixtures_raw:
         try:
-            data = await get_json(session, f"{BASE}/fixtures", params={"date": date_iso})
-            with open(f"storage/debug/fixtures-date-{date_iso}.json","w",encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            data = await session.get_json("/fixtures", {"date": date_iso})
+            dump_file(f"storage/debug/fixtures-date-{date_iso}.json", data)
             fixtures_raw = data.get("response", [])
         except Exception as e:
             print(f"⚠️ date error: {e}")
@@ -186,12 +173,16 @@ async def fetch_fixtures(session, date_iso: str) -> List[Dict[str, Any]]:
     return out
 
 async def fetch_prediction_for_fixture(session, fid: int) -> Optional[Dict[str, Any]]:
-    data = await get_json(session, f"{BASE}/predictions", params={"fixture": fid})
+    data = await session.get_json("/predictions", {"fixture": fid})
     arr = data.get("response", [])
     return arr[0] if arr else None
 
+# Value-Berechnung nutzt nur 1X2 + O/U → nur diese Märkte laden; ODDS_BOOKMAKERS optional
+ODDS_BETS       = (BET_MATCH_WINNER, BET_OVER_UNDER)
+ODDS_BOOKMAKERS = bookmakers_from_env()
+
 async def fetch_odds_for_fixture(session, fid: int):
-    data = await get_json(session, f"{BASE}/odds", params={"fixture": fid})
+    data = await session.get_odds({"fixture": fid}, bets=ODDS_BETS, bookmakers=ODDS_BOOKMAKERS)
     return data.get("response", [])
 
 def prediction_quality_ok(pred: Dict[str, Any]) -> bool:
@@ -286,9 +277,8 @@ def pretty_row(i, g, tz_name: str):
     )
 
 async def build_watchlist(date_iso: str, tz_name: str, top_n: int, debug: bool=False) -> Tuple[List[Dict[str,Any]], List[Dict[str,Any]]]:
-    timeout = aiohttp.ClientTimeout(total=60)
-    connector = aiohttp.TCPConnector(limit=12, ttl_dns_cache=300)  # konservativ (stabil)
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+    session = get_client(pool_limit=12)  # konservativ (stabil)
+    try:
         fixtures = await fetch_fixtures(session, date_iso)
         total_f = len(fixtures)
         if total_f == 0:
@@ -322,8 +312,7 @@ async def build_watchlist(date_iso: str, tz_name: str, top_n: int, debug: bool=F
                 if not pred or not prediction_quality_ok(pred):
                     empty_preds += 1
                     if debug:
-                        with open(f"storage/debug/preds/{f['fixture_id']}-NOPRED.json","w",encoding="utf-8") as d:
-                            json.dump(pred or {}, d, ensure_ascii=False, indent=2)
+                        dump_file(f"storage/debug/preds/{f['fixture_id']}-NOPRED.json", pred or {})
                     return None
 
                 # Basis-Scores
@@ -370,8 +359,7 @@ async def build_watchlist(date_iso: str, tz_name: str, top_n: int, debug: bool=F
                 scores["category"] = category
 
                 if debug and dbg_count < 3:
-                    with open(f"storage/debug/preds/{f['fixture_id']}-OK.json","w",encoding="utf-8") as d:
-                        json.dump(pred, d, ensure_ascii=False, indent=2)
+                    dump_file(f"storage/debug/preds/{f['fixture_id']}-OK.json", pred)
                     dbg_count += 1
 
                 ok_preds += 1
@@ -390,17 +378,20 @@ async def build_watchlist(date_iso: str, tz_name: str, top_n: int, debug: bool=F
 
         if debug:
             print(f"Mit brauchbarer Prediction: {len(items)}  | Leer/NOPRED: {empty_preds}  | Fehler: {err_preds}")
+            print(session.cache.summary())
 
         # Mindestqualitätsfilter optional (auskommentiert lassen, wenn „alles“ gewünscht)
         # items = [g for g in items if g["over_score"] >= 60 or g["favorit_score"] >= 40]
 
         items.sort(key=lambda x: x["total_score"], reverse=True)
         return items[:top_n], items
+    finally:
+        await session.close()
 
 # ================== Main ==================
 async def main():
-    if not API_KEY:
-        print("Fehler: API_SPORTS_KEY fehlt in .env")
+    if not API_KEYS:
+        print("Fehler: Kein API-Key in .env (API_KEYS oder API_SPORTS_KEY)")
         sys.exit(1)
 
     ap = argparse.ArgumentParser(description="Pre-Match Watchlist v2 (Top-N)")
@@ -420,8 +411,7 @@ async def main():
 
     os.makedirs("storage", exist_ok=True)
     outpath = os.path.join("storage", f"watchlist-{date_iso}.json")
-    with open(outpath, "w", encoding="utf-8") as f:
-        json.dump({"date": date_iso, "tz": args.tz, "top": topN, "all": all_items}, f, ensure_ascii=False, indent=2)
+    dump_file(outpath, {"date": date_iso, "tz": args.tz, "top": topN, "all": all_items})
     print(f"Gespeichert: {outpath}")
 
 if __name__ == "__main__":
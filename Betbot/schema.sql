@@ -62,3 +62,15 @@ CREATE TABLE IF NOT EXISTS alerts (
   details         TEXT               -- JSON als Text (kompatibel zu db_models.Alert)
 );
 CREATE INDEX IF NOT EXISTS ix_alerts_fixture_ts ON alerts (fixture_id, ts_utc DESC);
+
+-- API-Kosten je Spiel/Liga (lib.cost_ledger, siehe migrations/002_api_cost_ledger.sql)
+CREATE TABLE IF NOT EXISTS api_cost_ledger (
+  day             DATE NOT NULL,
+  fixture_id      BIGINT NOT NULL DEFAULT 0,
+  league_id       BIGINT NOT NULL DEFAULT 0,
+  kind            TEXT NOT NULL,
+  calls           NUMERIC(12,3) NOT NULL DEFAULT 0,
+  bytes           BIGINT NOT NULL DEFAULT 0,
+  updated_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (day, fixture_id, league_id, kind)
+);
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame Test-Umgebung: Wegwerf-SQLite statt DATABASE_URL aus .env, Quota/Cache/Backfill
+in einem Temp-Verzeichnis – muss vor dem ersten Import von db/db_models/lib gesetzt sein.
+"""
+
+import os, sys, tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp(prefix="betbot-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP}/betbot.db"
+os.environ["API_QUOTA_DB"] = os.path.join(TMP, "api_quota.db")
+os.environ["API_CACHE_DB"] = os.path.join(TMP, "api_cache.db")
+os.environ["BACKFILL_DB"] = os.path.join(TMP, "backfill.db")
+os.environ.pop("COST_DATABASE_URL", None)
+
+@pytest.fixture
+def fresh_db():
+    """Leere Tabellen nach db_models (= schema.sql) im Test-SQLite."""
+    import db_models
+    db_models.Base.metadata.drop_all(bind=db_models.engine)
+    db_models.init_db()
+    return db_models.engine
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import asyncio, sqlite3, threading, time
+
+import pytest
+
+from lib.api_client import QuotaBudget, QuotaExhausted, lane_for
+
+@pytest.fixture
+def budget(tmp_path):
+    return QuotaBudget("k1", per_minute=100, per_day=3, path=str(tmp_path / "quota.db"))
+
+def test_lanes():
+    assert lane_for("/odds/live", None) == "odds_live"
+    assert lane_for("/fixtures", {"live": "all"}) == "fixtures_live"
+    assert lane_for("/fixtures", {"ids": "1-2"}) == "stats"
+    assert lane_for("/teams", {"id": "1"}) == "backfill"
+
+def test_day_budget(budget):
+    for _ in range(3):
+        assert budget.reserve("stats") == 0.0
+    with pytest.raises(QuotaExhausted):
+        budget.reserve("stats")
+    assert budget.stats()["day_used"] == 3
+
+def test_acquire_does_not_block_the_loop_while_another_process_holds_the_lock(budget):
+    budget._db()   # Tabelle anlegen
+    held = threading.Event()
+
+    def other_process():
+        c = sqlite3.connect(budget.path, isolation_level=None)
+        c.execute("BEGIN IMMEDIATE")
+        held.set()
+        time.sleep(0.5)
+        c.execute("COMMIT")
+
+    t = threading.Thread(target=other_process)
+    t.start()
+    held.wait()
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick = asyncio.create_task(ticker())
+        t0 = time.monotonic()
+        await budget.acquire("stats")
+        waited = time.monotonic() - t0
+        tick.cancel()
+        return ticks, waited
+
+    ticks, waited = asyncio.run(main())
+    t.join()
+    assert waited >= 0.4
+    assert ticks >= 20   # Loop lief weiter, während reserve() auf den Lock wartete
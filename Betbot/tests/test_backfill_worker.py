@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lib.backfill_queue import BackfillQueue
+from lib.circuit_breaker import CircuitOpen
+from workers import backfill_worker as bw
+
+class FakeBudget:
+    def __init__(self, spare):
+        self._spare = spare
+
+    def spare(self, lane):
+        return self._spare
+
+class FakeApi:
+    def __init__(self, spare=100):
+        self.budget = FakeBudget(spare)
+        self.cache = type("C", (), {"summary": lambda self: "cache -"})()
+
+@pytest.fixture
+def q(tmp_path):
+    return BackfillQueue(path=str(tmp_path / "backfill.db"))
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr(bw, "IDLE_SLEEP_SEC", 0.01)
+    monkeypatch.setattr(bw, "ONCE_WAIT_SEC", 0.05)
+
+def test_once_without_budget_exits_and_keeps_jobs(q):
+    q.enqueue("prediction", 1, {"fixture": 1})
+    bw.drain(q, once=True, api=FakeApi(spare=0))   # früher: Endlosschleife
+    assert q.stats()["prediction"]["due"] == 1
+
+def test_once_with_empty_queue_exits_without_budget(q):
+    bw.drain(q, once=True, api=FakeApi(spare=0))
+
+def test_once_runs_jobs(q, monkeypatch):
+    seen = []
+    monkeypatch.setitem(bw.HANDLERS, "prediction", lambda q, p: seen.append(p["fixture"]))
+    for fid in (1, 2, 3):
+        q.enqueue("prediction", fid, {"fixture": fid})
+    bw.drain(q, once=True, api=FakeApi())
+    assert seen == [1, 2, 3] and q.stats() == {}
+
+def test_circuit_open_releases_job_without_failure(q, monkeypatch):
+    def handler(q, p):
+        raise CircuitOpen("/predictions?fixture", 30)
+
+    monkeypatch.setitem(bw.HANDLERS, "prediction", handler)
+    monkeypatch.setattr(q, "max_attempts", 1)   # ein Fehlversuch würde den Job verwerfen
+    q.enqueue("prediction", 1, {"fixture": 1})
+    bw.drain(q, once=True, api=FakeApi())
+    st = q.stats()["prediction"]
+    assert st == {"due": 0, "later": 1, "retry": 0}
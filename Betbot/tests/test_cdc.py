@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from lib.cdc import ChangeFilter
+
+ODDS = (2.5, 1.9, 1.95)
+
+def test_unchanged_values_are_skipped():
+    f = ChangeFilter(heartbeat=600, enabled=True)
+    assert f.changed("odds_live", 1, ODDS, now=0)
+    assert not f.changed("odds_live", 1, ODDS, now=10)
+    assert f.changed("odds_live", 1, (2.5, 1.85, 2.0), now=20)
+    # gleiche Werte, anderes Spiel / andere Tabelle zählen getrennt
+    assert f.changed("odds_live", 2, ODDS, now=20)
+    assert f.changed("snapshots", 1, ODDS, now=20)
+    assert f.summary() == "cdc odds_live 3/4 (skip 25%) snapshots 1/1 (skip 0%)"
+
+def test_heartbeat_writes_unchanged_row():
+    f = ChangeFilter(heartbeat=600, enabled=True)
+    f.changed("snapshots", 1, (3, 5), now=0)
+    assert not f.changed("snapshots", 1, (3, 5), now=599)
+    assert f.changed("snapshots", 1, (3, 5), now=600)
+    assert not f.changed("snapshots", 1, (3, 5), now=601)
+
+def test_heartbeat_zero_never_forces_write():
+    f = ChangeFilter(heartbeat=0, enabled=True)
+    f.changed("snapshots", 1, (3, 5), now=0)
+    assert not f.changed("snapshots", 1, (3, 5), now=10 ** 6)
+
+def test_disabled_writes_every_row():
+    f = ChangeFilter(heartbeat=600, enabled=False)
+    assert all(f.changed("odds_live", 1, ODDS, now=t) for t in range(3))
+    assert f.written["odds_live"] == 3
+
+def test_retain_drops_finished_fixtures():
+    f = ChangeFilter(heartbeat=600, enabled=True)
+    for fid in (1, 2):
+        f.changed("odds_live", fid, ODDS, now=0)
+    f.retain([1])                            # Spiel 2 beendet
+    assert f.changed("odds_live", 2, ODDS, now=1)
+    assert not f.changed("odds_live", 1, ODDS, now=2)
+
+def test_forget_after_failed_write():
+    f = ChangeFilter(heartbeat=600, enabled=True)
+    for fid in (1, 2):
+        f.changed("odds_live", fid, ODDS, now=0)
+    f.forget("odds_live", [1])
+    assert f.changed("odds_live", 1, ODDS, now=1)
+    assert not f.changed("odds_live", 2, ODDS, now=1)
+
+def test_summary_reset():
+    f = ChangeFilter(heartbeat=600, enabled=True)
+    assert f.summary() == "cdc -"
+    f.changed("odds_live", 1, ODDS, now=0)
+    f.summary(reset=True)
+    assert f.summary() == "cdc -"
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lib import circuit_breaker as cb
+from lib.circuit_breaker import CircuitBreaker, CircuitOpen, breaker_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cb.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def br(monkeypatch, clock):
+    monkeypatch.setenv("BREAKER_FAILURES", "3")
+    monkeypatch.setenv("BREAKER_COOLDOWN_SEC", "60")
+    monkeypatch.setenv("BREAKER_FORBIDDEN_COOLDOWN_SEC", "1800")
+    monkeypatch.setenv("BREAKER_PROBE_TIMEOUT_SEC", "30")
+    return CircuitBreaker()
+
+EP = "/odds/live"
+
+def test_key_uses_param_names_not_values():
+    assert breaker_key("/fixtures", {"fixture": 1}) == breaker_key("/fixtures", {"fixture": 2}) == "/fixtures?fixture"
+    assert breaker_key("/fixtures", {"live": "all", "ids": "1"}) == "/fixtures?ids,live"
+    assert breaker_key("/status") == "/status"
+
+def test_opens_after_consecutive_failures(br):
+    for status in (500, None):
+        br.record(EP, None, status)
+        br.before(EP)
+    br.record(EP, None, 503)
+    assert br.state(EP) == cb.OPEN and br.blocked(EP)
+    with pytest.raises(CircuitOpen) as e:
+        br.before(EP)
+    assert e.value.retry_in == pytest.approx(60)
+
+def test_success_resets_failure_count(br):
+    br.record(EP, None, 500)
+    br.record(EP, None, 500)
+    br.record(EP, None, 200)
+    br.record(EP, None, 500)
+    assert br.state(EP) == cb.CLOSED
+
+def test_client_errors_do_not_count(br):
+    for status in (400, 404, 429, 400):
+        br.record(EP, None, status)
+    assert br.state(EP) == cb.CLOSED
+
+def test_forbidden_opens_immediately_with_long_cooldown(br, clock):
+    br.record(EP, None, 403)
+    assert br.state(EP) == cb.OPEN
+    clock[0] += 600
+    assert br.blocked(EP)
+    # anderer Endpoint bleibt unberührt
+    br.before("/fixtures", {"live": "all"})
+
+def test_half_open_single_probe_then_close(br, clock):
+    for _ in range(3):
+        br.record(EP, None, 500)
+    clock[0] += 61
+    br.before(EP)  # Probe
+    assert br.state(EP) == cb.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        br.before(EP)  # zweite gleichzeitige Probe abgelehnt
+    br.record(EP, None, 200)
+    assert br.state(EP) == cb.CLOSED
+    br.before(EP)
+
+def test_failed_probe_doubles_cooldown(br, clock):
+    for _ in range(3):
+        br.record(EP, None, 500)
+    clock[0] += 61
+    br.before(EP)
+    br.record(EP, None, 502)
+    assert br.state(EP) == cb.OPEN
+    clock[0] += 100
+    assert br.blocked(EP)
+    clock[0] += 21
+    assert not br.blocked(EP)
+
+def test_hanging_probe_is_replaced_after_timeout(br, clock):
+    for _ in range(3):
+        br.record(EP, None, 500)
+    clock[0] += 61
+    br.before(EP)
+    clock[0] += 31
+    assert not br.blocked(EP)
+    br.before(EP)
+
+def test_summary_lists_only_non_closed(br):
+    assert br.summary() == ""
+    br.record(EP, None, 401)
+    with pytest.raises(CircuitOpen):
+        br.before(EP)
+    assert br.summary() == "circuits /odds/live=open(1 skip)"
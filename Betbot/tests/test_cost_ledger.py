@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from sqlalchemy import text
+
+from lib import db_pool
+from lib.cost_ledger import CostLedger, attribute, cost_kind
+
+def ledger_threads():
+    return [t for t in threading.enumerate() if t.name == "cost-ledger"]
+
+def test_attribution():
+    assert cost_kind("/fixtures", {"ids": "1-2"}) == "stats"
+    assert cost_kind("/fixtures", {"live": "all"}) == "fixtures"
+    assert cost_kind("/odds/live", None) == "odds"
+    assert attribute("/fixtures", {"ids": "1-2-3-4"}) == [(f, 0, 0.25) for f in (1, 2, 3, 4)]
+    assert attribute("/predictions", {"fixture": "9"}) == [(9, 0, 1.0)]
+    assert attribute("/odds", {"league": "39", "date": "2025-10-26"}) == [(0, 39, 1.0)]
+
+def test_disabled_without_database_url(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.delenv("COST_DATABASE_URL", raising=False)
+    led = CostLedger()
+    assert led.enabled is False
+    for _ in range(1000):
+        led.record("/fixtures", {"ids": "1-2"})
+    assert not led._pending and led._thread is None
+
+def test_flush_upserts_and_accumulates(tmp_path):
+    url = f"sqlite:///{tmp_path}/cost.db"
+    led = CostLedger(url=url)
+    led.note_leagues({1: 39})
+    led.record("/fixtures", {"ids": "1-2"}, nbytes=1000)
+    led.record("/fixtures", {"ids": "1-2"}, nbytes=1000)
+    assert led.flush() == 2
+    led.record("/fixtures", {"ids": "1"}, nbytes=10)
+    assert led.flush() == 1
+    with db_pool.engine(url=url).connect() as conn:
+        got = {r[0]: (r[1], float(r[2]), r[3]) for r in conn.execute(text(
+            "SELECT fixture_id, league_id, calls, bytes FROM api_cost_ledger WHERE kind = 'stats'"))}
+    assert got == {1: (39, 2.0, 1010), 2: (0, 1.0, 1000)}
+
+def test_failing_db_keeps_bounded_buffer_and_one_thread(tmp_path, monkeypatch):
+    monkeypatch.setenv("COST_FLUSH_ROWS", "5")
+    monkeypatch.setenv("COST_PENDING_MAX", "50")
+    led = CostLedger(url=f"sqlite:///{tmp_path}/missing/dir/cost.db")
+    before = len(ledger_threads())
+    for fid in range(1, 501):
+        led.record("/predictions", {"fixture": fid})
+    assert led.flush() == 0 and led._failed
+    assert len(led._pending) <= 50 and led.dropped >= 450
+    assert len(ledger_threads()) - before <= 1
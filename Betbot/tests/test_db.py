@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+import db
+from lib import db_pool
+
+def fx(fid, **kw):
+    row = dict(fixture_id=fid, league_id=39, league_name="Premier League", season=2025,
+               home_id=2 * fid, home_name=f"H{fid}", away_id=2 * fid + 1, away_name=f"A{fid}")
+    row.update(kw)
+    return row
+
+def rows(engine):
+    with engine.connect() as conn:
+        return {r.fixture_id: r for r in conn.execute(text("SELECT * FROM fixtures"))}
+
+def test_upsert_fixtures_inserts_and_updates(fresh_db, monkeypatch):
+    monkeypatch.setattr(db, "FIXTURE_UPSERT_CHUNK", 2)   # mehrere Statements in einer Transaktion
+    assert db.upsert_fixtures([fx(i) for i in range(1, 6)]) == 5
+    # doppelte fixture_id im selben Aufruf: letzter Stand gewinnt
+    assert db.upsert_fixtures([fx(3, home_name="alt"), fx(3, home_name="Neu"), fx(6)]) == 2
+    got = rows(fresh_db)
+    assert sorted(got) == [1, 2, 3, 4, 5, 6]
+    assert got[3].home_name == "Neu" and got[3].home_id == 6 and got[6].away_name == "A6"
+    assert got[1].created_at is not None and got[1].updated_at is not None
+
+@pytest.mark.parametrize("mode", ["off", "auto"])
+def test_upsert_fixtures_async(fresh_db, monkeypatch, mode):
+    monkeypatch.setattr(db_pool, "DB_ASYNC", mode)
+
+    async def run():
+        try:
+            return await db.upsert_fixtures_async([fx(7), fx(8, away_name="X")])
+        finally:
+            await db_pool.dispose_async()
+
+    assert asyncio.run(run()) == 2
+    assert rows(fresh_db)[8].away_name == "X"
+
+def test_fixture_cols_match_orm():
+    import db_models
+    assert set(db.FIXTURE_COLS) <= set(db_models.Fixture.__table__.columns.keys())
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import pytest
+
+from lib import db_pool
+
+@pytest.fixture
+def no_aiosqlite(monkeypatch):
+    monkeypatch.setitem(sys.modules, "aiosqlite", None)   # import → ImportError
+    monkeypatch.setattr(db_pool, "_async_ok", {})
+
+def test_async_on_without_driver_fails_fast(no_aiosqlite, monkeypatch):
+    monkeypatch.setattr(db_pool, "DB_ASYNC", "on")
+    with pytest.raises(RuntimeError, match="aiosqlite"):
+        db_pool.use_async(url="sqlite:////tmp/x.db")
+
+def test_async_auto_without_driver_falls_back(no_aiosqlite, monkeypatch):
+    monkeypatch.setattr(db_pool, "DB_ASYNC", "auto")
+    assert db_pool.use_async(url="sqlite:////tmp/x.db") is False
+
+def test_async_off_skips_probe(monkeypatch):
+    monkeypatch.setattr(db_pool, "DB_ASYNC", "off")
+    assert db_pool.use_async(url="mysql://u@h/db") is False
+
+def test_postgres_url_normalized():
+    assert db_pool.normalize_url("postgres://u:p@h/db") == "postgresql://u:p@h/db"
+    assert "prepared_statement_cache_size" in db_pool.async_url("postgresql://u:p@h/db")
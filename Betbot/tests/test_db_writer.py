@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from lib import db_pool
+from lib.cdc import ChangeFilter
+from lib.db_writer import BatchWriter
+
+@pytest.mark.parametrize("mode", ["off", "auto"])
+def test_group_commit_into_orm_tables(fresh_db, monkeypatch, mode):
+    """Writer-Zeilen (schema.sql-Spalten) passen in die Tabellen, die init_db anlegt."""
+    monkeypatch.setattr(db_pool, "DB_ASYNC", mode)
+    with fresh_db.begin() as conn:
+        conn.execute(text("INSERT INTO fixtures (fixture_id, home_name, away_name) VALUES (1, 'H', 'A')"))
+
+    async def run():
+        w = BatchWriter(flush_sec=0.01)
+        for minute in range(3):
+            await w.put("snapshots", dict(fixture_id=1, minute=minute, home_sog=minute, home_shots=1, home_corners=0,
+                                          home_poss=50.0, home_saves=0, away_sog=0, away_shots=2, away_corners=1,
+                                          away_poss=50.0, away_saves=1))
+        await w.put("odds_live", dict(fixture_id=1, home_ml=2.1, draw_ml=3.3, away_ml=3.6))
+        await w.close()
+        await db_pool.dispose_async()
+        return w
+
+    w = asyncio.run(run())
+    assert w.dropped == 0
+    assert dict(w.written) == {"snapshots": 3, "odds_live": 1}
+    with fresh_db.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM snapshots WHERE ts_utc IS NOT NULL")).scalar() == 3
+        assert conn.execute(text("SELECT home_ml, draw_ml, away_ml FROM odds_live")).one() == (2.1, 3.3, 3.6)
+
+def test_failed_batch_is_counted_as_dropped(fresh_db, monkeypatch):
+    monkeypatch.setattr(db_pool, "DB_ASYNC", "off")
+    monkeypatch.setattr("lib.db_writer.WRITER_RETRIES", 1)
+
+    async def run():
+        w = BatchWriter(flush_sec=0.01)
+        await w.put("snapshots", dict(fixture_id=1, no_such_column=1))
+        await w.close()
+        return w
+
+    w = asyncio.run(run())
+    assert w.dropped == 1 and not w.written
+
+def test_dropped_rows_are_written_again_after_recovery(fresh_db, monkeypatch):
+    """Ohne forget() gälten die verlorenen Werte bis zum Heartbeat als unverändert."""
+    monkeypatch.setattr(db_pool, "DB_ASYNC", "off")
+    monkeypatch.setattr("lib.db_writer.WRITER_RETRIES", 1)
+    cdc = ChangeFilter(heartbeat=600, enabled=True)
+    monkeypatch.setattr("lib.db_writer.CDC", cdc)
+    book = (2.1, 3.3, 3.6)
+
+    async def run():
+        w = BatchWriter(flush_sec=0.01)
+        for fid in (1, 2):
+            assert cdc.changed("odds_live", fid, book)
+        assert cdc.changed("snapshots", 1, (0, 0))
+        await w.put("odds_live", dict(fixture_id=1, no_such_column=1))
+        await w.put("snapshots", dict(fixture_id=1, no_such_column=1))
+        await w.close()
+        return w
+
+    w = asyncio.run(run())
+    assert w.dropped == 2
+    assert cdc.changed("odds_live", 1, book) and cdc.changed("snapshots", 1, (0, 0))
+    assert not cdc.changed("odds_live", 2, book)   # nicht im verworfenen Batch
+
+def test_init_db_rejects_old_orm_layout(fresh_db):
+    import db_models
+    with fresh_db.begin() as conn:
+        conn.execute(text("DROP TABLE alerts"))
+        conn.execute(text("CREATE TABLE alerts (id INTEGER PRIMARY KEY, timestamp DATETIME)"))
+    with pytest.raises(RuntimeError, match="alerts"):
+        db_models.init_db()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import datetime as dt, decimal, json
+
+import pytest
+
+from lib import fastjson
+
+DOC = {"name": "Borussia Mönchengladbach", "odds": [1.95, 3.4], "ok": True, "none": None,
+       "price": decimal.Decimal("2.25"), "ts": dt.datetime(2026, 10, 16, 20, 15, 0),
+       "day": dt.date(2026, 10, 16), "ids": (1, 2), 7: "int-key"}
+EXPECTED = {"name": "Borussia Mönchengladbach", "odds": [1.95, 3.4], "ok": True, "none": None,
+            "price": 2.25, "ts": "2026-10-16T20:15:00", "day": "2026-10-16", "ids": [1, 2], "7": "int-key"}
+
+BACKENDS = ["json"] + (["orjson"] if fastjson.orjson else [])
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    return request.param
+
+def test_round_trip(backend):
+    raw = fastjson.dumps_bytes(DOC)
+    assert isinstance(raw, bytes) and "Mönchengladbach".encode() in raw   # UTF-8, keine \u-Escapes
+    assert fastjson.loads(raw) == EXPECTED
+    assert fastjson.loads(raw.decode()) == EXPECTED
+    assert json.loads(fastjson.dumps(DOC, indent=True)) == EXPECTED
+
+def test_unknown_type_raises(backend):
+    with pytest.raises(TypeError):
+        fastjson.dumps({"x": object()})
+
+def test_dump_file(backend, tmp_path):
+    p = tmp_path / "dump.json"
+    fastjson.dump_file(str(p), {"response": [DOC]})
+    assert json.loads(p.read_bytes()) == {"response": [EXPECTED]}
+
+@pytest.mark.skipif(not fastjson.orjson, reason="orjson nicht installiert")
+def test_backends_write_the_same_bytes(monkeypatch):
+    fast = (fastjson.dumps_bytes(DOC), fastjson.dumps_bytes(DOC, indent=True))
+    monkeypatch.setattr(fastjson, "orjson", None)
+    assert (fastjson.dumps_bytes(DOC), fastjson.dumps_bytes(DOC, indent=True)) == fast
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from lib.http_cache import ResponseCache, cache_key, policy_for
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_CACHE_STATS_FLUSH_SEC", "3600")
+    return ResponseCache(path=str(tmp_path / "cache.db"), enabled=True)
+
+def test_key_ignores_param_order_and_none():
+    assert cache_key("/teams", {"b": 2, "a": 1, "c": None}) == "/teams?a=1&b=2"
+
+def test_policy():
+    assert policy_for("/fixtures", {"id": "1"})[0] == 6 * 3600
+    assert policy_for("/fixtures", {"date": "2025-10-26"}) is None
+    assert policy_for("/fixtures", {"ids": "1-2"}) is None   # Live-Stats nie cachen
+
+def test_fresh_stale_miss(cache, monkeypatch):
+    p = {"id": "7"}
+    assert cache.lookup("/fixtures", p) == ("miss", None)
+    cache.store("/fixtures", p, {"errors": [], "response": [{"fixture": {"id": 7}}]})
+    assert cache.lookup("/fixtures", p)[0] == "fresh"
+    assert cache.lookup("/fixtures", p, raw=True)[1].startswith("{")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 6 * 3600 + 1)
+    assert cache.lookup("/fixtures", p)[0] == "stale"
+    monkeypatch.setattr(time, "time", lambda: now + 12 * 3600 + 1)
+    assert cache.lookup("/fixtures", p)[0] == "miss"
+
+def test_error_payloads_not_cached(cache):
+    cache.store("/teams", {"id": "1"}, {"errors": {"token": "bad"}, "response": []})
+    assert cache.lookup("/teams", {"id": "1"})[0] == "miss"
+
+def test_stats_counted_in_memory_then_flushed(cache):
+    cache.store("/teams", {"id": "1"}, {"errors": [], "response": [1]})
+    for _ in range(3):
+        cache.lookup("/teams", {"id": "1"})
+    cache.lookup("/teams", {"id": "2"})
+    assert cache.counters["/teams"] == {"hits": 3, "stale": 0, "misses": 1}
+    c = cache._db()
+    assert c.execute("SELECT COUNT(*) FROM http_cache_stats").fetchone()[0] == 0
+    st = cache.stats()["/teams"]   # stats() schreibt die offenen Zähler vorher
+    assert (st["hits"], st["misses"], st["entries"]) == (3, 1, 1)
+    cache.lookup("/teams", {"id": "1"})
+    cache.flush_stats()
+    assert c.execute("SELECT hits FROM http_cache_stats").fetchone()[0] == 4
+
+def test_claim_is_exclusive_until_released(cache, tmp_path):
+    other = ResponseCache(path=str(tmp_path / "cache.db"), enabled=True)
+    assert cache.claim("/odds/live", None, lease=10)
+    assert not other.claim("/odds/live", None, lease=10)
+    cache.release("/odds/live", None)
+    assert other.claim("/odds/live", None, lease=10)
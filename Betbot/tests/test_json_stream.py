@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import asyncio, json
+
+import pytest
+
+from lib.json_stream import iter_items, aiter_items
+
+DOC = {
+    "get": "odds/live", "parameters": {"fixture": "1"}, "errors": [], "results": 2.5,
+    "paging": {"current": 1, "total": 1},
+    "response": [
+        1, 2.5, -30, 1e-3, 12.75e+2, True, None, "Zürich \"x\" ✓",
+        {"fixture": {"id": 123456}, "odds": [{"name": "Match Winner", "values": [{"value": "Home", "odd": "2.10"}]}]},
+        [0.5, -0.25, []],
+    ],
+    "tail": -1.5e3,
+}
+
+def split_all(raw: bytes):
+    """Jeder mögliche Schnitt in zwei Chunks (auch mitten in Zahlen und UTF-8-Sequenzen)."""
+    for i in range(len(raw) + 1):
+        yield [raw[:i], raw[i:]]
+
+@pytest.mark.parametrize("raw", [json.dumps(DOC).encode(), json.dumps(DOC, ensure_ascii=False, indent=1).encode()])
+def test_every_chunk_boundary(raw):
+    want = {k: v for k, v in DOC.items() if k != "response"}
+    for chunks in split_all(raw):
+        head = {}
+        assert list(iter_items(chunks, head=head)) == DOC["response"], chunks
+        assert head == want, chunks
+
+def test_single_byte_chunks():
+    raw = json.dumps(DOC).encode()
+    head = {}
+    assert list(iter_items([raw[i:i + 1] for i in range(len(raw))], head=head)) == DOC["response"]
+    assert head["results"] == 2.5 and head["tail"] == -1500.0
+
+@pytest.mark.parametrize("chunks, items, head", [
+    ([b'{"response":[1, 2.', b'5, 30]}'], [1, 2.5, 30], {}),
+    ([b'{"results":2.', b'5,"response":[]}'], [], {"results": 2.5}),
+    ([b'{"response":[1e', b'3]}'], [1000.0], {}),
+    ([b'{"response":[-', b'7]}'], [-7], {}),
+    ([b'{"response":[12', b'34]}'], [1234], {}),
+])
+def test_number_split_across_chunks(chunks, items, head):
+    got = {}
+    assert list(iter_items(chunks, head=got)) == items
+    assert got == head
+
+def test_async_iterator():
+    raw = json.dumps(DOC).encode()
+
+    async def chunks():
+        for i in range(0, len(raw), 7):
+            yield raw[i:i + 7]
+
+    async def collect():
+        return [x async for x in aiter_items(chunks())]
+
+    assert asyncio.run(collect()) == DOC["response"]
+
+def test_non_array_response_goes_to_head():
+    head = {}
+    assert list(iter_items([b'{"errors":{"token":"x"},"response":{}}'], head=head)) == []
+    assert head == {"errors": {"token": "x"}, "response": {}}
+
+def test_truncated_body_raises():
+    with pytest.raises((ValueError, json.JSONDecodeError)):
+        list(iter_items([b'{"response":[1, 2']))
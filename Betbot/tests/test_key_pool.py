@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lib import api_client
+from lib.api_client import ApiClient, KeyPool, QuotaExhausted
+
+@pytest.fixture(autouse=True)
+def quota_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_QUOTA_DB", str(tmp_path / "quota.db"))
+    monkeypatch.setenv("API_CACHE_DB", str(tmp_path / "cache.db"))
+    monkeypatch.setenv("GLOBAL_MAX_REQUESTS_PER_MINUTE", "100")
+    monkeypatch.setenv("GLOBAL_MAX_REQUESTS_PER_DAY", "1000")
+    for name in ("API_KEYS", "API_SPORTS_KEY", "APIFOOTBALL_KEY", "API_FOOTBALL_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+def test_env_keys_merges_without_duplicates(monkeypatch):
+    monkeypatch.setenv("API_KEYS", "a, b,,a")
+    monkeypatch.setenv("API_SPORTS_KEY", "b")
+    monkeypatch.setenv("APIFOOTBALL_KEY", "c")
+    assert api_client.env_keys() == ["a", "b", "c"]
+
+def test_pick_rotates_to_key_with_most_spare():
+    pool = KeyPool(["a", "b"])
+    seen = []
+    for _ in range(6):
+        slot = pool.pick("stats")
+        assert slot.budget.reserve("stats") == 0.0
+        seen.append(slot.api_key)
+    assert seen == ["a", "b"] * 3
+
+def test_pick_breaks_ties_by_day_left():
+    pool = KeyPool(["a", "b"])
+    a, b = pool.slots
+    a.budget.per_day, b.budget.per_day = 500, 900   # Minutenreserve gleich, Resttag nicht
+    assert pool.pick("stats") is b
+
+def test_exhausted_key_leaves_rotation():
+    pool = KeyPool(["a", "b"])
+    a, b = pool.slots
+    a.budget.per_day = 1
+    a.budget.reserve("stats")
+    assert all(pool.pick("stats") is b for _ in range(3))
+    assert a.out
+    b.budget.per_day = 0
+    with pytest.raises(QuotaExhausted):
+        pool.pick("stats")
+
+def test_disable_keeps_last_key():
+    pool = KeyPool(["a", "b"])
+    a, b = pool.slots
+    assert pool.disable(a, "401")
+    assert pool.pick("stats") is b and pool.pick("backfill") is b
+    assert not pool.disable(b, "401")   # ohne Key ginge gar nichts mehr
+    assert not b.disabled
+    assert pool.stats()["keys"] == 1
+
+class FakeResponse:
+    def __init__(self, status, body=b'{"response": []}'):
+        self.status_code, self.content, self.headers = status, body, {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(response=self)
+
+    def close(self):
+        pass
+
+class FakeSession:
+    def __init__(self, status_by_key):
+        self.status_by_key = status_by_key
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        key = headers["x-apisports-key"]
+        self.calls.append(key)
+        return FakeResponse(self.status_by_key[key])
+
+def test_client_disables_key_on_401_and_retries_with_next(monkeypatch):
+    monkeypatch.setenv("API_KEYS", "bad,good")
+    client = ApiClient()
+    client._sync = FakeSession({"bad": 401, "good": 200})
+    assert client.get_json_sync("/teams", {"id": 1}, cache=False) == {"response": []}
+    assert client._sync.calls == ["bad", "good"]
+    assert client.keys.slots[0].disabled
+    client.get_json_sync("/teams", {"id": 2}, cache=False)
+    assert client._sync.calls[-1] == "good"
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from lib.live_stats import IDS_PER_CALL, fetch_stats_block, stats_blocks, stats_from_fixture
+
+def side(team_id, shots=3):
+    return {"team": {"id": team_id}, "statistics": [{"type": "Shots on Goal", "value": shots}]}
+
+def row(fid, *sides, home=10):
+    return {"fixture": {"id": fid}, "teams": {"home": {"id": home}, "away": {"id": 20}}, "statistics": list(sides)}
+
+def test_blocks_split_at_20_ids_without_duplicates():
+    assert IDS_PER_CALL == 20
+    blocks = stats_blocks(list(range(45)) + [3, 7])
+    assert [len(b) for b in blocks] == [20, 20, 5]
+    assert blocks[0][0] == 0 and blocks[2][-1] == 44
+    assert stats_blocks([]) == []
+
+def test_stats_home_first_even_if_api_swaps_order():
+    assert stats_from_fixture(row(1, side(20, 1), side(10, 2))) == [side(10, 2), side(20, 1)]
+
+def test_stats_with_missing_sides():
+    # Auswärts ohne Werte → nur Heim; gar keine statistics → leer
+    assert stats_from_fixture(row(1, side(10), {"team": {"id": 20}, "statistics": []})) == [side(10)]
+    assert stats_from_fixture({"fixture": {"id": 1}, "statistics": None}) == []
+    assert stats_from_fixture({"fixture": {"id": 1}}) == []
+
+class FakeHttp:
+    def __init__(self, rows):
+        self.rows, self.calls = rows, []
+
+    async def get_json(self, path, params=None, **kw):
+        self.calls.append((path, params))
+        return {"response": self.rows}
+
+def test_fetch_stats_block_one_call_per_block():
+    http = FakeHttp([row(1, side(10), side(20)), row(2), row(99, side(10))])
+    out = asyncio.run(fetch_stats_block(http, [1, 2, 3]))
+    assert http.calls == [("/fixtures", {"ids": "1-2-3"})]
+    assert out == {1: [side(10), side(20)], 2: [], 3: []}   # fremde IDs ignoriert
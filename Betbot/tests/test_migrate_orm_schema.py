@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import db_models
+from tools import migrate_orm_schema as mig
+
+OLD_LAYOUT = [
+    """CREATE TABLE fixtures (id INTEGER PRIMARY KEY, fixture_id INTEGER UNIQUE NOT NULL, league_id INTEGER,
+       league_name VARCHAR, season INTEGER, date DATETIME, home_team_id INTEGER, home_team_name VARCHAR,
+       away_team_id INTEGER, away_team_name VARCHAR, status VARCHAR, elapsed INTEGER, home_goals INTEGER,
+       away_goals INTEGER, created_at DATETIME, updated_at DATETIME)""",
+    "CREATE INDEX ix_fixtures_fixture_id ON fixtures (fixture_id)",
+    """CREATE TABLE snapshots (id INTEGER PRIMARY KEY, fixture_id INTEGER NOT NULL, minute INTEGER NOT NULL,
+       timestamp DATETIME NOT NULL, home_shots INTEGER, home_sog INTEGER, home_soff INTEGER, home_corners INTEGER,
+       home_saves INTEGER, home_poss FLOAT, away_shots INTEGER, away_sog INTEGER, away_corners INTEGER,
+       away_saves INTEGER, away_poss FLOAT, home_score INTEGER, away_score INTEGER)""",
+    """CREATE TABLE odds_live (id INTEGER PRIMARY KEY, fixture_id INTEGER NOT NULL, bookmaker VARCHAR, market VARCHAR,
+       timestamp DATETIME NOT NULL, minute INTEGER, home_odds FLOAT, draw_odds FLOAT, away_odds FLOAT,
+       over_under_line FLOAT, over_odds FLOAT, under_odds FLOAT)""",
+    """INSERT INTO fixtures (id, fixture_id, league_id, season, home_team_id, home_team_name, away_team_id,
+       away_team_name, status) VALUES (7, 1001, 39, 2026, 10, 'Home FC', 20, 'Away FC', 'FT')""",
+    """INSERT INTO snapshots (fixture_id, minute, timestamp, home_sog, home_poss, away_sog, home_score)
+       VALUES (1001, 12, '2026-10-16 20:12:00', 3, 55.0, 1, 1), (999, 5, '2026-10-16 20:05:00', 0, 50.0, 0, 0)""",
+    """INSERT INTO odds_live (fixture_id, timestamp, home_odds, draw_odds, away_odds, over_under_line, over_odds)
+       VALUES (1001, '2026-10-16 20:12:00', 2.1, 3.3, 3.6, 2.5, 1.9)""",
+]
+
+@pytest.fixture
+def old_db(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with eng.begin() as conn:
+        for sql in OLD_LAYOUT:
+            conn.execute(text(sql))
+    yield eng
+    eng.dispose()
+
+def test_old_layout_is_refused(old_db):
+    with pytest.raises(RuntimeError, match="migrate_orm_schema"):
+        db_models.check_schema(old_db)
+
+def test_migrate_to_schema_sql_layout(old_db):
+    assert mig.migrate(old_db) == {"fixtures": 1, "snapshots": 1, "odds_live": 1}   # Snapshot zu Fixture 999 fällt weg
+    db_models.check_schema(old_db)
+    with old_db.connect() as conn:
+        assert conn.execute(text("SELECT fixture_id, league_id, home_id, home_name, away_name, created_at IS NOT NULL "
+                                 "FROM fixtures")).one() == (1001, 39, 10, "Home FC", "Away FC", 1)
+        assert conn.execute(text("SELECT fixture_id, minute, ts_utc, home_sog, home_poss, away_sog FROM snapshots")).one() \
+            == (1001, 12, "2026-10-16 20:12:00", 3, 55.0, 1)
+        assert conn.execute(text("SELECT goalline, over_odds, home_ml, draw_ml, away_ml FROM odds_live")).one() \
+            == (2.5, 1.9, 2.1, 3.3, 3.6)
+        # neue Zeilen bekommen IDs und Defaults wie nach init_db
+        conn.execute(text("INSERT INTO snapshots (fixture_id, minute) VALUES (1001, 13)"))
+        assert conn.execute(text("SELECT COUNT(*) FROM snapshots WHERE ts_utc IS NOT NULL")).scalar() == 2
+    assert "alerts" in inspect(old_db).get_table_names()
+    assert mig.migrate(old_db) == {}
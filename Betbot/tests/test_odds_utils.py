@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from lib.odds_utils import aggregate_market_odds, bookmakers_from_env, merge_odds
+
+def bet(bet_id, name, *values):
+    return {"id": bet_id, "name": name, "values": [{"value": v, "odd": o} for v, o in values]}
+
+WINNER = bet(1, "Match Winner", ("Home", "2.0"), ("Draw", "3.5"), ("Away", "4.0"))
+OVER = bet(5, "Goals Over/Under", ("Over 2.5", "1.9"), ("Under 2.5", "1.9"))
+
+def part(fid, bookmaker, *bets, errors=None):
+    return {"errors": errors or [], "response": [
+        {"fixture": {"id": fid}, "league": {"id": 39}, "bookmakers": [{"id": bookmaker, "bets": list(bets)}]}]}
+
+def test_merge_per_fixture_and_bookmaker():
+    out = merge_odds([part(1, 8, WINNER), part(1, 8, OVER), part(1, 6, WINNER), part(2, 8, OVER)])
+    assert out["results"] == 2 and out["errors"] == []
+    first, second = out["response"]
+    assert first["fixture"] == {"id": 1} and first["league"] == {"id": 39}
+    assert [(b["id"], [x["id"] for x in b["bets"]]) for b in first["bookmakers"]] == [(8, [1, 5]), (6, [1])]
+    assert [(b["id"], [x["id"] for x in b["bets"]]) for b in second["bookmakers"]] == [(8, [5])]
+    assert aggregate_market_odds(first["bookmakers"])["n"] == 2
+
+def test_merge_skips_duplicate_bets_and_keeps_inputs_intact():
+    a, b = part(1, 8, WINNER), part(1, 8, WINNER, OVER)
+    out = merge_odds([a, b])
+    assert [x["id"] for x in out["response"][0]["bookmakers"][0]["bets"]] == [1, 5]
+    assert a["response"][0]["bookmakers"][0]["bets"] == [WINNER]   # Eingaben nicht verändert
+
+def test_merge_empty_and_errors():
+    assert merge_odds([]) == {"results": 0, "errors": [], "response": []}
+    out = merge_odds([None, {"response": None}, part(1, 8, WINNER, errors={"bet": "unknown"})])
+    assert out["errors"] == {"bet": "unknown"} and out["results"] == 1
+
+def test_bookmakers_from_env(monkeypatch):
+    monkeypatch.delenv("ODDS_BOOKMAKERS", raising=False)
+    assert bookmakers_from_env() == ()
+    monkeypatch.setenv("ODDS_BOOKMAKERS", "8, 6,x,")
+    assert bookmakers_from_env() == (8, 6)
+    monkeypatch.setenv("LIVE_BOOKMAKERS", "11")
+    assert bookmakers_from_env("LIVE_BOOKMAKERS") == (11,)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import asyncio, os, threading
+
+import pytest
+
+from lib import offload
+
+def where(_=None):
+    return os.getpid(), threading.current_thread().name
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOAD_MIN_BYTES", 10)
+    monkeypatch.setattr(offload, "OFFLOAD_EXECUTOR", "process")
+    yield
+    offload.shutdown()
+
+def run(*args, **kw):
+    return asyncio.run(offload.run_cpu(*args, **kw))
+
+def test_small_bodies_stay_inline(pools):
+    assert run(5, where) == where()
+
+def test_reducing_work_goes_to_process_pool(pools):
+    pid, _ = run(100, where)
+    assert pid != os.getpid()
+
+def test_full_tree_results_use_threads(pools):
+    pid, thread = run(100, where, reduces=False)
+    assert pid == os.getpid() and thread.startswith("offload")
+    assert "process" not in offload._executors
+
+def test_off_is_inline(pools, monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOAD_EXECUTOR", "off")
+    assert run(100, where, reduces=False) == where()
+
+def test_decode_body_flags_api_errors():
+    assert offload.decode_body(b'{"errors": [], "response": [1]}', len) == (2, False)
+    assert offload.decode_body(b'{"errors": {"token": "bad"}}')[1] is True
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from lib import poll_policy
+from lib.poll_policy import load_policy, poll_factor, red_cards, simulate
+
+@pytest.mark.parametrize("status, minute, factor", [
+    ("1H", 14, 2.0), ("1H", 15, 1.5), ("1H", 44, 1.5),
+    ("1H", 45, 1.0), ("1H", 47, 1.0),            # Nachspielzeit 1. HZ
+    ("HT", 45, None), ("BT", 90, None), ("P", 120, None), ("FT", 90, None), ("NS", 0, None),
+    ("2H", 46, 1.25), ("2H", 69, 1.25),
+    ("2H", 70, 0.75), ("2H", 84, 0.75),
+    ("2H", 85, 0.5), ("2H", 94, 0.5),
+    ("ET", 91, 0.75), ("ET", 120, 0.75),
+    ("LIVE", 50, 1.0), (None, 10, 1.0), ("1h", 30, 1.5),
+])
+def test_phase_factors(status, minute, factor):
+    assert poll_factor(status, minute) == factor
+
+def test_red_card_speeds_up_but_never_enables_polling():
+    assert poll_factor("2H", 60, red_cards=1) == 1.25 * poll_policy.RED_CARD_FACTOR
+    assert poll_factor("HT", 45, red_cards=2) is None
+
+def test_red_cards_from_events():
+    events = [{"type": "Card", "detail": "Yellow Card"}, {"type": "Card", "detail": "Red Card"},
+              {"type": "Card", "detail": "Second Yellow card / Red"}, {"type": "Goal", "detail": "Normal Goal"}]
+    assert red_cards(events) == 2
+    assert red_cards(None) == 0
+
+def test_policy_file(tmp_path):
+    p = tmp_path / "policy.json"
+    p.write_text(json.dumps([[["1H", "2H"], 0, 999, 0.5], [["HT"], 0, 999, None]]))
+    pol = load_policy(str(p))
+    assert poll_factor("2H", 80, policy=pol) == 0.5
+    assert poll_factor("HT", 45, policy=pol) is None
+    assert poll_factor("ET", 100, policy=pol) == 1.0
+
+def test_simulator_skips_half_time_and_saves_polls():
+    k = 1_800_000_000
+    row = {"fixture": {"id": 1, "timestamp": k, "status": {"short": "FT"},
+                       "periods": {"first": k, "second": k + 62 * 60}}}
+    base = simulate([row], 120, 15, False, 0, 200)
+    pol = simulate([row], 120, 15, True, 0, 200)
+    assert base["fixtures"] == pol["fixtures"] == 1
+    assert "HT" in base["by_status"] and "HT" not in pol["by_status"]
+    assert 0 < pol["polls"] < base["polls"]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from lib.poll_scheduler import EmptyBackoff, EventTrigger, PollScheduler, fixture_weight, next_wake
+
+def sched():
+    return PollScheduler(60, min_interval=30, max_interval=180)
+
+def test_interval_follows_weight_within_bounds():
+    s = sched()
+    assert s.interval_for(1.0) == 60
+    assert s.interval_for(10.0) == 30
+    assert s.interval_for(0.1) == 180
+    assert fixture_weight(tippable=True, tier=1) > fixture_weight(tippable=False, tier=3)
+    assert fixture_weight(phase=0.5) == 2 * fixture_weight(phase=1.0)
+
+def test_new_fixture_due_immediately_then_after_interval():
+    s = sched()
+    s.update(1, 1.0, now=0)
+    assert s.pop_due(now=0) == [1]
+    assert s.pop_due(now=59) == []
+    assert s.pop_due(now=60) == [1]
+    assert s.next_due() == 120
+
+def test_limit_takes_heaviest_and_keeps_rest_pending():
+    s = sched()
+    for fid, w in ((1, 0.5), (2, 2.0), (3, 1.0)):
+        s.update(fid, w, now=0)
+    assert s.pop_due(now=0, limit=2) == [2, 3]
+    assert s.pending(now=0) == 1
+    assert s.pop_due(now=1) == [1]
+
+def test_higher_weight_pulls_deadline_forward():
+    s = sched()
+    s.update(1, 1.0, now=0)
+    s.pop_due(now=0)                 # nächster Termin 60
+    s.update(1, 2.0, now=10)         # Intervall 30 → Termin 30
+    assert s.pop_due(now=29) == []
+    assert s.pop_due(now=30) == [1]
+
+def test_reschedule_and_retain_invalidate_old_heap_entries():
+    s = sched()
+    s.update(1, 1.0, now=0)
+    s.update(2, 1.0, now=0)
+    s.pop_due(now=0)
+    s.reschedule(1, 5)
+    s.retain([1])
+    assert len(s) == 1 and 2 not in s
+    assert s.next_due() == 5
+    assert s.pop_due(now=60) == [1]
+
+def test_planned_per_min_and_next_wake():
+    s = sched()
+    s.update(1, 1.0, now=0)
+    s.update(2, 2.0, now=0)
+    assert s.planned_per_min() == 3.0
+    assert s.planned_per_min(per_call=20) == 3.0 / 20
+    assert next_wake([None, 12.0, 5.0], now=4) == 1.0
+    assert next_wake([None], now=0, cap=60) == 60
+    assert next_wake([1.0], now=4, floor=0.5) == 0.5
+
+def test_empty_backoff_doubles_until_cap_and_resets_on_hit():
+    b = EmptyBackoff(base=60, cap=300)
+    assert [b.miss(7) for _ in range(5)] == [60, 120, 240, 300, 300]
+    assert "capped 1" in b.summary()
+    b.hit(7)
+    b.hit(8)  # ohne Miss kein Reset
+    assert b.resets == 1 and b.miss(7) == 60
+
+def test_empty_backoff_retain_and_planned_rate():
+    b = EmptyBackoff(base=600, cap=1800)
+    s = sched()
+    s.update(1, 1.0, now=0)
+    s.update(2, 1.0, now=0)
+    b.miss(2)
+    assert s.planned_per_min(backoff=b) == 1.0 + 0.1
+    b.retain([1])
+    assert b.misses == {}
+
+def meta(gh=0, ga=0, status="1H", minute=10, red=0):
+    return {"goals_home": gh, "goals_away": ga, "status_short": status, "minute": minute, "red_cards": red}
+
+def test_event_trigger_reasons():
+    t = EventTrigger(debounce=0, jump=3)
+    assert t.check(1, meta(), now=0) is None          # erster Stand = nur merken
+    assert t.check(1, meta(minute=11), now=60) is None
+    assert t.check(1, meta(gh=1, minute=11), now=61) == "goal"
+    assert t.check(1, meta(gh=1, minute=11, red=1), now=62) == "card"
+    assert t.check(1, meta(gh=1, minute=11, red=1, status="HT"), now=63) == "status"
+    assert t.check(1, meta(gh=1, minute=20, red=1, status="HT"), now=64) == "jump"
+    assert dict(t.fired) == {"goal": 1, "card": 1, "status": 1, "jump": 1}
+
+def test_event_trigger_debounce_per_fixture():
+    t = EventTrigger(debounce=60, jump=3)
+    for fid in (1, 2):
+        t.check(fid, meta(), now=0)
+    assert t.check(1, meta(gh=1), now=10) == "goal"
+    assert t.check(1, meta(gh=2), now=20) is None
+    assert t.check(2, meta(ga=1), now=20) == "goal"
+    assert t.check(1, meta(gh=3), now=71) == "goal"
+    assert t.debounced == 1
+
+def test_event_trigger_retain_forgets_state():
+    t = EventTrigger(debounce=0)
+    t.check(1, meta(), now=0)
+    t.retain([])
+    assert t.check(1, meta(gh=1), now=1) is None
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lib import api_client
+from lib.api_client import QuotaBudget
+
+MINUTE = 1_800_000_000 // 60 * 60   # Beginn einer Wanduhr-Minute
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [MINUTE + 0.0]
+    monkeypatch.setattr(api_client.time, "time", lambda: now[0])
+    return now
+
+@pytest.fixture
+def budget(tmp_path, monkeypatch, clock):
+    # Reserven bei 100/min: odds_live 10, fixtures_live 10, stats 50, predictions 20, backfill 10
+    monkeypatch.delenv("API_LANE_WEIGHTS", raising=False)
+    return QuotaBudget("k1", per_minute=100, per_day=10_000, path=str(tmp_path / "quota.db"))
+
+def book(budget, lane, n):
+    return sum(1 for _ in range(n) if budget.reserve(lane) == 0.0)
+
+def test_lower_lane_keeps_off_higher_reserves_early_in_minute(budget):
+    assert book(budget, "backfill", 30) == 10          # nur die eigene Reserve
+    assert budget.reserve("backfill") > 0
+    assert book(budget, "predictions", 30) == 20
+
+def test_lower_lane_borrows_unused_reserves_as_minute_runs_out(budget, clock):
+    book(budget, "backfill", 10)
+    clock[0] = MINUTE + 30                               # Hälfte: Schutz 90 → 45
+    assert book(budget, "backfill", 100) == 100 - 10 - 45
+    clock[0] = MINUTE + 57                               # Schutz 4.5
+    assert book(budget, "backfill", 100) == 41
+    assert book(budget, "odds_live", 100) == 4           # Rest bis zum Minutenlimit
+
+def test_borrowing_leaves_used_higher_reserves_out_of_the_protection(budget, clock):
+    book(budget, "stats", 50)
+    book(budget, "odds_live", 10)
+    book(budget, "fixtures_live", 10)
+    # nur predictions (20) ist noch geschützt
+    assert book(budget, "backfill", 100) == 100 - 70 - 20
+
+def test_odds_live_never_waits_on_lower_lane_reserves(budget):
+    assert book(budget, "odds_live", 100) == 100          # Minutenlimit ist die einzige Grenze
+    assert budget.reserve("backfill") > 0
+    assert budget.reserve("odds_live") > 0
+
+def test_higher_lane_takes_lower_reserves_but_not_higher_ones(budget):
+    book(budget, "backfill", 10)
+    # predictions-Reserve (20) ist frei, odds_live + fixtures_live (20) bleiben geschützt
+    assert book(budget, "stats", 100) == 70
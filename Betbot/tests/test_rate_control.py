@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from lib import rate_control
+from lib.rate_control import RateController, retry_after
+
+HDR = {"X-RateLimit-Limit": "300", "X-RateLimit-Remaining": "250",
+       "x-ratelimit-requests-limit": "7500", "x-ratelimit-requests-remaining": "7000"}
+
+@pytest.fixture
+def rc(monkeypatch):
+    for name in ("RATE_STEP", "RATE_DECREASE", "RATE_MARGIN", "BACKOFF_BASE_SEC", "BACKOFF_CAP_SEC"):
+        monkeypatch.delenv(name, raising=False)
+    return RateController(start_rate=1.0)
+
+def test_on_response_adopts_headers_and_increases(rc):
+    rc.on_response(200, HDR)
+    assert (rc.minute_limit, rc.minute_remaining, rc.day_limit, rc.day_remaining) == (300, 250, 7500, 7000)
+    assert rc.rate == pytest.approx(1.05)
+    rc.on_response(200, {})   # ohne Header bleibt der letzte Stand
+    assert rc.minute_limit == 300 and rc.rate == pytest.approx(1.10)
+
+def test_increase_stops_at_minute_limit(rc):
+    for _ in range(100):
+        rc.on_response(200, dict(HDR, **{"X-RateLimit-Limit": "90"}))
+    assert rc.rate == pytest.approx(1.5)   # 90/min
+    assert rc.interval() == pytest.approx(1 / 1.5)
+
+def test_decrease_on_429_and_low_remaining(rc):
+    rc.on_response(429, {})
+    assert rc.rate == pytest.approx(0.5) and rc.throttled == 1
+    rc.on_response(200, dict(HDR, **{"X-RateLimit-Remaining": "2"}))
+    assert rc.rate == pytest.approx(0.25) and rc.throttled == 2
+    for _ in range(20):
+        rc.on_response(429, {})
+    assert rc.rate == rc.min_rate
+
+def test_backoff_exponential_capped(rc):
+    for attempt, exp in ((1, 1), (2, 2), (4, 8), (10, 60)):
+        for _ in range(50):
+            assert exp / 2 <= rc.backoff(attempt) <= exp
+
+def test_backoff_retry_after_is_lower_bound(rc, monkeypatch):
+    monkeypatch.setattr(rate_control.random, "uniform", lambda a, b: b)
+    # früher auf BACKOFF_CAP_SEC (60) gedeckelt
+    assert rc.backoff(1, retry_after_sec=120) == 121
+    assert rc.backoff(10, retry_after_sec=5) == 65
+    monkeypatch.setattr(rate_control.random, "uniform", lambda a, b: a)
+    assert rc.backoff(1, retry_after_sec=120) == 120.5
+
+def test_retry_after_header():
+    assert retry_after({"Retry-After": "30"}) == 30.0
+    assert retry_after({"Retry-After": "-1"}) == 0.0
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}) is None
+    assert retry_after({}) is None
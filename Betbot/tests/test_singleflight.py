@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import asyncio, threading, time
+
+import pytest
+
+from lib.singleflight import SingleFlight, SingleFlightSync
+
+def test_concurrent_calls_share_one_upstream_call():
+    sf = SingleFlight(window=0)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"n": calls}
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == [{"n": 1}] * 5
+    assert (calls, sf.leaders, sf.shared) == (1, 1, 4)
+
+def test_window_serves_recent_result():
+    sf = SingleFlight(window=10)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await sf.do("k", fetch), await sf.do("k", fetch), await sf.do("other", fetch)]
+
+    assert asyncio.run(main()) == [1, 1, 2]
+
+def test_leader_error_reaches_followers():
+    sf = SingleFlight(window=0)
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(main()))
+
+def test_cancelled_leader_does_not_cancel_followers():
+    sf = SingleFlight(window=0)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        leader = asyncio.create_task(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(sf.do("k", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    # genau ein Wartender übernimmt, die anderen teilen dessen Ergebnis
+    assert asyncio.run(main()) == [2, 2, 2]
+    assert calls == 2 and sf.leaders == 2 and sf.takeovers == 3
+
+def test_cancelled_follower_does_not_cancel_leader():
+    sf = SingleFlight(window=0)
+
+    async def fetch():
+        await asyncio.sleep(0.03)
+        return "ok"
+
+    async def main():
+        leader = asyncio.create_task(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(sf.do("k", fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == "ok"
+
+def test_sync_threads_share_one_call():
+    sf = SingleFlightSync(window=0)
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(1)
+        return "r"
+
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(sf.do("k", fetch))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert out == ["r"] * 4 and len(calls) == 1
+
+def test_unrelated_keys_do_not_pile_up(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("lib.singleflight.time.monotonic", lambda: now[0])
+    sf, sfs = SingleFlight(window=3), SingleFlightSync(window=3)
+
+    async def fetch():
+        return "r"
+
+    async def main():
+        for i in range(1000):
+            now[0] = i * 0.1
+            await sf.do(("/odds/live", i), fetch)
+            sfs.do(("/odds/live", i), lambda: "r")
+
+    asyncio.run(main())
+    # nur was im Fenster (3s = 30 Aufrufe) liegt, bleibt gemerkt
+    assert len(sf._recent) <= 31 and len(sfs._recent) <= 31
+    assert asyncio.run(sf.do(("/odds/live", 999), fetch)) == "r" and sf.leaders == 1000
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from lib.telemetry import Telemetry
+
+def tel(monkeypatch):
+    monkeypatch.setenv("TELEMETRY_SUMMARY_SEC", "0")
+    return Telemetry()
+
+def lines(text, prefix):
+    return [l for l in text.splitlines() if l.startswith(prefix)]
+
+def test_render_counters_and_histogram(monkeypatch):
+    t = tel(monkeypatch)
+    t.observe("/fixtures", {"live": "all"}, 200, 0.07, 1000, "fixtures_live")
+    t.observe("/fixtures", {"live": "all"}, 200, 3.0, 500, "fixtures_live")
+    t.observe("/fixtures", {"live": "all"}, "error", 40.0)
+    t.retry("/fixtures", {"live": "all"}, "429")
+    text = t.render()
+    assert text.endswith("\n")
+    assert lines(text, "betbot_http_requests_total{") == [
+        'betbot_http_requests_total{endpoint="/fixtures?live",status="200"} 2',
+        'betbot_http_requests_total{endpoint="/fixtures?live",status="error"} 1']
+    buckets = lines(text, "betbot_http_request_duration_seconds_bucket")
+    assert buckets[0] == 'betbot_http_request_duration_seconds_bucket{endpoint="/fixtures?live",le="0.05"} 0'
+    assert 'betbot_http_request_duration_seconds_bucket{endpoint="/fixtures?live",le="0.1"} 1' in buckets
+    assert 'betbot_http_request_duration_seconds_bucket{endpoint="/fixtures?live",le="5"} 2' in buckets
+    assert buckets[-1] == 'betbot_http_request_duration_seconds_bucket{endpoint="/fixtures?live",le="+Inf"} 3'
+    assert 'betbot_http_request_duration_seconds_sum{endpoint="/fixtures?live"} 43.070000' in text
+    assert 'betbot_http_request_duration_seconds_count{endpoint="/fixtures?live"} 3' in text
+    assert 'betbot_http_response_bytes_total{endpoint="/fixtures?live"} 1500' in text
+    assert 'betbot_http_retries_total{endpoint="/fixtures?live",reason="429"} 1' in text
+    assert 'betbot_http_lane_requests_total{lane="fixtures_live"} 2' in text
+
+def test_render_metric_families_have_help_and_type(monkeypatch):
+    t = tel(monkeypatch)
+    t.gauges = lambda: {"min_used": 3, "day_cap": 7500}
+    t.ratelimit("k1", {"X-RateLimit-Remaining": "280", "x-ratelimit-requests-remaining": "bad"})
+    text = t.render()
+    types = [l.split()[2] for l in lines(text, "# TYPE")]
+    helps = [l.split()[2] for l in lines(text, "# HELP")]
+    assert types == helps and "betbot_api_quota" in types and "betbot_api_ratelimit" in types
+    assert 'betbot_api_ratelimit{key="k1",window="minute",kind="remaining"} 280' in text
+    assert "window=\"day\"" not in text
+    assert lines(text, "betbot_api_quota{") == ['betbot_api_quota{name="day_cap"} 7500',
+                                                 'betbot_api_quota{name="min_used"} 3']
+
+def test_summary_window_resets(monkeypatch):
+    t = tel(monkeypatch)
+    assert t.summary() == ""
+    t.observe("/odds/live", None, 200, 0.2, 2_000_000, "odds_live")
+    t.observe("/odds/live", None, 500, 0.4, 0, "odds_live")
+    line = t.summary()
+    assert line.startswith("HTTP 2 req") and "/odds/live n=2 (100%)" in line and "err=1" in line
+    assert t.summary() == ""
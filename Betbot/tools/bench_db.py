@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Event-Loop-Lag unter DB-Last (db.py sync vs. to_thread vs. *_async).
+
+python tools/bench_db.py [url] [fixtures] [ticks] – NUR gegen eine Wegwerf-DB (legt die Tabellen per
+db_models.init_db an). Je Tick: Fixture-Upsert, ein Snapshot je Spiel (eigener Commit), Odds-Bulk,
+ein paar Alerts; parallel simulierte HTTP-Coroutinen und LoopLag (10 ms Takt).
+  inline = Sync-Aufrufe direkt im Loop, thread = asyncio.to_thread, async = *_async mit Async-Treiber
+"""
+import os, sys, time, asyncio
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# vor dem Import von db/db_models setzen – beide binden den Pool für DATABASE_URL beim Import
+os.environ["DATABASE_URL"] = sys.argv[1] if len(sys.argv) > 1 else "sqlite:////tmp/betbot_db_bench.db"
+
+from sqlalchemy import text
+import db, db_models
+from lib import db_pool
+from lib.offload import LoopLag
+
+async def bench_tick(mode: str, tick: int, fixtures: List[Dict[str, Any]]):
+    snaps = [dict(fixture_id=f["fixture_id"], minute=tick, home_sog=tick % 7, home_shots=tick % 11, home_corners=tick % 5,
+                  home_saves=tick % 3, home_poss=50.0, away_sog=tick % 5, away_shots=tick % 9, away_corners=tick % 4,
+                  away_saves=tick % 2, away_poss=50.0) for f in fixtures]
+    odds = [dict(fixture_id=f["fixture_id"], home_ml=2.1, draw_ml=3.3, away_ml=3.6) for f in fixtures]
+    alerts = [dict(fixture_id=f["fixture_id"], kind="GOAL_SOON", message="bench", details="{}") for f in fixtures[:5]]
+    if mode == "inline":
+        db.upsert_fixtures(fixtures)
+        for s in snaps:
+            db.insert_snapshot(s)
+        db.insert_odds_bulk(odds)
+        for a in alerts:
+            db.insert_alert(a)
+    elif mode == "thread":
+        await asyncio.to_thread(db.upsert_fixtures, fixtures)
+        for s in snaps:
+            await asyncio.to_thread(db.insert_snapshot, s)
+        await asyncio.to_thread(db.insert_odds_bulk, odds)
+        for a in alerts:
+            await asyncio.to_thread(db.insert_alert, a)
+    else:
+        await db.upsert_fixtures_async(fixtures)
+        for s in snaps:
+            await db.insert_snapshot_async(s)
+        await db.insert_odds_bulk_async(odds)
+        for a in alerts:
+            await db.insert_alert_async(a)
+
+async def bench_mode(mode: str, n_fixtures: int, ticks: int) -> Dict[str, float]:
+    fixtures = [dict(fixture_id=900000 + i, league_id=39, league_name="Bench", season=2025, home_id=2 * i,
+                     home_name=f"Home {i}", away_id=2 * i + 1, away_name=f"Away {i}") for i in range(n_fixtures)]
+    lag = LoopLag(interval=0.01, warn_ms=float("inf")).start()
+    await asyncio.sleep(0.05)
+    lag.stats(reset=True)
+    t0 = time.perf_counter()
+    for tick in range(ticks):
+        # simulierte HTTP-Antworten (aiohttp-Callbacks), die während der Writes fertig werden wollen
+        http = [asyncio.create_task(asyncio.sleep(0.001 * (i % 50))) for i in range(n_fixtures)]
+        await bench_tick(mode, tick, fixtures)
+        await asyncio.gather(*http)
+    elapsed = time.perf_counter() - t0
+    st = lag.stats(reset=True)
+    await lag.stop()
+    return dict(st, sec=elapsed)
+
+async def main(n_fixtures: int, ticks: int):
+    db_models.init_db()
+    eng = db.ENGINE
+    modes = ["inline", "thread"] + (["async"] if db.async_enabled() else [])
+    print(f"{eng.dialect.name}: {n_fixtures} Spiele × {ticks} Ticks "
+          f"(je Tick 1 Fixture-Upsert, {n_fixtures} Snapshots, 1 Odds-Bulk, 5 Alerts)")
+    for mode in modes:
+        r = await bench_mode(mode, n_fixtures, ticks)
+        print(f"  {mode:<7} Loop-Lag p50 {r['p50']:6.1f}ms  p95 {r['p95']:6.1f}ms  max {r['max']:7.1f}ms  "
+              f"(Samples {r['n']}, {r['sec']:.2f}s)")
+    if "async" not in modes:
+        print(f"  async   übersprungen – greenlet/{db_pool.ASYNC_DRIVERS.get(eng.dialect.name, '?')} nicht installiert oder DB_ASYNC=off")
+    with eng.begin() as conn:
+        counts = {t: conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in ("fixtures", "snapshots", "odds_live", "alerts")}
+    print("  Zeilen: " + " ".join(f"{t}={n}" for t, n in counts.items()))
+    print("  " + db_pool.summary())
+    await db_pool.dispose_async()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+                     int(sys.argv[3]) if len(sys.argv) > 3 else 5))
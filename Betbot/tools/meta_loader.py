@@ -1,8 +1,9 @@
-import os, requests, psycopg2, time
+import os, sys
 
-API = os.getenv("APIFOOTBALL_BASE")
-KEY = os.getenv("APIFOOTBALL_KEY")
-HDR = {"x-apisports-key": KEY}
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib import db_pool
+from lib.api_client import get_json_sync
+from lib.backfill_queue import BackfillQueue
 
 def upsert_league(cur, row):
     cur.execute("""
@@ -21,26 +22,35 @@ def upsert_team(cur, row):
         DO UPDATE SET name=EXCLUDED.name, country=EXCLUDED.country, logo_url=EXCLUDED.logo_url, updated_at=now();
     """, (t["id"], t["name"], t.get("country"), t.get("logo")))
 
-def main():
-    conn = psycopg2.connect(os.getenv("DATABASE_URL"))  # z.B. postgres://...
+def main(queue=False):
+    conn = db_pool.connect()  # DATABASE_URL, z.B. postgres://...
     cur = conn.cursor()
 
     # Aktive Ligen (Beispiel: Top-Ligen + Subset deiner Auswahl)
-    leagues = requests.get(f"{API}/leagues?current=true", headers=HDR, timeout=30).json()["response"]
+    leagues = get_json_sync("/leagues", {"current": "true"}, timeout=30)["response"]
     for L in leagues:
         upsert_league(cur, L)
     conn.commit()
 
     # Teams je Liga-Saison (hier nur wenige, erweitere nach Bedarf)
+    if queue:
+        # --queue: Teams laufen ber workers/backfill_worker.py mit Restbudget statt als Burst
+        q = BackfillQueue()
+        n = sum(q.enqueue("team_meta", f"{L['league']['id']}/{L['seasons'][-1]['year']}",
+                          {"league": L["league"]["id"], "season": L["seasons"][-1]["year"]}, priority=8)
+                for L in leagues[:50])
+        print(f"team_meta Jobs eingereiht: {n}")
+        cur.close(); conn.close()
+        return
+
     for L in leagues[:50]:
         lid = L["league"]["id"]; sid = L["seasons"][-1]["year"]
-        r = requests.get(f"{API}/teams?league={lid}&season={sid}", headers=HDR, timeout=30).json()["response"]
+        r = get_json_sync("/teams", {"league": lid, "season": sid}, timeout=30)["response"]
         for t in r:
             upsert_team(cur, t)
         conn.commit()
-        time.sleep(0.5)  # hflich bleiben
 
     cur.close(); conn.close()
 
 if __name__ == "__main__":
-    main()
+    main(queue="--queue" in sys.argv)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Migration: Tabellen im alten ORM-Layout (fixtures.id + home_team_id/home_team_name,
+snapshots/odds_live.timestamp, home_odds/draw_odds/away_odds, over_under_line) auf das
+Schema aus schema.sql (= db_models) umstellen. init_db()/check_schema() verweigern das alte
+Layout mit RuntimeError und verweisen hierher.
+
+python tools/migrate_orm_schema.py [url] – Default DATABASE_URL (wie db_models). Vorher sichern.
+Je veraltete Tabelle: Kopie nach <tabelle>_orm_old, Tabelle neu anlegen (init_db-Layout),
+Daten mit Spalten-Mapping zurückkopieren, Kopie löschen – alles in einer Transaktion.
+Spalten ohne Gegenstück (status, elapsed, home_goals, home_fouls, ...) fallen weg, die
+Zeilen-IDs von snapshots/odds_live/alerts werden neu vergeben; Zeilen zu unbekannten
+Fixtures werden übersprungen (Fremdschlüssel).
+"""
+import os, sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if len(sys.argv) > 1 and __name__ == "__main__":
+    # vor dem Import von db_models setzen – es bindet den Pool für DATABASE_URL beim Import
+    os.environ["DATABASE_URL"] = sys.argv[1]
+
+from sqlalchemy import inspect, text
+import db_models
+
+# alter Spaltenname -> Spalte in schema.sql
+RENAMED: Dict[str, Dict[str, str]] = {
+    "fixtures":  {"home_team_id": "home_id", "home_team_name": "home_name",
+                  "away_team_id": "away_id", "away_team_name": "away_name"},
+    "snapshots": {"timestamp": "ts_utc"},
+    "odds_live": {"timestamp": "ts_utc", "over_under_line": "goalline",
+                  "home_odds": "home_ml", "draw_odds": "draw_ml", "away_odds": "away_ml"},
+    "alerts":    {"timestamp": "ts_utc"},
+}
+
+def outdated(bind) -> List[str]:
+    """Vorhandene Tabellen, denen Spalten aus schema.sql fehlen (Reihenfolge: Eltern zuerst)."""
+    insp = inspect(bind)
+    existing = set(insp.get_table_names())
+    out = []
+    for table in db_models.Base.metadata.sorted_tables:
+        if table.name in existing:
+            have = {c["name"] for c in insp.get_columns(table.name)}
+            if any(c.name not in have for c in table.columns):
+                out.append(table.name)
+    return out
+
+def migrate(engine=None) -> Dict[str, int]:
+    """→ {tabelle: übernommene Zeilen}; leer, wenn nichts zu tun war."""
+    engine = engine or db_models.engine
+    copied: Dict[str, int] = {}
+    with engine.begin() as conn:
+        names = outdated(conn)
+        if not names:
+            return copied
+        old_cols = {n: [c["name"] for c in inspect(conn).get_columns(n)] for n in names}
+        for n in names:
+            conn.execute(text(f"CREATE TABLE {n}_orm_old AS SELECT * FROM {n}"))
+        for n in reversed(names):
+            conn.execute(text(f"DROP TABLE {n}"))
+        db_models.Base.metadata.create_all(bind=conn)
+        for table in db_models.Base.metadata.sorted_tables:
+            n = table.name
+            if n not in names:
+                continue
+            cols, exprs = [], []
+            for oc in old_cols[n]:
+                col = table.columns.get(RENAMED.get(n, {}).get(oc, oc))
+                # Surrogat-IDs neu vergeben; fixtures behält fixture_id als Schlüssel
+                if col is None or col.name in cols or (col.primary_key and col.autoincrement is not False):
+                    continue
+                cols.append(col.name)
+                exprs.append(f"COALESCE({oc}, CURRENT_TIMESTAMP)" if col.server_default is not None
+                             and col.name in ("ts_utc", "created_at", "updated_at") else oc)
+            where = "" if n == "fixtures" else " WHERE fixture_id IN (SELECT fixture_id FROM fixtures)"
+            res = conn.execute(text(f"INSERT INTO {n} ({', '.join(cols)}) SELECT {', '.join(exprs)} FROM {n}_orm_old{where}"))
+            copied[n] = res.rowcount
+            conn.execute(text(f"DROP TABLE {n}_orm_old"))
+        db_models.check_schema(conn)
+    return copied
+
+if __name__ == "__main__":
+    done = migrate()
+    if not done:
+        print(f"{db_models.DATABASE_URL}: Schema aktuell – nichts zu tun")
+    for name, n in done.items():
+        print(f"{name}: {n} Zeilen ins schema.sql-Layout übernommen")
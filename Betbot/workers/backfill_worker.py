@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backfill-Worker: arbeitet die Queue aus lib.backfill_queue ab, aber nur mit
+Budget, das die Live-Loops in der aktuellen Minute übrig lassen (Lane "backfill").
+
+Jobs:
+    fixtures_day  {date}            /fixtures?date → je Spiel "prediction", je Liga "coverage"
+    prediction    {fixture}         /predictions?fixture (landet im Response-Cache, 12h)
+    coverage      {league, season}  /leagues?id&season → statistics-Coverage (Cache, 24h)
+    team_meta     {league, season}  /teams → team_meta (Postgres, wie tools/meta_loader.py)
+
+Aufruf:
+    python workers/backfill_worker.py                     # Dauerbetrieb
+    python workers/backfill_worker.py --once              # bis Queue leer (oder BACKFILL_ONCE_WAIT_SEC
+                                                          # ohne Budget), dann Ende
+    python workers/backfill_worker.py enqueue-day [DATE]  # Default: morgen
+    python workers/backfill_worker.py status
+Teams: python tools/meta_loader.py --queue
+"""
+
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=".env_gamblebros")
+
+import os, sys, time, datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib.api_client import get_client, QuotaExhausted, ts
+from lib.backfill_queue import BackfillQueue
+from lib.circuit_breaker import CircuitOpen
+
+TZ = dt.timezone(dt.timedelta(hours=+1))
+
+MIN_SPARE      = int(os.getenv("BACKFILL_MIN_SPARE", "5"))        # freie Requests, ab denen ein Job startet
+IDLE_SLEEP_SEC = float(os.getenv("BACKFILL_IDLE_SLEEP_SEC", "5"))
+SUMMARY_SEC    = float(os.getenv("BACKFILL_SUMMARY_SEC", "60"))
+ONCE_WAIT_SEC  = float(os.getenv("BACKFILL_ONCE_WAIT_SEC", "120"))   # --once: so lange auf Budget warten, dann Ende
+
+def tomorrow_str(): return (dt.datetime.now(TZ).date() + dt.timedelta(days=1)).isoformat()
+
+def api_get(path, params):
+    return get_client().get_json_sync(path, params, timeout=30, lane="backfill")
+
+# ========= Handler =========
+def job_fixtures_day(q, p):
+    leagues = set()
+    for row in api_get("/fixtures", {"date": p["date"]}).get("response", []):
+        fx = row.get("fixture") or {}
+        lg = row.get("league") or {}
+        if ((fx.get("status") or {}).get("short")) == "NS" and fx.get("id"):
+            q.enqueue("prediction", fx["id"], {"fixture": fx["id"]}, priority=3)
+        if lg.get("id") and lg.get("season"):
+            leagues.add((lg["id"], lg["season"]))
+    for lid, season in leagues:
+        q.enqueue("coverage", f"{lid}/{season}", {"league": lid, "season": season}, priority=6)
+
+def job_prediction(q, p):
+    api_get("/predictions", {"fixture": p["fixture"]})
+
+def job_coverage(q, p):
+    resp = api_get("/leagues", {"id": p["league"], "season": p["season"]}).get("response", [])
+    seasons = (resp[0].get("seasons") or []) if resp else []
+    target = next((x for x in seasons if str(x.get("year")) == str(p["season"])), {})
+    if ((target.get("coverage") or {}).get("fixtures") or {}).get("statistics"):
+        print(f"[{ts()}] Coverage ✅ league_id={p['league']} season={p['season']}")
+
+def job_team_meta(q, p):
+    from lib import db_pool
+    from tools.meta_loader import upsert_team
+    rows = api_get("/teams", {"league": p["league"], "season": p["season"]}).get("response", [])
+    # Verbindung aus dem Pool (pre_ping prüft sie) statt einer eigenen, evtl. toten Dauerverbindung
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        for t in rows:
+            upsert_team(cur, t)
+        cur.close()
+        conn.commit()
+
+HANDLERS = {
+    "fixtures_day": job_fixtures_day,
+    "prediction":   job_prediction,
+    "coverage":     job_coverage,
+    "team_meta":    job_team_meta,
+}
+
+# ========= Loop =========
+def due_jobs(q: BackfillQueue) -> int:
+    return sum(s["due"] for s in q.stats().values())
+
+def drain(q: BackfillQueue, once: bool = False, api=None):
+    api = api or get_client(user_agent="BetBotBackfill/1.0")
+    done = failed = 0
+    last_summary = time.monotonic()
+    starved_since = None
+    while True:
+        if time.monotonic() - last_summary >= SUMMARY_SEC:
+            last_summary = time.monotonic()
+            print(f"[{ts()}] Backfill – done {done} | failed {failed} | spare {api.budget.spare('backfill')} | queue {q.stats()} | {api.cache.summary()}")
+
+        if once and not due_jobs(q):
+            break
+        spare = api.budget.spare("backfill")
+        if spare < MIN_SPARE:
+            starved_since = starved_since or time.monotonic()
+            if once and time.monotonic() - starved_since >= ONCE_WAIT_SEC:
+                print(f"[{ts()}] Backfill --once: kein Budget (spare {spare} < {MIN_SPARE}) seit "
+                      f"{ONCE_WAIT_SEC:.0f}s – Ende, Queue bleibt: {q.stats()}")
+                break
+            time.sleep(IDLE_SLEEP_SEC)
+            continue
+        starved_since = None
+        job = q.pop()
+        if job is None:
+            if once:
+                break
+            time.sleep(IDLE_SLEEP_SEC)
+            continue
+        handler = HANDLERS.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"unbekannter Job-Typ {job.kind}")
+            handler(q, job.payload)
+            q.done(job)
+            done += 1
+        except QuotaExhausted as e:
+            q.release(job)
+            print(f"[{ts()}] {e} – Backfill pausiert 10 min")
+            time.sleep(600)
+        except CircuitOpen as e:
+            # Endpoint gesperrt, nicht der Job kaputt: kein Fehlversuch, erst nach dem Cooldown wieder fällig
+            q.release(job, delay=e.retry_in)
+            print(f"[{ts()}] {e} – Job {job} zurückgestellt")
+            time.sleep(min(e.retry_in, IDLE_SLEEP_SEC))
+        except Exception as e:
+            failed += 1
+            retry = q.failed(job, repr(e))
+            print(f"[{ts()}] Job {job} fehlgeschlagen ({'retry' if retry else 'verworfen'}): {e}")
+    print(f"[{ts()}] Backfill fertig – done {done} | failed {failed} | {api.cache.summary()}")
+
+def main(argv):
+    q = BackfillQueue()
+    cmd = argv[1] if len(argv) > 1 else ""
+    if cmd == "enqueue-day":
+        day = argv[2] if len(argv) > 2 else tomorrow_str()
+        new = q.enqueue("fixtures_day", day, {"date": day}, priority=1)
+        print(f"fixtures_day {day}: {'eingereiht' if new else 'schon in der Queue'}")
+    elif cmd == "status":
+        for kind, s in sorted(q.stats().items()):
+            print(f"{kind:<14} due={s['due']:<6} later={s['later']:<6} retry={s['retry']}")
+        for e in q.errors():
+            print("  ", e)
+        print(f"spare backfill: {get_client().budget.spare('backfill')}")
+    else:
+        drain(q, once=(cmd == "--once"))
+
+if __name__ == "__main__":
+    main(sys.argv)
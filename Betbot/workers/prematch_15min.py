@@ -4,11 +4,13 @@
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env_gamblebros")
 
-import os, requests, psycopg2, datetime as dt
+import os, sys, datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib import db_pool
+from lib.api_client import get_client, get_json_sync, iter_odds_sync
+from lib.odds_utils import BET_MATCH_WINNER, bookmakers_from_env
 
-API = os.getenv("APIFOOTBALL_BASE", "https://v3.football.api-sports.io")
-KEY = os.getenv("APIFOOTBALL_KEY")
-HDR = {"x-apisports-key": KEY}
 TZ  = dt.timezone(dt.timedelta(hours=+1))  # Berlin (Winter) – passe ggf. für Sommerzeit an
 
 # --- Laufzeit-Parameter aus ENV (konfigurierbar) ------------------------------
@@ -20,9 +22,7 @@ DEBUG          = os.getenv("DEBUG", "false").lower() in ("1","true","yes","on")
 # --- Fallback: Teams/League/Kickoff nachladen, falls odds?date sie nicht liefert
 def fetch_fixture_meta(fixture_id: int):
     try:
-        r = requests.get(f"{API}/fixtures", params={"id": fixture_id}, headers=HDR, timeout=30)
-        r.raise_for_status()
-        data = r.json().get("response", [])
+        data = get_json_sync("/fixtures", {"id": fixture_id}, timeout=30).get("response", [])
         if not data:
             return None, None, None, None
         row = data[0]
@@ -94,29 +94,30 @@ def freeze_to_event(cur, cand):
       ON CONFLICT (fixture_id, market, selection) DO NOTHING;
     """, cand)
 
+# genutzt wird nur FT 1X2 (beste Home-Quote) → nur diesen Markt laden; ODDS_BOOKMAKERS optional
+ODDS_BETS       = (BET_MATCH_WINNER,)
+ODDS_BOOKMAKERS = bookmakers_from_env()
+
 def fetch_odds_by_date(date_iso: str):
-    r = requests.get(f"{API}/odds", params={"date": date_iso}, headers=HDR, timeout=60)
-    r.raise_for_status()
-    return r.json().get("response", [])
+    # Generator: Einträge kommen einzeln, während die (MB-große) Antwort noch lädt
+    return iter_odds_sync({"date": date_iso}, bets=ODDS_BETS, bookmakers=ODDS_BOOKMAKERS)
 
 def main():
-    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    conn = db_pool.connect()
     cur  = conn.cursor()
 
     for bucket, d in (("TODAY", today_str()), ("TOMORROW", tomorrow_str())):
         odds = fetch_odds_by_date(d)
 
-        total = len(odds)
+        total = 0
         with_books = 0
         with_best = 0
         written = 0
         skipped_edge = 0
         skipped_missing = 0
 
-        if DEBUG:
-            print(f"[{bucket}] odds records: {total}")
-
         for item in odds:
+            total += 1
             f    = item.get("fixture") or {}
             league = item.get("league") or {}
             teams  = item.get("teams")  or {}
@@ -224,9 +225,11 @@ def main():
 
         conn.commit()
         if DEBUG:
-            print(f"[{bucket}] with_books={with_books} with_best={with_best} written={written} "
+            print(f"[{bucket}] odds records={total} with_books={with_books} with_best={with_best} written={written} "
                   f"skipped_missing={skipped_missing} skipped_edge={skipped_edge}")
 
+    if DEBUG:
+        print(f"[15MIN] {get_client().cache.summary()}")
     cur.close(); conn.close()
 
 if __name__ == "__main__":
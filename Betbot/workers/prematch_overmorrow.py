@@ -4,11 +4,14 @@
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env_gamblebros")
 
-import os, time, json, requests, psycopg2, datetime as dt
+import os, sys, datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib import db_pool
+from lib.api_client import get_client, get_json_sync, iter_odds_sync
+from lib.fastjson import dumps as json_dumps
+from lib.odds_utils import BET_MATCH_WINNER, bookmakers_from_env
 
-API = os.getenv("APIFOOTBALL_BASE", "https://v3.football.api-sports.io")
-KEY = os.getenv("APIFOOTBALL_KEY")
-HDR = {"x-apisports-key": KEY}
 TZ  = dt.timezone(dt.timedelta(hours=+1))
 
 MIN_EDGE_PP    = float(os.getenv("MIN_EDGE_PP", "0.05"))
@@ -24,16 +27,17 @@ def implied(p):
 
 def ensemble(q, pm, pp): return 0.35*q + 0.40*pm + 0.25*pp
 
+# genutzt wird nur FT 1X2 (beste Home-Quote) → nur diesen Markt laden; ODDS_BOOKMAKERS optional
+ODDS_BETS       = (BET_MATCH_WINNER,)
+ODDS_BOOKMAKERS = bookmakers_from_env()
+
 def fetch_odds_by_date(date_iso):
-    r = requests.get(f"{API}/odds", params={"date": date_iso}, headers=HDR, timeout=60)
-    r.raise_for_status()
-    return r.json().get("response", [])
+    # Generator: Einträge kommen einzeln, während die (MB-große) Antwort noch lädt
+    return iter_odds_sync({"date": date_iso}, bets=ODDS_BETS, bookmakers=ODDS_BOOKMAKERS)
 
 def fetch_fixture_meta(fixture_id: int):
     try:
-        r = requests.get(f"{API}/fixtures", params={"id": fixture_id}, headers=HDR, timeout=30)
-        r.raise_for_status()
-        resp = r.json().get("response", [])
+        resp = get_json_sync("/fixtures", {"id": fixture_id}, timeout=30).get("response", [])
         if not resp: return None, None, None, None
         row = resp[0]
         L = (row.get("league") or {}).get("id")
@@ -59,12 +63,10 @@ def insert_prediction(cur, fixture_id:int, payload:dict):
     cur.execute("""
       INSERT INTO provider_predictions(fixture_id, provider, payload, fetched_at)
       VALUES (%s,'api-football',%s, now())
-    """,(fixture_id, json.dumps(payload)))
+    """,(fixture_id, json_dumps(payload)))
 
 def fetch_prediction_api(fixture_id:int):
-    r = requests.get(f"{API}/predictions", params={"fixture": fixture_id}, headers=HDR, timeout=60)
-    r.raise_for_status()
-    resp = r.json().get("response", [])
+    resp = get_json_sync("/predictions", {"fixture": fixture_id}).get("response", [])
     return resp[0] if resp else None
 
 def p_from_prediction(payload:dict|None, market:str, selection:str, default_q:float)->float:
@@ -101,11 +103,10 @@ def main():
     date_iso = overmorrow_str()
     if DEBUG: print(f"[OVERMORROW] date={date_iso} mode={mode}")
 
-    conn = psycopg2.connect(os.getenv("DATABASE_URL")); cur = conn.cursor()
+    conn = db_pool.connect(); cur = conn.cursor()
 
     # 1) ODDS ziehen
     odds = fetch_odds_by_date(date_iso)
-    if DEBUG: print(f"[OVERMORROW] odds records: {len(odds)}")
 
     fixtures_seen = set()
 
@@ -166,7 +167,7 @@ def main():
         written += 1
 
     conn.commit()
-    if DEBUG: print(f"[OVERMORROW] written={written}")
+    if DEBUG: print(f"[OVERMORROW] fixtures_with_odds={len(fixtures_seen)} written={written}")
 
     # 2) Bei "full": Predictions für alle gesehenen Fixtures 1×/Tag cachen
     if mode == "full" and fixtures_seen:
@@ -184,12 +185,12 @@ def main():
                 if payload:
                     insert_prediction(cur, fx, payload)
                     fetched += 1
-                    time.sleep(0.2)
             except Exception as e:
                 if DEBUG: print(f"[WARN] predictions fx={fx} -> {e}")
         conn.commit()
         if DEBUG: print(f"[OVERMORROW] predictions fetched={fetched}")
 
+    if DEBUG: print(f"[OVERMORROW] {get_client().cache.summary()}")
     cur.close(); conn.close()
 
 if __name__ == "__main__":